@@ -6,7 +6,8 @@
 import streamlit as st
 import sys
 import os
-from typing import Dict, List
+import time
+from typing import Any, Dict, Iterator, List
 
 # ページ設定 - 最初に実行する必要がある
 st.set_page_config(
@@ -32,6 +33,12 @@ try:
     
     from simple_html_extractor import SimpleJobExtractor
     from llm_ranker import LLMJobRanker
+    from src.catalog.arrow_snapshot import ArrowSnapshotStore
+    from src.catalog.job_store import JobStore
+    from src.catalog.refresh_worker import RefreshWorker, request_refresh
+    from src.catalog.shared_catalog import SharedJobCatalog
+    from src.extractors.crawl_metrics import configure_metrics_log
+    from src.extractors.jposting_site import listing_url
     
     # インポート成功メッセージ（デバッグ用にコメントアウト）
     # st.success("✅ モジュールのインポートが成功しました！")
@@ -44,6 +51,13 @@ except Exception as e:
     st.error(f"❌ 予期しないエラー: {e}")
     st.stop()
 
+JOB_LIST_URL = listing_url()  # JPOSTING_BASE_URL / JPOSTING_COMPANY で参照先のサイト・企業を切り替え可能
+CATALOG_TTL_SECONDS = 60 * 60  # 共有カタログの再取得間隔
+CATALOG_WAIT_SECONDS = 3  # 初回の版が公開されるまで画面を再読み込みする間隔
+MIN_CATALOG_JOBS = 20  # 取得途中でもこの件数が揃えば入力フォームを表示する
+CATALOG_START_TIMEOUT_SECONDS = 90  # 取得中の様子がないまま、最初の版をこれ以上は待たない
+CATALOG_STALL_SECONDS = 60  # 取得途中の版がこの秒数更新されなければ取得が止まったとみなす
+
 # セッション状態の初期化
 if 'jobs_loaded' not in st.session_state:
     st.session_state.jobs_loaded = False
@@ -52,32 +66,104 @@ if 'all_jobs' not in st.session_state:
 if 'recommendations' not in st.session_state:
     st.session_state.recommendations = []
 
+def fetch_catalog_jobs() -> Iterator[Dict[str, Any]]:
+    """採用サイトから全求人を取得（プロセス内の更新ワーカーのローダー、求人は抽出でき次第渡す）"""
+    job_extractor = SimpleJobExtractor()
+    return job_extractor.iter_jobs(JOB_LIST_URL)
+
+@st.cache_resource
+def setup_metrics_log():
+    """プロセス内のワーカーの取得ごとの計測を CRAWL_METRICS_LOG に出力する（サーバープロセスで1回だけ）"""
+    return configure_metrics_log()
+
+@st.cache_resource
+def get_job_store() -> JobStore:
+    """前回取得した求人を保存しておくストア（再起動後はここから起動）"""
+    return JobStore()
+
+@st.cache_resource
+def get_snapshot_store() -> ArrowSnapshotStore:
+    """カタログの各版を公開するArrowスナップショット（全ワーカーがメモリマップで共有）"""
+    return ArrowSnapshotStore()
+
+@st.cache_resource
+def get_shared_catalog() -> SharedJobCatalog:
+    """サーバープロセス内で1つだけの求人カタログ（公開済みの最新版を読むだけで、取得はしない）"""
+    return SharedJobCatalog(None, snapshots=get_snapshot_store())
+
+@st.cache_resource
+def get_refresh_worker() -> RefreshWorker:
+    """
+    プロセス内の更新ワーカー（python -m src.catalog.refresh_worker が動いていれば待機するだけ）
+    """
+    setup_metrics_log()
+    worker = RefreshWorker(
+        fetch_catalog_jobs,
+        get_snapshot_store(),
+        store=get_job_store(),
+        interval_seconds=CATALOG_TTL_SECONDS
+    )
+    worker.start_in_background()
+    return worker
+
+def is_catalog_loading(catalog: SharedJobCatalog, worker: RefreshWorker) -> bool:
+    """
+    最初の版の取得が実際に進んでいるか（待ち続けてよいか）
+    - プロセス内のワーカーが取得中なら進んでいる
+    - 取得途中の版があれば、最後に公開されてから CATALOG_STALL_SECONDS 以内なら進んでいる
+    - まだ版がなければ、待ち始めてから CATALOG_START_TIMEOUT_SECONDS までは外部のワーカーの公開を待つ
+    """
+    if worker.crawling:
+        return True
+    if worker.last_error:
+        return False
+    
+    if catalog.is_loaded():
+        published_at = getattr(catalog.get_jobs(), 'published_at', None) or 0
+        return time.time() - published_at < CATALOG_STALL_SECONDS
+    
+    waiting_since = st.session_state.setdefault('catalog_wait_started', time.time())
+    return time.time() - waiting_since < CATALOG_START_TIMEOUT_SECONDS
+
 def load_jobs():
     """求人データを読み込み"""
+    catalog = get_shared_catalog()
+    worker = get_refresh_worker()
+    
+    # 取得は更新ワーカーが行い、ここでは公開済みの最新版を読むだけ
+    jobs = catalog.get_jobs()
+    if not catalog.is_loaded() or not catalog.is_complete():
+        # 初回の取得中は、取得済みの件数を表示しながら最低限の件数が揃うのを待つ
+        # （クロールはこのリクエストとは別に進み、途中の求人も順次公開される）
+        total = catalog.progress().get('total')
+        count_text = f"{len(jobs)}件" + (f"（全{total}件中）" if total else "")
+        loading = is_catalog_loading(catalog, worker)
+        if len(jobs) < MIN_CATALOG_JOBS and loading:
+            st.info(f"🌐 三菱電機採用サイトから求人データを取得中です: {count_text}。しばらくお待ちください...")
+            time.sleep(CATALOG_WAIT_SECONDS)
+            st.rerun()
+        
+        if not jobs:
+            # 取得が失敗した・止まった（取得中の様子がない）場合は待ち続けない
+            st.session_state.pop('catalog_wait_started', None)
+            st.error("❌ 求人情報が取得できませんでした。")
+            if worker.last_error:
+                st.caption(f"原因: {worker.last_error}")
+            st.stop()
+        
+        if loading:
+            st.caption(f"📥 求人データを取得中: {count_text}。取得済みの求人から検索できます")
+        else:
+            st.warning(f"⚠️ 求人データの取得が途中で止まりました: {count_text}。取得済みの求人から検索できます")
+    
+    st.session_state.pop('catalog_wait_started', None)
+    
+    # セッションには共有リストへの参照のみを保持する
+    st.session_state.all_jobs = jobs
+    
     if not st.session_state.jobs_loaded:
-        with st.spinner("🌐 三菱電機採用サイトから全求人を取得中..."):
-            try:
-                job_extractor = SimpleJobExtractor()
-                url = 'https://progres02.jposting.net/pgmitsubishielectric/u/job.phtml'
-                jobs = job_extractor.extract_all_jobs(url)
-                
-                if jobs:
-                    st.session_state.all_jobs = jobs
-                    st.session_state.jobs_loaded = True
-                    
-                    # カテゴリ別集計
-                    categories = job_extractor.get_job_categories(jobs)
-                    st.success(f"✅ {len(jobs)}件の求人があります")
-                    
-                    # サイドバーには統計情報は表示しない（シンプルに）
-                    pass
-                else:
-                    st.error("❌ 求人情報が取得できませんでした。")
-                    st.stop()
-                    
-            except Exception as e:
-                st.error(f"❌ エラーが発生しました: {e}")
-                st.stop()
+        st.session_state.jobs_loaded = True
+        st.success(f"✅ {len(jobs)}件の求人があります")
 
 def get_recommendations(profile: Dict[str, str]):
     """AIレコメンデーションを取得"""
@@ -189,6 +275,9 @@ def main():
         
         # 求人データ読み込み
         if st.button("🔄 求人データを更新してやり直す", type="secondary"):
+            # 更新ワーカーに取得を要求し、新しい版が公開され次第そちらに切り替わる
+            request_refresh(get_snapshot_store().snapshot_dir)
+            get_shared_catalog().refresh()
             st.session_state.jobs_loaded = False
             st.session_state.all_jobs = []
             st.rerun()
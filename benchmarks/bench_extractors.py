@@ -0,0 +1,320 @@
+"""
+抽出器ベンチマーク - 5種類の抽出器に同じコーパスを与え、求人数を変えて処理コストを比較する
+フィクスチャサーバー（benchmarks/fixture_server.py）を起動し、各抽出器は別プロセスで1回ずつ実行する
+
+計測項目:
+- wall_seconds / pages_per_second: 処理全体の時間と、1秒あたりのHTTPリクエスト数
+- parse_ms_per_page: 1ページあたりのHTML解析時間（BeautifulSoup の構築とリンクのストリーム解析）
+- peak_rss_mb: プロセスの最大常駐メモリ
+- peak_traced_mb: tracemalloc で追跡したPythonオブジェクトの最大確保量（計測の影響を避けるため別の回で計測）
+- jobs: 抽出できた求人数
+
+実行: python -m benchmarks.bench_extractors --scales 10,100,1000,10000
+--corpus に record_corpus.py で記録したコーパスを渡すと、その一覧・詳細ページで計測する（省略時はテストデータから合成）
+結果は benchmarks/results/ にJSONで保存される。--baseline に前回の結果を渡すと差分を表示する
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fixture_server import FixtureServer, generate_corpus, load_corpus
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+
+# ベースラインより遅い・大きいと判定する比率
+REGRESSION_THRESHOLD = 1.2
+
+def run_simple_html(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    from src.extractors.http_cache import HttpCache
+    from src.extractors.simple_html_extractor import SimpleJobExtractor
+    return SimpleJobExtractor(http_cache=HttpCache(cache_dir), base_url=base_url).extract_all_jobs(url)
+
+def run_simple_html_root(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    # app.py が使うリポジトリ直下のコピー
+    from simple_html_extractor import SimpleJobExtractor
+    from src.extractors.http_cache import HttpCache
+    return SimpleJobExtractor(http_cache=HttpCache(cache_dir), base_url=base_url).extract_all_jobs(url)
+
+def run_complete(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    from src.extractors.complete_job_extractor import CompleteJobExtractor
+    from src.extractors.http_cache import HttpCache
+    extractor = CompleteJobExtractor(max_workers=8, requests_per_second=None,
+                                     http_cache=HttpCache(cache_dir), base_url=base_url)
+    return extractor.extract_all_jobs(url)
+
+def run_complete_pipelined(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    # 解析は子プロセスで行うため、解析時間・メモリの計測にはこのプロセスの分しか含まれない
+    from src.extractors.complete_job_extractor import CompleteJobExtractor
+    from src.extractors.http_cache import HttpCache
+    extractor = CompleteJobExtractor(max_workers=8, requests_per_second=None,
+                                     http_cache=HttpCache(cache_dir), base_url=base_url,
+                                     parse_workers=os.cpu_count() or 1)
+    return extractor.extract_all_jobs(url)
+
+def run_jposting(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    from src.extractors.http_cache import HttpCache
+    from src.extractors.jposting_extractor import JPOSTINGExtractor
+    return JPOSTINGExtractor(http_cache=HttpCache(cache_dir), base_url=base_url).extract_jobs(url)
+
+def run_enhanced(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    from src.extractors.enhanced_jposting_extractor import EnhancedJPOSTINGExtractor
+    from src.extractors.http_cache import HttpCache
+    # 求人数・ページ数の上限で打ち切らず、一覧から辿れる詳細ページをすべて取得させる
+    extractor = EnhancedJPOSTINGExtractor(max_jobs=sys.maxsize, max_depth=1, max_workers=8,
+                                          requests_per_second=None, max_pages=sys.maxsize,
+                                          http_cache=HttpCache(cache_dir), base_url=base_url)
+    return extractor.extract_all_jobs(url)
+
+def run_simple_extractor(base_url: str, url: str, cache_dir: str) -> List[Dict[str, str]]:
+    from src.extractors.simple_extractor import extract_jobs_from_url_simple
+    return extract_jobs_from_url_simple(url)
+
+EXTRACTORS: Dict[str, Callable[[str, str, str], List[Dict[str, str]]]] = {
+    'simple_html': run_simple_html,
+    'simple_html_root': run_simple_html_root,
+    'complete': run_complete,
+    'complete_pipelined': run_complete_pipelined,
+    'jposting': run_jposting,
+    'enhanced': run_enhanced,
+    'simple_extractor': run_simple_extractor,
+}
+
+class ParseTimer:
+    """HTML解析（BeautifulSoup の構築・リンクのストリーム解析）にかかった時間を集計する"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def install(self):
+        from bs4 import BeautifulSoup
+        from src.extractors.link_parser import _LinkStreamParser
+
+        self._wrap(BeautifulSoup, '__init__')
+        self._wrap(_LinkStreamParser, 'feed')
+
+    def _wrap(self, cls, name: str):
+        original = getattr(cls, name)
+        timer = self
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with timer._lock:
+                    timer.seconds += elapsed
+                    timer.pages += 1
+
+        setattr(cls, name, timed)
+
+class RequestCounter:
+    """共有トランスポートを通ったHTTPリクエスト数（再試行を除く）を数える"""
+
+    def __init__(self):
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def install(self):
+        from src.extractors.http_transport import HttpTransport
+        original = HttpTransport.request
+        counter = self
+
+        def counted(*args, **kwargs):
+            with counter._lock:
+                counter.requests += 1
+            return original(*args, **kwargs)
+
+        HttpTransport.request = counted
+
+def _run_worker(name: str, base_url: str, url: str, queue: multiprocessing.Queue):
+    """別プロセスで1つの抽出器を計測する（子プロセスの中で実行）"""
+    import contextlib
+    import io
+
+    run = EXTRACTORS[name]
+    parse_timer = ParseTimer()
+    request_counter = RequestCounter()
+    parse_timer.install()
+    request_counter.install()
+
+    result = {'extractor': name}
+    try:
+        # 1回目: 時間・メモリ（tracemalloc なし）
+        with tempfile.TemporaryDirectory() as cache_dir, contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            jobs = run(base_url, url, cache_dir)
+            wall = time.perf_counter() - started
+
+        result.update({
+            'jobs': len(jobs),
+            'wall_seconds': round(wall, 4),
+            'requests': request_counter.requests,
+            'pages_per_second': round(request_counter.requests / wall, 2) if wall else None,
+            'parsed_pages': parse_timer.pages,
+            'parse_ms_per_page': round(parse_timer.seconds / parse_timer.pages * 1000, 3) if parse_timer.pages else None,
+            'peak_rss_mb': round(_peak_rss_bytes() / 1024 / 1024, 2),
+        })
+
+        # 2回目: Pythonオブジェクトの確保量（新しいキャッシュで同じ処理を繰り返す）
+        with tempfile.TemporaryDirectory() as cache_dir, contextlib.redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            run(base_url, url, cache_dir)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        result['peak_traced_mb'] = round(peak / 1024 / 1024, 2)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    queue.put(result)
+
+def _peak_rss_bytes() -> int:
+    # Linux は KB、macOS はバイト単位
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def run_benchmarks(extractors: List[str], scales: List[int], latency: float = 0.0,
+                   encodings: Optional[List[str]] = None, timeout: float = 1800,
+                   corpus_dir: Optional[str] = None) -> Dict:
+    """
+    corpus_dir: record_corpus.py で記録したコーパス（Noneならテストデータから合成したページを使う）
+    """
+    if corpus_dir is None:
+        corpus = generate_corpus()
+    else:
+        corpus = load_corpus(corpus_dir)
+        if corpus is None:
+            raise FileNotFoundError(f"コーパスが見つかりません（manifest.json がありません）: {corpus_dir}")
+        print(f"📂 記録したコーパスを使用: {corpus_dir}（詳細ページ{len(corpus.details)}件）")
+    context = multiprocessing.get_context('spawn')
+    results = []
+
+    for scale in scales:
+        with FixtureServer(corpus, latency=latency, page_count=scale, encodings=encodings or ['utf-8']) as server:
+            print(f"\n📦 求人数 {scale}件: {server.listing_url}")
+            for name in extractors:
+                queue = context.Queue()
+                process = context.Process(target=_run_worker, args=(name, server.base_url, server.listing_url, queue))
+                process.start()
+                try:
+                    result = queue.get(timeout=timeout)
+                except Exception:
+                    result = {'extractor': name, 'error': 'timeout'}
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+
+                result['scale'] = scale
+                results.append(result)
+                _print_result(result)
+
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'latency': latency, 'encodings': encodings or ['utf-8'], 'scales': scales,
+                   'corpus': corpus_dir},
+        'results': results,
+    }
+
+def compare_with_baseline(report: Dict, baseline: Dict) -> List[str]:
+    """ベースラインより悪化した項目を返す（同じ抽出器・求人数どうしを比較）"""
+    previous = {(r['extractor'], r['scale']): r for r in baseline.get('results', [])}
+    regressions = []
+
+    print("\n📈 ベースラインとの比較")
+    for result in report['results']:
+        before = previous.get((result['extractor'], result['scale']))
+        if not before or 'error' in result or 'error' in before:
+            continue
+
+        line = [f"  {result['extractor']:<18} {result['scale']:>6}件"]
+        for metric in ('wall_seconds', 'parse_ms_per_page', 'peak_rss_mb', 'peak_traced_mb'):
+            if not before.get(metric) or result.get(metric) is None:
+                continue
+            ratio = result[metric] / before[metric]
+            line.append(f"{metric}={ratio:.2f}x")
+            if ratio > REGRESSION_THRESHOLD:
+                regressions.append(f"{result['extractor']} {result['scale']}件 {metric}: {before[metric]} → {result[metric]}")
+        if result.get('jobs') != before.get('jobs'):
+            regressions.append(f"{result['extractor']} {result['scale']}件 jobs: {before.get('jobs')} → {result.get('jobs')}")
+        print(' '.join(line))
+
+    for regression in regressions:
+        print(f"  ⚠️ 悪化: {regression}")
+    return regressions
+
+def _print_result(result: Dict):
+    if 'error' in result:
+        print(f"  ❌ {result['extractor']:<18} {result['error']}")
+        return
+    parse = f"{result['parse_ms_per_page']:.2f}ms" if result['parse_ms_per_page'] is not None else '-'
+    print(f"  {result['extractor']:<18} 求人{result['jobs']:>6}件  {result['wall_seconds']:8.2f}秒  "
+          f"{result['pages_per_second'] or 0:8.1f}ページ/秒  解析{parse:>9}/ページ  "
+          f"RSS {result['peak_rss_mb']:7.1f}MB  確保 {result['peak_traced_mb']:7.1f}MB")
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="抽出器のスループット・メモリのベンチマーク")
+    parser.add_argument('--extractors', default=','.join(EXTRACTORS), help=f"カンマ区切り: {','.join(EXTRACTORS)}")
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in DEFAULT_SCALES), help="一覧に載せる求人数（カンマ区切り）")
+    parser.add_argument('--latency', type=float, default=0.0, help="フィクスチャサーバーの応答遅延（秒）")
+    parser.add_argument('--encodings', default='utf-8', help="詳細ページの文字コード（カンマ区切り）")
+    parser.add_argument('--output', default=None, help="結果のJSONファイル（省略時は benchmarks/results/ に保存）")
+    parser.add_argument('--baseline', default=None, help="比較する前回の結果のJSONファイル")
+    parser.add_argument('--corpus', default=None, metavar='DIR',
+                        help="record_corpus.py で記録したコーパス（省略時はテストデータから合成）")
+    args = parser.parse_args()
+
+    extractors = [name.strip() for name in args.extractors.split(',') if name.strip()]
+    unknown = [name for name in extractors if name not in EXTRACTORS]
+    if unknown:
+        parser.error(f"未対応の抽出器: {', '.join(unknown)}")
+
+    try:
+        report = run_benchmarks(
+            extractors,
+            [int(scale) for scale in args.scales.split(',') if scale.strip()],
+            latency=args.latency,
+            encodings=[encoding.strip() for encoding in args.encodings.split(',') if encoding.strip()],
+            corpus_dir=args.corpus
+        )
+    except FileNotFoundError as e:
+        parser.error(str(e))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"extractors-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果を保存: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_with_baseline(report, json.load(f))
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+キーワード分類器のマイクロベンチマーク
+従来の any(keyword in text ...) ループと KeywordClassifier の速度・判定結果を比較する
+
+実行: python -m benchmarks.bench_keyword_classifier
+"""
+
+import timeit
+from typing import Callable, List
+
+from src.extractors.keyword_classifier import get_shared_classifier
+from src.test_data import (BUSINESS_JOBS, DEFENSE_SPACE_JOBS, IT_DIGITAL_JOBS,
+                           MANUFACTURING_JOBS, POWER_ENGINEERING_JOBS)
+
+# 従来実装のキーワード表
+ENHANCED_TITLE_KEYWORDS = [
+    'エンジニア', '技術者', '開発', '設計', '営業', '企画', '管理',
+    '【', '】', 'システム', 'ソフト', 'ハード', '製造', '品質',
+    'プロジェクト', 'マネージャー', '主任', '課長', '部長', '担当',
+    '正社員', '契約', '派遣', 'WEB面接', '東京', '大阪', '神戸'
+]
+COMPLETE_CATEGORY_KEYWORDS = {
+    'エンジニア': 'エンジニア系', '開発': 'エンジニア系', '設計': 'エンジニア系',
+    '営業': 'ビジネス系', '企画': 'ビジネス系', '人事': 'ビジネス系', 'マーケティング': 'ビジネス系',
+    '製造': '製造系', '品質': '製造系', '生産': '製造系'
+}
+
+def loop_title(text: str) -> bool:
+    return any(indicator in text for indicator in ENHANCED_TITLE_KEYWORDS)
+
+def loop_complete_category(text: str):
+    text = text.lower()
+    for keyword, category in COMPLETE_CATEGORY_KEYWORDS.items():
+        if keyword.lower() in text:
+            return category
+    return None
+
+def loop_simple_category(title: str) -> str:
+    title = title.lower()
+    if any(keyword in title for keyword in ['エンジニア', '開発', '設計', '技術']):
+        return 'エンジニア系'
+    elif any(keyword in title for keyword in ['営業', '企画', '人事', '採用', 'マーケティング']):
+        return 'ビジネス系'
+    elif any(keyword in title for keyword in ['製造', '生産', '品質', '組立']):
+        return '製造・生産系'
+    elif any(keyword in title for keyword in ['it', 'システム', 'ai', 'dx', 'デジタル']):
+        return 'IT・デジタル系'
+    return 'その他'
+
+def build_samples() -> List[str]:
+    """テストデータのタイトル・説明と、キーワードを含まない行を混ぜたサンプル"""
+    jobs = POWER_ENGINEERING_JOBS + DEFENSE_SPACE_JOBS + MANUFACTURING_JOBS + BUSINESS_JOBS + IT_DIGITAL_JOBS
+    samples = []
+    for job in jobs:
+        samples.append(job['title'])
+        samples.append(job.get('description', ''))
+    samples += ['応募方法はこちら', 'Copyright (c) Mitsubishi Electric', 'よくある質問', '会社概要'] * 10
+    return samples
+
+def bench(name: str, func: Callable, samples: List[str], number: int = 200) -> float:
+    seconds = timeit.timeit(lambda: [func(text) for text in samples], number=number)
+    per_call_us = seconds / (number * len(samples)) * 1e6
+    print(f"  {name:<28} {per_call_us:8.3f} µs/件")
+    return per_call_us
+
+def main():
+    samples = build_samples()
+    print(f"🔬 キーワード判定ベンチマーク（{len(samples)}件 x 200回）")
+
+    enhanced_title = get_shared_classifier('enhanced_title')
+    complete_categories = get_shared_classifier('complete_category')
+    simple_categories = get_shared_classifier('simple_category')
+    cases = [
+        ('タイトル判定(enhanced)', loop_title, enhanced_title.matches),
+        ('カテゴリ判定(complete)', loop_complete_category, complete_categories.first),
+        ('カテゴリ集計(simple)', loop_simple_category, lambda text: simple_categories.first(text) or 'その他'),
+    ]
+
+    for name, loop_func, classifier_func in cases:
+        mismatches = [text for text in samples if loop_func(text) != classifier_func(text)]
+        print(f"\n{name}: 判定不一致 {len(mismatches)}件")
+        loop_us = bench('anyループ', loop_func, samples)
+        classifier_us = bench('KeywordClassifier', classifier_func, samples)
+        print(f"  速度比: {loop_us / classifier_us:.2f}x")
+
+if __name__ == "__main__":
+    main()
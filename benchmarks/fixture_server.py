@@ -0,0 +1,340 @@
+"""
+JPOSTING採用サイトの代わりになるローカルのフィクスチャサーバー
+記録したコーパス（一覧ページ・詳細ページ）を返し、ネットワークのない環境でも抽出器を動かして計測できる
+
+- 遅延（latency + ランダムなjitter）とエラー率（503 + Retry-After）を設定できる
+- 一覧に載せる求人数（page_count）を増やすと、詳細ページを使い回して求人を水増しする
+- 詳細ページは UTF-8 / EUC-JP / Shift_JIS を求人番号ごとに切り替えて返せる
+- ETag を付けるため、条件付きGET（304）の効果も計測できる
+
+コーパス（benchmarks/record_corpus.py で記録）がなければ src/test_data の求人から合成する
+
+実行: python -m benchmarks.fixture_server --port 8800 --latency 0.05 --error-rate 0.02 --pages 400
+抽出器・アプリからは JPOSTING_BASE_URL=http://127.0.0.1:8800 を指定して参照する
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, NamedTuple, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from src.extractors.html_decoding import decode_html
+from src.extractors.jposting_site import DEFAULT_COMPANY
+from src.test_data import (BUSINESS_JOBS, DEFENSE_SPACE_JOBS, IT_DIGITAL_JOBS,
+                           MANUFACTURING_JOBS, POWER_ENGINEERING_JOBS)
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+# 詳細ページの文字コードの切り替えに使えるコーデック
+FIXTURE_ENCODINGS = ('utf-8', 'euc_jp', 'shift_jis')
+CHARSET_LABELS = {'utf-8': 'UTF-8', 'euc_jp': 'EUC-JP', 'shift_jis': 'Shift_JIS'}
+
+META_CHARSET_PATTERN = re.compile(r'(<meta[^>]+charset\s*=\s*["\']?\s*)[A-Za-z0-9_\-]+', re.IGNORECASE)
+
+# 水増しした求人の求人番号（記録済みの番号と重ならないように大きな番号から振る）
+SYNTHETIC_CODE_START = 900000
+
+class FixtureCorpus(NamedTuple):
+    listing_html: Optional[str]  # 記録した一覧ページ（合成コーパスではNone）
+    details: Dict[str, str]      # 求人番号 -> 詳細ページのHTML（記録順）
+
+def load_corpus(corpus_dir: str = DEFAULT_CORPUS_DIR) -> Optional[FixtureCorpus]:
+    """
+    record_corpus.py で記録したコーパスを読み込む（なければNone）
+    記録時の文字コードのまま保存されているため、ここで文字列にデコードしておく
+    """
+    manifest_path = os.path.join(corpus_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    def read_page(entry: Dict[str, str]) -> str:
+        with open(os.path.join(corpus_dir, entry['file']), 'rb') as f:
+            content = f.read()
+        return decode_html(content, content_type=entry.get('content_type')).text
+
+    listing = read_page(manifest['listing'])
+    details = {code: read_page(entry) for code, entry in manifest['details'].items()}
+    return FixtureCorpus(listing, details)
+
+def generate_corpus(count: int = 40) -> FixtureCorpus:
+    """src/test_data の求人から詳細ページを合成する（記録したコーパスがない場合）"""
+    jobs = POWER_ENGINEERING_JOBS + DEFENSE_SPACE_JOBS + MANUFACTURING_JOBS + BUSINESS_JOBS + IT_DIGITAL_JOBS
+    details = {}
+    for i in range(count):
+        job = jobs[i % len(jobs)]
+        code = str(100000 + i)
+        location = re.search(r'【([^/】]+)', job['title'])
+        details[code] = render_detail_page(job['title'], job.get('description', ''),
+                                           location.group(1) if location else '東京', code)
+    return FixtureCorpus(None, details)
+
+def render_detail_page(title: str, description: str, location: str, job_code: str) -> str:
+    """採用サイトの詳細ページに近い構造のHTML"""
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=UTF-8">
+<title>求人詳細 | 三菱電機 キャリア採用</title>
+</head>
+<body>
+<div id="header"><a href="job.phtml">求人一覧</a></div>
+<div class="main">
+<h1>求人詳細</h1>
+<h2>{html.escape(title)}</h2>
+<table class="job-table">
+<tr><th>職種名</th><td>{html.escape(title)}</td></tr>
+<tr><th>勤務地</th><td>{html.escape(location)}</td></tr>
+<tr><th>仕事内容</th><td><p class="job-description">{html.escape(description)}</p></td></tr>
+</table>
+<form action="entry.phtml" method="post"><input type="hidden" name="job_code" value="{job_code}"></form>
+</div>
+<div id="footer">Copyright (c) Mitsubishi Electric Corporation. All Rights Reserved.</div>
+</body>
+</html>
+"""
+
+def render_listing_page(entries: Sequence[tuple]) -> str:
+    """(求人番号, タイトル) の一覧ページ"""
+    rows = "\n".join(
+        f'<tr><td><a href="job.phtml?job_code={code}">{html.escape(title)}</a></td></tr>'
+        for code, title in entries
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=UTF-8">
+<title>求人一覧 | 三菱電機 キャリア採用</title>
+</head>
+<body>
+<h1>求人一覧</h1>
+<table class="job-list">
+{rows}
+</table>
+</body>
+</html>
+"""
+
+class FixtureSite:
+    """コーパスからサーバーが返すページ（一覧・求人番号ごとの詳細）を組み立てる"""
+
+    def __init__(self, corpus: FixtureCorpus, page_count: Optional[int] = None,
+                 encodings: Sequence[str] = ('utf-8',)):
+        for encoding in encodings:
+            if encoding not in FIXTURE_ENCODINGS:
+                raise ValueError(f"未対応の文字コード: {encoding}（{', '.join(FIXTURE_ENCODINGS)}）")
+        if not corpus.details:
+            raise ValueError("コーパスに詳細ページがありません")
+
+        self.encodings = list(encodings)
+        recorded = list(corpus.details.items())
+
+        # 求人番号 -> 返す詳細ページ（水増し分は記録済みのページを順に使い回す）
+        self.details: Dict[str, str] = {}
+        if page_count is None or page_count <= len(recorded):
+            for code, page in recorded[:page_count]:
+                self.details[code] = page
+        else:
+            self.details.update(recorded)
+            for i in range(page_count - len(recorded)):
+                self.details[str(SYNTHETIC_CODE_START + i)] = recorded[i % len(recorded)][1]
+
+        if corpus.listing_html and page_count is None:
+            self.listing_html = corpus.listing_html
+        else:
+            self.listing_html = render_listing_page([(code, self._title_of(page)) for code, page in self.details.items()])
+
+        self._code_index = {code: i for i, code in enumerate(self.details)}
+
+    def detail_encoding(self, job_code: str) -> str:
+        return self.encodings[self._code_index.get(job_code, 0) % len(self.encodings)]
+
+    @staticmethod
+    def _title_of(page: str) -> str:
+        match = re.search(r'<h2[^>]*>(.*?)</h2>', page, re.S) or re.search(r'<title>(.*?)</title>', page, re.S)
+        return html.unescape(re.sub(r'<[^>]+>', '', match.group(1))).strip() if match else '求人'
+
+def encode_page(page: str, encoding: str) -> bytes:
+    """meta charset を書き換えて指定の文字コードでエンコード（表せない文字は文字参照にする）"""
+    label = CHARSET_LABELS[encoding]
+    if META_CHARSET_PATTERN.search(page):
+        page = META_CHARSET_PATTERN.sub(lambda match: match.group(1) + label, page, count=1)
+    return page.encode(encoding, errors='xmlcharrefreplace')
+
+class FixtureServer:
+    def __init__(self, corpus: Optional[FixtureCorpus] = None, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, retry_after: int = 0,
+                 page_count: Optional[int] = None, encodings: Sequence[str] = ('utf-8',),
+                 company: str = DEFAULT_COMPANY, seed: int = 0):
+        """
+        latency / jitter: 応答までの遅延（秒）とランダムに加える最大の揺らぎ
+        error_rate: 503 を返す割合（0〜1）。retry_after は Retry-After ヘッダーの秒数
+        page_count: 一覧に載せる求人数（Noneなら記録したコーパスのまま）
+        encodings: 詳細ページの文字コード（求人番号ごとに順に切り替える）
+        """
+        corpus = corpus or load_corpus() or generate_corpus()
+        self.site = FixtureSite(corpus, page_count, encodings)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.company = company
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'listing': 0, 'detail': 0, 'errors': 0, 'not_modified': 0, 'not_found': 0}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def listing_url(self) -> str:
+        return f"{self.base_url}/{self.company}/u/job.phtml"
+
+    def start(self) -> str:
+        """バックグラウンドで起動して base_url を返す"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'FixtureServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path: str, if_none_match: Optional[str]) -> tuple:
+        """(ステータス, ヘッダー, 本文) を返す"""
+        self._count(requests=1)
+        self._sleep()
+
+        if self._should_fail():
+            self._count(errors=1)
+            return 503, {'Retry-After': str(self.retry_after), 'Content-Type': 'text/plain'}, b'Service Unavailable'
+
+        parts = urlsplit(path)
+        if parts.path.rstrip('/') not in (f"/{self.company}/u/job.phtml", f"/{self.company}/u"):
+            self._count(not_found=1)
+            return 404, {'Content-Type': 'text/plain'}, b'Not Found'
+
+        job_code = parse_qs(parts.query).get('job_code', [None])[0]
+        if job_code is None:
+            self._count(listing=1)
+            body, encoding = encode_page(self.site.listing_html, 'utf-8'), 'utf-8'
+        elif job_code in self.site.details:
+            self._count(detail=1)
+            encoding = self.site.detail_encoding(job_code)
+            body = encode_page(self.site.details[job_code], encoding)
+        else:
+            self._count(not_found=1)
+            return 404, {'Content-Type': 'text/plain'}, b'Not Found'
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        headers = {'Content-Type': f"text/html; charset={CHARSET_LABELS[encoding]}", 'ETag': etag}
+        if if_none_match == etag:
+            self._count(not_modified=1)
+            return 304, {'ETag': etag}, b''
+        return 200, headers, body
+
+    def _sleep(self):
+        if self.latency or self.jitter:
+            with self._random_lock:
+                jitter = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + jitter)
+
+    def _should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def _count(self, **deltas: int):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def _handler_class(self):
+        server = self
+
+        class FixtureHandler(BaseHTTPRequestHandler):
+            # keep-alive で接続を再利用できるようにする
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                status, headers, body = server.respond(self.path, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return FixtureHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="JPOSTING採用サイトのフィクスチャサーバー")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help="record_corpus.py で記録したコーパス")
+    parser.add_argument('--latency', type=float, default=0.0, help="応答までの遅延（秒）")
+    parser.add_argument('--jitter', type=float, default=0.0, help="遅延に加えるランダムな揺らぎの最大値（秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503を返す割合（0〜1）")
+    parser.add_argument('--retry-after', type=int, default=0, help="503のRetry-After（秒）")
+    parser.add_argument('--pages', type=int, default=None, help="一覧に載せる求人数")
+    parser.add_argument('--encodings', default='utf-8', help=f"詳細ページの文字コード（カンマ区切り: {','.join(FIXTURE_ENCODINGS)}）")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if corpus is None:
+        print(f"📄 コーパスがないためテストデータから合成します: {args.corpus}")
+        corpus = generate_corpus()
+
+    server = FixtureServer(
+        corpus, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, retry_after=args.retry_after, page_count=args.pages,
+        encodings=[encoding.strip() for encoding in args.encodings.split(',') if encoding.strip()],
+        seed=args.seed
+    )
+    server.start()
+    print(f"🚀 フィクスチャサーバー起動: {server.listing_url} （求人{len(server.site.details)}件）")
+    print(f"   JPOSTING_BASE_URL={server.base_url} を指定して抽出器・アプリから参照してください")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n📊 {server.stats}")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
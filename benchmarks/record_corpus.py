@@ -0,0 +1,75 @@
+"""
+フィクスチャサーバー用のコーパスを採用サイトから記録する
+一覧ページと詳細ページを受信したバイト列のまま保存する（文字コードの判定もオフラインで再現できる）
+
+実行: python -m benchmarks.record_corpus --limit 50
+保存先: benchmarks/corpus/（manifest.json, listing.html, details/<求人番号>.html）
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from benchmarks.fixture_server import DEFAULT_CORPUS_DIR
+from src.extractors.http_transport import get_shared_transport
+from src.extractors.jposting_site import detail_url, listing_url
+from src.extractors.rate_limiter import HostRateLimiter
+
+JOB_CODE_PATTERN = re.compile(rb'job_code=(\d+)')
+
+def record_corpus(corpus_dir: str = DEFAULT_CORPUS_DIR, limit: int = 50, requests_per_second: float = 1.0):
+    transport = get_shared_transport()
+    rate_limiter = HostRateLimiter(requests_per_second)
+    os.makedirs(os.path.join(corpus_dir, 'details'), exist_ok=True)
+
+    url = listing_url()
+    print(f"📥 一覧ページを記録中: {url}")
+    response = transport.get(url, timeout=15, rate_limiter=rate_limiter)
+    response.raise_for_status()
+
+    manifest = {
+        'source': url,
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'listing': _save(corpus_dir, 'listing.html', response),
+        'details': {},
+    }
+
+    # 一覧に現れた順に求人番号を取り出す
+    codes = list(dict.fromkeys(code.decode('ascii') for code in JOB_CODE_PATTERN.findall(response.content)))
+    print(f"📋 求人番号 {len(codes)}件のうち {min(limit, len(codes))}件の詳細ページを記録します")
+
+    for i, code in enumerate(codes[:limit], 1):
+        url = detail_url(code)
+        try:
+            response = transport.get(url, timeout=15, rate_limiter=rate_limiter)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  ❌ 求人コード{code}の記録エラー: {e}")
+            continue
+
+        manifest['details'][code] = _save(corpus_dir, os.path.join('details', f"{code}.html"), response)
+        if i % 10 == 0:
+            print(f"  📋 進捗: {i}/{min(limit, len(codes))}")
+
+    with open(os.path.join(corpus_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ 記録完了: 詳細ページ {len(manifest['details'])}件 → {corpus_dir}")
+
+def _save(corpus_dir: str, name: str, response) -> dict:
+    with open(os.path.join(corpus_dir, name), 'wb') as f:
+        f.write(response.content)
+    return {'file': name, 'content_type': response.headers.get('Content-Type')}
+
+def main():
+    parser = argparse.ArgumentParser(description="採用サイトからフィクスチャ用のコーパスを記録")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR)
+    parser.add_argument('--limit', type=int, default=50, help="記録する詳細ページの最大数")
+    parser.add_argument('--rps', type=float, default=1.0, help="採用サイトへの最大リクエスト数/秒")
+    args = parser.parse_args()
+    record_corpus(args.corpus, args.limit, args.rps)
+
+if __name__ == "__main__":
+    main()
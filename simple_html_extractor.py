@@ -2,112 +2,185 @@
 シンプル求人抽出器 - HTMLから直接全求人を取得
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
-from typing import List, Dict
+from collections import OrderedDict
+from typing import Any, Iterator, List, Dict, NamedTuple, Optional
+
+from src.extractors.crawl_metrics import get_metrics_registry
+from src.extractors.html_decoding import decode_html
+from src.extractors.http_cache import HttpCache, get_shared_cache
+from src.extractors.http_transport import HttpTransport, get_shared_transport
+from src.extractors.job_events import collect_jobs, job_event, progress_event
+from src.extractors.jposting_site import DEFAULT_BASE_URL, DEFAULT_COMPANY, job_directory_url
+from src.extractors.keyword_classifier import get_shared_classifier
+from src.extractors.link_parser import DEFAULT_LINK_PARSER, LINK_PARSER_MODES, extract_links
+
+JOB_CODE_PATTERN = re.compile(r'job_code=(\d+)')
+
+class ListingExtraction(NamedTuple):
+    jobs: List[Dict[str, str]]      # 求人番号ごとに1件にまとめた求人（一覧の順）
+    anchor_counts: Dict[str, int]   # 求人番号ごとに見つかったリンクの数（重複リンクの診断用）
 
 class SimpleJobExtractor:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, http_cache: Optional[HttpCache] = None, link_parser: str = DEFAULT_LINK_PARSER,
+                 transport: Optional[HttpTransport] = None, base_url: Optional[str] = None,
+                 company: Optional[str] = None):
+        """
+        link_parser: 一覧ページのリンク解析モード（'full' / 'strainer' / 'stream'）
+        base_url: 採用サイトのURL（省略時は JPOSTING_BASE_URL または本番サイト）
+        company: 採用サイト上の企業（テナント）のパス（省略時は JPOSTING_COMPANY または三菱電機）
+        """
+        if link_parser not in LINK_PARSER_MODES:
+            raise ValueError(f"未対応のリンク解析モード: {link_parser}")
+        self.link_parser = link_parser
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.company = company or DEFAULT_COMPANY
+        self.http_cache = http_cache or get_shared_cache()
+        self.transport = transport or get_shared_transport()
+        self.metrics = get_metrics_registry()
     
     def extract_all_jobs(self, url: str) -> List[Dict[str, str]]:
         """
         HTMLから直接全求人を抽出
         """
+        return collect_jobs(self.iter_jobs(url))
+    
+    def iter_jobs(self, url: str) -> Iterator[Dict[str, Any]]:
+        """
+        extract_all_jobs のイテレータ版: 求人・進捗をイベントとして順に返す
+        一覧ページ1枚から抽出するため、求人は一覧の解析が終わった時点から一覧の順に返す
+        一覧の進捗イベントには求人番号ごとのリンク数（anchor_counts）も付ける
+        """
+        jobs, anchor_counts = self._extract_listing(url)
+        yield dict(progress_event('listing', len(jobs), len(jobs)), anchor_counts=anchor_counts)
+        for job in jobs:
+            yield job_event(job)
+        yield progress_event('done', len(jobs), len(jobs))
+    
+    def _extract_listing(self, url: str) -> ListingExtraction:
+        """
+        一覧ページを取得して全求人を抽出
+        """
         print(f"🔍 求人データを取得中: {url}")
         
         try:
-            response = self.session.get(url, timeout=15)
-            
-            # 複数のエンコーディングを試す
-            encodings = ['euc-jp', 'shift_jis', 'utf-8']
-            soup = None
-            
-            for encoding in encodings:
-                try:
-                    response.encoding = encoding
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    test_text = soup.get_text()[:1000]
-                    
-                    # 文字化けチェック - 日本語の文字が正しく表示されているか
-                    if '�' not in test_text and any(char in test_text for char in 'あいうえおかきくけこ'):
-                        print(f"✅ エンコーディング {encoding} で読み込み成功")
-                        break
-                    
-                except:
-                    continue
-            
-            if not soup:
-                print("⚠️ 適切なエンコーディングが見つからないため、UTF-8で処理を続行")
-                response.encoding = 'utf-8'
-                soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 求人リンクから情報を抽出
-            jobs = self._extract_jobs_from_links(soup, url)
+            with self.metrics.page(url, 'simple_html') as record:
+                response = self.http_cache.get(self.transport, url, timeout=15)
+                
+                # 304（未更新）なら前回の解析結果をそのまま使う
+                cached = self.http_cache.load_parsed(response, 'simple_listing')
+                if cached is not None:
+                    print(f"♻️ 未更新のため前回の解析結果を再利用: {len(cached['jobs'])}件")
+                    return ListingExtraction(cached['jobs'], cached['anchor_counts'])
+                
+                # 文字コードを生のバイト列から1回だけ判定し、解析も1回だけ行う
+                with record.phase('decode'):
+                    decoded = decode_html(response.content, url, response.headers.get('Content-Type'))
+                record.encoding, record.encoding_attempts = decoded.encoding, decoded.attempts
+                print(f"✅ エンコーディング {decoded.encoding} で読み込み成功")
+                
+                # 求人リンクから情報を抽出
+                with record.phase('extract'):
+                    extraction = self._extract_jobs_from_links(decoded.text, url)
+                if extraction.jobs:
+                    self.http_cache.store_parsed(response, 'simple_listing', extraction._asdict())
             
-            print(f"📊 抽出完了: {len(jobs)}件の求人を取得")
-            return jobs
+            print(f"📊 抽出完了: {len(extraction.jobs)}件の求人を取得")
+            return extraction
             
         except Exception as e:
             print(f"❌ エラー: {e}")
-            return []
+            return ListingExtraction([], {})
     
-    def _extract_jobs_from_links(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+    def _extract_jobs_from_links(self, html: str, base_url: str, link_parser: Optional[str] = None) -> ListingExtraction:
         """
         求人リンクから情報を抽出
+        一覧ページには同じ求人へのリンクが複数あるため、求人番号をキーにした順序付き辞書で1件にまとめる
+        （リンク数に比例する時間で済む）。タイトルは重複リンクの中から _is_better_title で選ぶ
         """
-        jobs = []
+        jobs: 'OrderedDict[str, Dict[str, str]]' = OrderedDict()
+        anchor_counts: Dict[str, int] = {}
         
-        # job_codeを含むリンクを全て取得
-        links = soup.find_all('a', href=True)
+        # job_codeを含むリンクを全て取得（<a href> 以外は解析しない）
+        with self.metrics.phase('parse'):
+            links = extract_links(html, link_parser or self.link_parser)
         
-        for link in links:
-            href = link['href']
+        for href, link_text in links:
             
             # job_codeが含まれているリンクのみ処理
             if 'job_code=' in href:
                 try:
                     # job_codeを抽出
-                    job_code_match = re.search(r'job_code=(\d+)', href)
+                    job_code_match = JOB_CODE_PATTERN.search(href)
                     if job_code_match:
                         job_code = job_code_match.group(1)
+                        anchor_counts[job_code] = anchor_counts.get(job_code, 0) + 1
                         
                         # リンクのテキストを取得（これが求人タイトル）
-                        title = link.get_text().strip()
+                        title = link_text.strip()
                         
                         # 空でない、適切な長さのタイトルのみ採用
                         if title and len(title) > 5 and len(title) < 300:
+                            title = self._clean_title(title)
+                            
+                            # 同じ求人の2つ目以降のリンクはタイトルの比較だけ行う
+                            job_info = jobs.get(job_code)
+                            if job_info is not None:
+                                if self._is_better_title(title, job_info['title']):
+                                    job_info['title'] = title
+                                continue
+                            
                             # 完全なURLを構築
                             if href.startswith('http'):
                                 job_url = href
                             else:
-                                job_url = f"https://progres02.jposting.net/pgmitsubishielectric/u/{href}"
+                                job_url = job_directory_url(self.base_url, self.company) + href
                             
                             # 基本的な情報を含む求人オブジェクトを作成
-                            job_info = {
-                                'title': self._clean_title(title),
+                            jobs[job_code] = {
+                                'title': title,
                                 'url': job_url,
                                 'job_code': job_code,
                                 'source': 'direct_html'
                             }
-                            
-                            # 重複チェック
-                            if not any(job['job_code'] == job_code for job in jobs):
-                                jobs.append(job_info)
-                                
-                                # 進捗表示（最初の10件）
-                                if len(jobs) <= 10:
-                                    print(f"  {len(jobs):3d}. {title[:70]}...")
                 
                 except Exception as e:
                     print(f"  ⚠️ リンク解析エラー: {e}")
                     continue
         
-        return jobs
+        # 進捗表示（最初の10件、重複をまとめた後のタイトル）
+        for i, job_info in enumerate(list(jobs.values())[:10], 1):
+            print(f"  {i:3d}. {job_info['title'][:70]}...")
+        
+        duplicates = sum(anchor_counts.values()) - len(anchor_counts)
+        if duplicates:
+            print(f"  🔗 重複リンク{duplicates}件を{len(anchor_counts)}件の求人番号にまとめました")
+        
+        return ListingExtraction(list(jobs.values()), anchor_counts)
+    
+    @staticmethod
+    def _is_better_title(title: str, current: str) -> bool:
+        """
+        重複リンクのタイトルの比較: 今のタイトルが別のリンクのタイトルを含む（隣のセルなどのテキストが
+        混ざっている）場合だけ、含まれている短い方に置き換える。それ以外は先に見つかった方を残す
+        （長さは品質の目安にならないため、長い方を優先はしない）
+        """
+        return len(title) < len(current) and title in current
+    
+    def verify_link_parsers(self, html: str, base_url: str) -> Dict[str, bool]:
+        """
+        各リンク解析モードの抽出結果が従来の全体解析（full）と一致するか確認
+        """
+        expected = self._extract_jobs_from_links(html, base_url, link_parser='full')
+        results = {}
+        
+        for mode in LINK_PARSER_MODES:
+            actual = self._extract_jobs_from_links(html, base_url, link_parser=mode)
+            results[mode] = actual == expected
+            if not results[mode]:
+                print(f"⚠️ リンク解析モード {mode} の結果が一致しません: {len(actual.jobs)}件 / 期待値 {len(expected.jobs)}件")
+        
+        return results
     
     def _clean_title(self, title: str) -> str:
         """
@@ -141,17 +214,7 @@ class SimpleJobExtractor:
         }
         
         for job in jobs:
-            title = job['title'].lower()
-            
-            if any(keyword in title for keyword in ['エンジニア', '開発', '設計', '技術']):
-                categories['エンジニア系'] += 1
-            elif any(keyword in title for keyword in ['営業', '企画', '人事', '採用', 'マーケティング']):
-                categories['ビジネス系'] += 1
-            elif any(keyword in title for keyword in ['製造', '生産', '品質', '組立']):
-                categories['製造・生産系'] += 1
-            elif any(keyword in title for keyword in ['it', 'システム', 'ai', 'dx', 'デジタル']):
-                categories['IT・デジタル系'] += 1
-            else:
-                categories['その他'] += 1
+            category = get_shared_classifier('simple_category').first(job['title'])
+            categories[category or 'その他'] += 1
         
         return categories
@@ -0,0 +1 @@
+# catalog モジュール
@@ -0,0 +1,168 @@
+"""
+求人カタログのArrowスナップショット - カタログの各版をArrow IPCファイルとして公開する
+読み込み側はファイルをメモリマップして参照するため、プロセスやワーカーが増えても
+求人データはOSのページキャッシュで共有され、Pythonの辞書リストを各自で持たずに済む
+
+公開は一時ファイルへの書き込み → rename で行うため、読み込み側が書きかけのファイルを見ることはない
+"""
+
+import json
+import os
+import re
+import time
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional
+
+import pyarrow as pa
+
+from src.catalog.atomic_files import atomic_write, prune_files
+from src.catalog.job_record import Job
+
+DEFAULT_SNAPSHOT_DIR = os.environ.get('JOB_SNAPSHOT_DIR', os.path.join('.cache', 'snapshots'))
+
+LATEST_POINTER = 'LATEST'
+SNAPSHOT_PATTERN = re.compile(r'^catalog-(\d+)\.arrow$')
+
+class JobSnapshot(Sequence):
+    """
+    メモリマップしたスナップショットを求人辞書のリストのように扱う読み取り専用ビュー
+    求人（辞書と同じように読める Job）は要素にアクセスしたときに1件ずつ作る
+    """
+
+    def __init__(self, table: pa.Table, version: int, published_at: float, path: str = '',
+                 complete: bool = True, progress: Optional[Dict[str, int]] = None):
+        """
+        complete: 取得が完了した版か（Falseなら初回の取得途中に公開した一部の求人）
+        progress: 途中の版の進捗（{'done': 処理済み数, 'total': 全体数}）
+        """
+        self.table = table
+        self.version = version
+        self.published_at = published_at
+        self.path = path
+        self.complete = complete
+        self.progress = progress or {}
+        self._names = table.column_names
+        self._columns = [table.column(name) for name in self._names]
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"求人番号が範囲外です: {index}")
+
+        return Job.from_dict({name: column[index].as_py() for name, column in zip(self._names, self._columns)})
+
+    def __iter__(self) -> Iterator[Job]:
+        # バッチ単位で変換し、全件の求人を同時には持たない
+        for batch in self.table.to_batches():
+            for row in batch.to_pylist():
+                yield Job.from_dict(row)
+
+    def column(self, name: str) -> List[Optional[str]]:
+        """1項目だけを取り出す（存在しない項目は空リスト）"""
+        if name not in self._names:
+            return []
+        return self.table.column(name).to_pylist()
+
+class ArrowSnapshotStore:
+    def __init__(self, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, keep: int = 3):
+        """
+        keep: 残しておく過去のスナップショット数（読み込み中のプロセスが参照し続けられるように）
+        """
+        self.snapshot_dir = snapshot_dir
+        self.keep = max(1, keep)
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    def publish(self, jobs: List[Dict[str, str]], complete: bool = True,
+                progress: Optional[Dict[str, int]] = None) -> JobSnapshot:
+        """
+        求人一覧を新しい版として書き出し、最新版として公開する
+        complete=False は取得途中の一部の求人（初回の取得中に読み込み側へ早く見せるため）
+        """
+        version = (self.latest_version() or 0) + 1
+        published_at = time.time()
+        table = self._to_table(jobs, version, published_at, complete, progress)
+
+        path = self._snapshot_path(version)
+        atomic_write(path, lambda f: self._write_table(f, table))
+        atomic_write(
+            os.path.join(self.snapshot_dir, LATEST_POINTER),
+            lambda f: f.write(os.path.basename(path).encode('utf-8'))
+        )
+        self._prune(version)
+
+        print(f"📦 スナップショットを公開: {len(jobs)}件 (version {version}{'' if complete else ', 取得途中'})")
+        return self.load(version)
+
+    def latest_version(self) -> Optional[int]:
+        """公開済みの最新版の番号（未公開ならNone）"""
+        try:
+            with open(os.path.join(self.snapshot_dir, LATEST_POINTER), encoding='utf-8') as f:
+                match = SNAPSHOT_PATTERN.match(f.read().strip())
+        except OSError:
+            return None
+        return int(match.group(1)) if match else None
+
+    def load_latest(self) -> Optional[JobSnapshot]:
+        """最新版をメモリマップして読み込む"""
+        version = self.latest_version()
+        if version is None:
+            return None
+        try:
+            return self.load(version)
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"⚠️ スナップショットの読み込みエラー: {e}")
+            return None
+
+    def load(self, version: int) -> JobSnapshot:
+        path = self._snapshot_path(version)
+        # memory_map + IPCファイル形式ならバッファはコピーされずにマップ領域を直接参照する
+        source = pa.memory_map(path, 'r')
+        table = pa.ipc.open_file(source).read_all()
+
+        metadata = table.schema.metadata or {}
+        published_at = float(metadata.get(b'published_at', b'0'))
+        complete = metadata.get(b'complete', b'true') == b'true'
+        progress = json.loads(metadata[b'progress']) if b'progress' in metadata else None
+        return JobSnapshot(table, version, published_at, path, complete, progress)
+
+    def _to_table(self, jobs: List[Dict[str, str]], version: int, published_at: float,
+                  complete: bool = True, progress: Optional[Dict[str, int]] = None) -> pa.Table:
+        # 全求人に現れる項目を初出順に列にする（欠けている項目はnull）
+        names: Dict[str, None] = {}
+        for job in jobs:
+            for name in job:
+                names.setdefault(name, None)
+
+        columns = {name: pa.array([job.get(name) for job in jobs], type=pa.string()) for name in names}
+        table = pa.table(columns) if columns else pa.table({'title': pa.array([], type=pa.string())})
+        metadata = {
+            'version': str(version),
+            'published_at': repr(published_at),
+            'complete': 'true' if complete else 'false',
+        }
+        if progress:
+            metadata['progress'] = json.dumps(progress)
+        return table.replace_schema_metadata(metadata)
+
+    @staticmethod
+    def _write_table(f, table: pa.Table):
+        with pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+
+    def _snapshot_path(self, version: int) -> str:
+        return os.path.join(self.snapshot_dir, f"catalog-{version}.arrow")
+
+    def _prune(self, latest: int):
+        """新しい版から keep 個だけ残す（公開したばかりの版は残す）"""
+        def generation(name: str) -> Optional[int]:
+            match = SNAPSHOT_PATTERN.match(name)
+            return int(match.group(1)) if match else None
+
+        prune_files(self.snapshot_dir, self.keep, generation, protect=(self._snapshot_path(latest),))
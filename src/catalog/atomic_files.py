@@ -0,0 +1,56 @@
+"""
+公開ファイルの書き込みと世代管理 - スナップショット・埋め込み行列など、他のプロセスがメモリマップして読むファイル用
+- 書き込みは同じディレクトリの一時ファイルに書いてから置き換えるため、読み込み側が書きかけのファイルを見ることはない
+- 古い世代は keep 個を残して削除する。マップ済みのプロセスはLinuxでは削除後も読み続けられるため、
+  読み込み中の世代を消しても参照中のプロセスには影響しない
+"""
+
+import os
+import tempfile
+from typing import Any, BinaryIO, Callable, Iterable, List, Optional
+
+def atomic_write(path: str, write: Callable[[BinaryIO], Any]):
+    """
+    write(f) で一時ファイルに書き、ディスクに書き出してから path に置き換える
+    書き込みに失敗した場合は一時ファイルを消して例外をそのまま送出する（path は元のまま）
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f".{os.path.basename(path)}.",
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def prune_files(directory: str, keep: int, generation: Callable[[str], Optional[Any]],
+                protect: Iterable[str] = ()) -> List[str]:
+    """
+    directory 内の世代ファイルを新しい順に keep 個だけ残し、残りを削除する
+    generation: ファイル名 -> 世代の新しさ（大きいほど新しい。対象外のファイルはNone）
+    protect: 世代にかかわらず削除しないファイルのパス（公開したばかりのファイルなど）
+    戻り値: 削除したファイルのパス
+    """
+    files = []
+    for name in os.listdir(directory):
+        key = generation(name)
+        if key is not None:
+            files.append((key, os.path.join(directory, name)))
+
+    protected = {os.path.abspath(path) for path in protect}
+    removed = []
+    for _, path in sorted(files, key=lambda file: file[0], reverse=True)[max(1, keep):]:
+        if os.path.abspath(path) in protected:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed.append(path)
+    return removed
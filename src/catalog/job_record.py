@@ -0,0 +1,104 @@
+"""
+求人レコード - カタログが保持する1件分の求人を、辞書より小さい固定項目のオブジェクトで表す
+- 項目は __slots__ に持つため、1件ごとの辞書（キーのハッシュ表）を作らない
+- URLは求人番号から組み立てられる場合は共通の接頭辞だけを持ち、参照したときに組み立てる
+- 勤務地・カテゴリ・取得元など同じ値が繰り返し現れる項目は sys.intern で1つの文字列を共有する
+- 読み取り専用のMappingなので、job['title'] / job.get('url') / dict(job) など従来の辞書と同じように使える
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# 辞書に変換したときの項目の順序（抽出器が作る辞書と同じ並び）
+JOB_FIELDS = ('title', 'url', 'job_code', 'description', 'location', 'category', 'source', 'content_hash')
+
+# 説明文はこの長さ以下のもの（「詳細情報なし」などの既定値）だけinternする
+SHORT_TEXT_LENGTH = 16
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Job(Mapping):
+    __slots__ = ('title', 'job_code', 'description', 'location', 'category', 'source',
+                 'content_hash', '_url_prefix', '_url', 'extra')
+
+    def __init__(self, title: Optional[str] = None, url: Optional[str] = None, job_code: Optional[str] = None,
+                 description: Optional[str] = None, location: Optional[str] = None,
+                 category: Optional[str] = None, source: Optional[str] = None,
+                 content_hash: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        """
+        extra: JOB_FIELDS 以外の項目（抽出器が独自に付けた項目、なければNone）
+        """
+        self.title = title
+        self.job_code = job_code
+        self.description = (_intern(description)
+                            if description is not None and len(description) <= SHORT_TEXT_LENGTH
+                            else description)
+        # 勤務地・カテゴリ・取得元は多くの求人で同じ値なので常にinternする
+        self.location = _intern(location)
+        self.category = _intern(category)
+        self.source = _intern(source)
+        self.content_hash = content_hash
+        self.extra = extra or None
+
+        # 「...?job_code=<求人番号>」の形なら接頭辞だけを共有して持つ
+        if url and job_code and url.endswith(job_code) and len(url) > len(job_code):
+            self._url_prefix = sys.intern(url[:-len(job_code)])
+            self._url = None
+        else:
+            self._url_prefix = None
+            self._url = url
+
+    @property
+    def url(self) -> Optional[str]:
+        if self._url_prefix is not None:
+            return self._url_prefix + self.job_code
+        return self._url
+
+    @classmethod
+    def from_dict(cls, job: Mapping) -> 'Job':
+        """抽出器・ストアが返す求人辞書から作る（すでに Job ならそのまま返す）"""
+        if isinstance(job, Job):
+            return job
+        extra = {key: value for key, value in job.items() if key not in JOB_FIELDS and value is not None}
+        return cls(*(job.get(name) for name in JOB_FIELDS), extra=extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """従来の求人辞書に戻す（値がNoneの項目は含めない）"""
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        if key in JOB_FIELDS:
+            value = getattr(self, key)
+        elif self.extra is not None:
+            value = self.extra.get(key)
+        else:
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for name in JOB_FIELDS:
+            if getattr(self, name) is not None:
+                yield name
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Job({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (Job.from_dict, (self.to_dict(),))
+
+def jobs_from_dicts(jobs: Iterable[Mapping]) -> List[Job]:
+    """求人辞書のリストを Job のリストにする"""
+    return [Job.from_dict(job) for job in jobs]
+
+def jobs_to_dicts(jobs: Iterable[Mapping]) -> List[Dict[str, Any]]:
+    """Job（または求人辞書）のリストを従来の求人辞書のリストにする"""
+    return [job.to_dict() if isinstance(job, Job) else dict(job) for job in jobs]
@@ -0,0 +1,180 @@
+"""
+求人ストア - 抽出した求人をSQLite（WALモード）に永続化する
+再起動後もクロールを待たずに前回のカタログから起動でき、求人番号・カテゴリで索引検索できる
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from src.catalog.job_record import Job
+
+DEFAULT_STORE_PATH = os.environ.get('JOB_STORE_PATH', os.path.join('.cache', 'jobs.sqlite3'))
+
+# 専用の列を持つ項目（それ以外の項目は extra にJSONで保存する）
+JOB_COLUMNS = ('job_code', 'title', 'url', 'description', 'location', 'category', 'source', 'content_hash')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key TEXT PRIMARY KEY,
+    job_code TEXT,
+    title TEXT,
+    url TEXT,
+    description TEXT,
+    location TEXT,
+    category TEXT,
+    source TEXT,
+    content_hash TEXT,
+    extra TEXT,
+    position INTEGER NOT NULL,
+    crawled_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_job_code ON jobs (job_code);
+CREATE INDEX IF NOT EXISTS idx_jobs_category ON jobs (category);
+CREATE INDEX IF NOT EXISTS idx_jobs_position ON jobs (position);
+"""
+
+class JobStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Streamlitの各スクリプトスレッドから使うため、1つの接続をロックで共有する
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+
+    def upsert_jobs(self, jobs: Iterable[Dict[str, str]], crawled_at: Optional[float] = None) -> int:
+        """
+        求人をまとめて追加・更新（求人番号、なければ取得元・URL・タイトルから作ったキーを主キーにする）
+        """
+        crawled_at = time.time() if crawled_at is None else crawled_at
+        rows = self._to_rows(jobs, crawled_at)
+
+        with self._lock, self._conn:
+            self._upsert_rows(rows)
+        return len(rows)
+
+    def sync_jobs(self, jobs: List[Dict[str, str]], crawled_at: Optional[float] = None) -> int:
+        """
+        カタログ全体を置き換える（今回の一覧にない求人は削除）
+        追加・更新と削除は1つのトランザクションで行い、読み込み側に新旧が混ざったカタログを見せない
+        """
+        crawled_at = time.time() if crawled_at is None else crawled_at
+        rows = self._to_rows(jobs, crawled_at)
+
+        with self._lock, self._conn:
+            self._upsert_rows(rows)
+            self._conn.execute('DELETE FROM jobs WHERE crawled_at < ?', (crawled_at,))
+        return len(rows)
+
+    def _upsert_rows(self, rows: List[tuple]):
+        """呼び出し側のトランザクション内で行をまとめて追加・更新する"""
+        self._conn.executemany(
+            """
+            INSERT INTO jobs (job_key, job_code, title, url, description, location, category, source,
+                              content_hash, extra, position, crawled_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (job_key) DO UPDATE SET
+                job_code = excluded.job_code, title = excluded.title, url = excluded.url,
+                description = excluded.description, location = excluded.location,
+                category = excluded.category, source = excluded.source,
+                content_hash = excluded.content_hash, extra = excluded.extra,
+                position = excluded.position, crawled_at = excluded.crawled_at
+            """,
+            rows
+        )
+
+    def load_jobs(self) -> List[Job]:
+        """保存済みの全求人を一覧の順序で返す（辞書と同じように読める Job）"""
+        with self._lock:
+            rows = self._conn.execute('SELECT * FROM jobs ORDER BY position, job_key').fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def get_by_job_code(self, job_code: str) -> Optional[Job]:
+        """求人番号で1件取得"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM jobs WHERE job_code = ? LIMIT 1', (job_code,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def get_by_category(self, category: str) -> List[Job]:
+        """カテゴリで絞り込み"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM jobs WHERE category = ? ORDER BY position, job_key', (category,)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def last_crawled_at(self) -> Optional[float]:
+        """最後に保存した時刻（空ならNone）"""
+        with self._lock:
+            return self._conn.execute('SELECT MAX(crawled_at) FROM jobs').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self):
+        """古いストアに後から追加した列を足す"""
+        existing = {row['name'] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+        if 'content_hash' not in existing:
+            self._conn.execute('ALTER TABLE jobs ADD COLUMN content_hash TEXT')
+
+    def _to_rows(self, jobs: Iterable[Dict[str, str]], crawled_at: float) -> List[tuple]:
+        rows = [self._to_row(job, position, crawled_at) for position, job in enumerate(jobs)]
+        return [row for row in rows if row is not None]
+
+    @staticmethod
+    def job_key(job: Dict[str, str]) -> Optional[str]:
+        """
+        求人の主キー: 求人番号、なければ取得元・URL・タイトルのハッシュ
+        （求人番号のない抽出器では、1つのページに複数の求人が載りURLが重なるため、URLだけでは区別できない）
+        """
+        if job.get('job_code'):
+            return job['job_code']
+        if not job.get('url') and not job.get('title'):
+            return None
+        key = '\x00'.join(job.get(name) or '' for name in ('source', 'url', 'title'))
+        return 'h:' + hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+    @classmethod
+    def _to_row(cls, job: Dict[str, str], position: int, crawled_at: float) -> Optional[tuple]:
+        job_key = cls.job_key(job)
+        if not job_key:
+            return None
+
+        extra = {key: value for key, value in job.items() if key not in JOB_COLUMNS}
+        return (
+            job_key,
+            *(job.get(column) for column in JOB_COLUMNS),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+            position,
+            crawled_at
+        )
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            title=row['title'],
+            url=row['url'],
+            job_code=row['job_code'],
+            description=row['description'],
+            location=row['location'],
+            category=row['category'],
+            source=row['source'],
+            content_hash=row['content_hash'],
+            extra=json.loads(row['extra']) if row['extra'] else None
+        )
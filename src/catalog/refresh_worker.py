@@ -0,0 +1,330 @@
+"""
+カタログ更新ワーカー - Streamlitのリクエスト処理とは別に、定期的にクロールしてスナップショットを公開する
+アプリは公開済みの最新版を読むだけなので、利用者の待ち時間にクロールの時間が含まれない
+
+- 別プロセスとして起動する: python -m src.catalog.refresh_worker --interval 3600
+- 外部のワーカーがいない場合は、アプリのプロセス内のスレッドとして同じワーカーを動かす
+- 同じスナップショットを更新するワーカーはロックファイルで1つに限られ、他はロックが空くまで待機する
+- 更新の要求（REFRESH_REQUEST ファイル）があれば、予定より前でも次の確認時に取得する
+- ローダーが iter_jobs() のイベントを返す場合、完了した版がまだない間は取得途中の求人も一定間隔で公開する
+- --companies を指定すると、複数企業のカタログを TenantScheduler で企業ごとに並行して更新する
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from src.catalog.arrow_snapshot import DEFAULT_SNAPSHOT_DIR, ArrowSnapshotStore, JobSnapshot
+from src.catalog.job_record import Job
+from src.catalog.job_store import DEFAULT_STORE_PATH, JobStore
+from src.extractors.crawl_metrics import DEFAULT_METRICS_LOG, configure_metrics_log
+
+try:
+    import fcntl
+except ImportError:  # Windows ではロックせずに動かす
+    fcntl = None
+
+DEFAULT_INTERVAL_SECONDS = float(os.environ.get('JOB_REFRESH_INTERVAL', 60 * 60))
+DEFAULT_POLL_SECONDS = 5.0
+DEFAULT_PARTIAL_SECONDS = 2.0
+
+LOCK_FILE = 'worker.lock'
+REFRESH_REQUEST_FILE = 'REFRESH_REQUEST'
+
+# ローダーの戻り値: 求人のリスト、または iter_jobs() のイベント列
+LoaderResult = Union[List[Dict[str, str]], Iterable[Dict[str, Any]]]
+
+class RefreshWorker:
+    def __init__(self, loader: Callable[[], LoaderResult], snapshots: ArrowSnapshotStore,
+                 store: Optional[JobStore] = None, interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+                 retry_seconds: float = 300, poll_seconds: float = DEFAULT_POLL_SECONDS,
+                 partial_seconds: float = DEFAULT_PARTIAL_SECONDS):
+        """
+        loader: 採用サイトから全求人を取得する関数（求人のリスト、または iter_jobs() のイベントを返す）
+        interval_seconds: 前回の取得からこの秒数が経ったら再取得する
+        retry_seconds: 取得に失敗した場合に再試行するまでの秒数
+        poll_seconds: 予定・更新要求・ロックを確認する間隔
+        partial_seconds: 完了した版がない間、取得途中の求人を公開する間隔
+        """
+        self.loader = loader
+        self.snapshots = snapshots
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+        self.partial_seconds = partial_seconds
+        self.runs = 0
+        # アプリが取得の完了を待つかどうかの判断に使う状態
+        self.crawling = False                   # このワーカーが取得中か
+        self.last_error: Optional[str] = None   # 直近の取得が失敗した理由（成功したらNone）
+        self._next_run_at: Optional[float] = None
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[JobSnapshot]:
+        """
+        1回取得して新しい版を公開する（失敗・0件の場合は公開済みの版をそのまま残してNone）
+        """
+        self.crawling = True
+        try:
+            return self._run_once()
+        finally:
+            self.crawling = False
+
+    def _run_once(self) -> Optional[JobSnapshot]:
+        started = time.perf_counter()
+        try:
+            jobs = self._collect(self.loader())
+        except Exception as e:
+            print(f"⚠️ カタログ更新エラー（公開済みの版を継続使用）: {e}")
+            self.last_error = f"{type(e).__name__}: {e}"
+            return None
+
+        if not jobs:
+            print("⚠️ 求人が0件のため公開済みの版を継続使用")
+            self.last_error = "求人が0件でした"
+            return None
+
+        if self.store is not None:
+            try:
+                self.store.sync_jobs(jobs)
+            except Exception as e:
+                print(f"⚠️ 求人ストアへの保存エラー: {e}")
+
+        try:
+            snapshot = self.snapshots.publish(jobs)
+        except Exception as e:
+            print(f"⚠️ スナップショットの公開エラー（公開済みの版を継続使用）: {e}")
+            self.last_error = f"{type(e).__name__}: {e}"
+            return None
+        self.runs += 1
+        self.last_error = None
+        print(f"🔄 カタログ更新完了: {len(jobs)}件 (version {snapshot.version}, {time.perf_counter() - started:.1f}秒)")
+        return snapshot
+
+    def _collect(self, result: LoaderResult) -> List[Dict[str, str]]:
+        """
+        ローダーの結果を求人のリストにする
+        イベント列の場合、完了した版がまだなければ（初回の取得）途中の求人を partial_seconds ごとに公開する
+        """
+        if isinstance(result, list):
+            return result
+
+        latest = self.snapshots.load_latest()
+        publish_partial = latest is None or not latest.complete
+
+        # 取得中に溜まる求人は辞書ではなく Job で持つ（1万件を超えるカタログでもワーカーのメモリを抑える）
+        jobs: List[Job] = []
+        progress: Dict[str, int] = {}
+        published_count = 0
+        published_at = time.monotonic()
+        for event in result:
+            if event['type'] == 'job':
+                jobs.append(Job.from_dict(event['job']))
+            elif event['type'] == 'progress':
+                progress = {'done': event['done'], 'total': event['total']}
+
+            if (publish_partial and len(jobs) > published_count and
+                    time.monotonic() - published_at >= self.partial_seconds):
+                self.snapshots.publish(jobs, complete=False, progress=progress)
+                published_count = len(jobs)
+                published_at = time.monotonic()
+
+        return jobs
+
+    def run_forever(self):
+        """stop() が呼ばれるまで、予定時刻または更新要求のたびに取得する"""
+        print(f"🛠️ カタログ更新ワーカー開始: {self.interval_seconds:.0f}秒ごと → {self.snapshots.snapshot_dir}")
+        try:
+            while not self._stop.is_set():
+                if self._acquire_lock():
+                    self._tick()
+                self._stop.wait(self.poll_seconds)
+        finally:
+            self._release_lock()
+
+    def start_in_background(self) -> threading.Thread:
+        """アプリのプロセス内で動かす（外部のワーカーがロックを持っている間は待機するだけ）"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='catalog-refresh', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _tick(self):
+        """
+        予定時刻または更新要求があれば取得する
+        ここで例外を外に出すとワーカーのスレッドが止まり以後更新されなくなるため、
+        失敗は記録して retry_seconds 後に再試行する
+        """
+        try:
+            if self._next_run_at is None:
+                self._next_run_at = self._first_run_at()
+
+            requested = consume_refresh_request(self.snapshots.snapshot_dir)
+            if not requested and time.time() < self._next_run_at:
+                return
+
+            snapshot = self.run_once()
+        except Exception as e:
+            print(f"⚠️ カタログ更新ワーカーのエラー（{self.retry_seconds:.0f}秒後に再試行）: {e}")
+            self.last_error = f"{type(e).__name__}: {e}"
+            snapshot = None
+        self._next_run_at = time.time() + (self.interval_seconds if snapshot else self.retry_seconds)
+
+    def _first_run_at(self) -> float:
+        """
+        起動直後の予定時刻（前回の取得から interval_seconds 後）
+        完了した版がまだなければ、保存済みのストアから先に公開してアプリがすぐ使えるようにする
+        """
+        last_crawled_at = self.store.last_crawled_at() if self.store is not None else None
+
+        latest = self.snapshots.load_latest()
+        if (latest is None or not latest.complete) and self.store is not None:
+            jobs = self.store.load_jobs()
+            if jobs:
+                print(f"💾 求人ストアの{len(jobs)}件をスナップショットとして公開")
+                latest = self.snapshots.publish(jobs)
+
+        # 完了した版がない（前回の初回取得が途中で止まった場合も含む）ならすぐに取得する
+        if latest is None or not latest.complete:
+            return time.time()
+        return (last_crawled_at or latest.published_at) + self.interval_seconds
+
+    def _acquire_lock(self) -> bool:
+        """同じスナップショットを更新するワーカーを1つに限る（取れなければ次の確認で再挑戦）"""
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            self._lock_file = True
+            return True
+
+        lock_file = open(os.path.join(self.snapshots.snapshot_dir, LOCK_FILE), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        print(f"🔒 カタログ更新の担当になりました (pid {os.getpid()})")
+        return True
+
+    def _release_lock(self):
+        if self._lock_file is not None and self._lock_file is not True:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+        self._lock_file = None
+        self._next_run_at = None
+
+def request_refresh(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR):
+    """担当のワーカーに、予定を待たずに取得するよう要求する（結果は待たない）"""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with open(os.path.join(snapshot_dir, REFRESH_REQUEST_FILE), 'w', encoding='utf-8') as f:
+        f.write(repr(time.time()))
+
+def consume_refresh_request(snapshot_dir: str) -> bool:
+    try:
+        os.remove(os.path.join(snapshot_dir, REFRESH_REQUEST_FILE))
+        return True
+    except FileNotFoundError:
+        return False
+
+def build_loader(extractor: str = 'simple_html', base_url: Optional[str] = None,
+                 company: Optional[str] = None, parse_workers: int = 0,
+                 job_store: Optional[JobStore] = None) -> Callable[[], LoaderResult]:
+    """
+    CLIで選んだ抽出器の iter_jobs() で全求人を取得するローダー
+    'simple_html': 一覧ページのリンクのみ（アプリと同じ） / 'complete': 詳細ページまで取得（2回目以降は差分）
+    parse_workers: 'complete' の詳細ページを解析するプロセス数（0なら取得スレッド内で解析）
+    job_store: 'complete' が再起動後の初回も本文が同じページの解析を省略するための保存済みの求人
+    """
+    from src.extractors.jposting_site import listing_url
+
+    url = listing_url(base_url, company)
+    if extractor == 'complete':
+        from src.extractors.complete_job_extractor import CompleteJobExtractor
+        complete = CompleteJobExtractor(base_url=base_url, company=company, parse_workers=parse_workers,
+                                        job_store=job_store)
+        return lambda: complete.iter_jobs(url, incremental=bool(complete.all_jobs))
+
+    from src.extractors.simple_html_extractor import SimpleJobExtractor
+    simple = SimpleJobExtractor(base_url=base_url, company=company)
+    return lambda: simple.iter_jobs(url)
+
+def main():
+    parser = argparse.ArgumentParser(description="求人カタログを定期的に取得してスナップショットを公開")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_SECONDS, help="取得間隔（秒）")
+    parser.add_argument('--retry', type=float, default=300, help="失敗時に再試行するまでの秒数")
+    parser.add_argument('--once', action='store_true', help="1回だけ取得して終了")
+    parser.add_argument('--extractor', choices=('simple_html', 'complete'), default='simple_html')
+    parser.add_argument('--base-url', default=None, help="採用サイトのURL（省略時は JPOSTING_BASE_URL）")
+    parser.add_argument('--company', default=None, help="企業のパス（省略時は JPOSTING_COMPANY）")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="complete の詳細ページを解析するプロセス数（0で取得スレッド内、-1でCPUコア数）")
+    parser.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help="求人ストアのパス（''で保存しない）")
+    parser.add_argument('--metrics-log', default=DEFAULT_METRICS_LOG,
+                        help="取得ごとの計測のJSONログ（'-'で標準エラー、''で出力しない。省略時は CRAWL_METRICS_LOG）")
+    parser.add_argument('--companies', default=None,
+                        help="複数企業のカタログを並行して更新する（カンマ区切りの企業のパス。complete で取得）")
+    parser.add_argument('--tenant-dir', default=None, help="--companies の企業ごとのカタログの保存先")
+    parser.add_argument('--max-connections', type=int, default=16, help="--companies の全企業合計の同時接続数")
+    args = parser.parse_args()
+
+    configure_metrics_log(args.metrics_log)
+
+    if args.companies:
+        run_tenants(args)
+        return
+
+    store = JobStore(args.store) if args.store else None
+    worker = RefreshWorker(
+        build_loader(args.extractor, args.base_url, args.company,
+                     (os.cpu_count() or 1) if args.parse_workers < 0 else args.parse_workers, store),
+        ArrowSnapshotStore(args.snapshot_dir),
+        store=store,
+        interval_seconds=args.interval,
+        retry_seconds=args.retry
+    )
+
+    if args.once:
+        raise SystemExit(0 if worker.run_once() else 1)
+
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        print("👋 カタログ更新ワーカーを終了")
+
+def run_tenants(args: argparse.Namespace):
+    """--companies: 企業ごとのカタログをTTL（--interval）を過ぎたものから並行して更新する"""
+    from src.catalog.tenant_scheduler import DEFAULT_TENANT_DIR, Tenant, TenantScheduler
+
+    companies = [company.strip() for company in args.companies.split(',') if company.strip()]
+    scheduler = TenantScheduler(
+        [Tenant(company, base_url=args.base_url) for company in companies],
+        max_connections=args.max_connections,
+        ttl_seconds=args.interval,
+        data_dir=args.tenant_dir or DEFAULT_TENANT_DIR,
+        retry_seconds=args.retry
+    )
+
+    if args.once:
+        results = scheduler.refresh_all()
+        raise SystemExit(0 if all(result['error'] is None for result in results.values()) else 1)
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("👋 テナント別の更新ループを終了")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+共有求人カタログ - サーバープロセスごとに1つだけ保持する求人データ
+全セッションが同じカタログを参照し、TTL経過後にのみ再取得する
+求人ストアがあれば起動時は保存済みのカタログから始め、取得結果をストアに保存する
+スナップショットを使う場合は、取得結果をArrowファイルとして公開し、メモリマップした版を参照する
+loader を省略すると読み込み専用になり、更新ワーカー（refresh_worker）が公開した最新版だけを参照する
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.catalog.arrow_snapshot import ArrowSnapshotStore
+from src.catalog.job_record import jobs_from_dicts
+from src.catalog.job_store import JobStore
+
+class SharedJobCatalog:
+    def __init__(self, loader: Optional[Callable[[], List[Dict[str, str]]]], ttl_seconds: float = 3600,
+                 store: Optional[JobStore] = None, snapshots: Optional[ArrowSnapshotStore] = None,
+                 poll_seconds: float = 5.0):
+        """
+        loader: 全求人を取得する関数（Noneなら取得せず、公開済みのスナップショットのみ読む）
+        poll_seconds: 他のプロセスが公開した新しい版を確認する間隔
+        """
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.snapshots = snapshots
+        self.poll_seconds = poll_seconds
+        self.version = 0
+        self.snapshot_version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._jobs: Sequence[Dict[str, str]] = []
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._background_refresh: Optional[threading.Thread] = None
+
+    def is_loaded(self) -> bool:
+        """一度でも求人データを取得できているか"""
+        return self._loaded_at is not None
+
+    def is_complete(self) -> bool:
+        """参照中の版が取得完了したものか（初回の取得途中に公開された版ならFalse）"""
+        return getattr(self._jobs, 'complete', True)
+
+    def progress(self) -> Dict[str, int]:
+        """取得途中の版の進捗（{'done': 処理済み数, 'total': 全体数}、完了した版なら空）"""
+        return getattr(self._jobs, 'progress', {})
+
+    def is_stale(self) -> bool:
+        """TTLを過ぎているか"""
+        if self._loaded_at is None:
+            return True
+        return time.time() - self._loaded_at >= self.ttl_seconds
+
+    def get_jobs(self) -> Sequence[Dict[str, str]]:
+        """
+        共有の求人リストを返す（コピーはしない）
+        初回のみ同期的に取得し、TTL切れの場合は古いデータを返しつつ裏で更新する
+        読み込み専用の場合は取得せず、新しい版が公開されていれば差し替える（未公開なら空）
+        """
+        if self.loader is None:
+            self.check_for_update()
+            return self._jobs
+
+        if not self.is_loaded() and not self._load_from_snapshot() and not self._load_from_store():
+            return self.refresh()
+
+        if self.is_stale():
+            self._start_background_refresh()
+
+        return self._jobs
+
+    def refresh(self) -> Sequence[Dict[str, str]]:
+        """
+        求人データを再取得して全セッションに反映（読み込み専用なら最新の公開版を読み直すだけ）
+        """
+        if self.loader is None:
+            self.check_for_update(force=True)
+            return self._jobs
+
+        requested_at = time.time()
+
+        with self._lock:
+            # 待っている間に他のセッションが更新済みならそれを使う
+            if self._loaded_at is not None and self._loaded_at >= requested_at:
+                return self._jobs
+
+            try:
+                jobs = self.loader()
+            except Exception as e:
+                if not self.is_loaded():
+                    raise
+                print(f"⚠️ カタログ更新エラー（前回のデータを継続使用）: {e}")
+                return self._jobs
+
+            if jobs:
+                self._loaded_at = time.time()
+                self._save_to_store(jobs)
+                self._jobs = self._publish_snapshot(jobs)
+                self.version += 1
+                print(f"📚 共有カタログを更新: {len(jobs)}件 (version {self.version})")
+            elif self.is_loaded():
+                print("⚠️ 求人が0件のため前回のデータを継続使用")
+
+            return self._jobs
+
+    def check_for_update(self, force: bool = False) -> bool:
+        """
+        公開済みの最新版が参照中の版より新しければメモリマップして差し替える
+        確認は poll_seconds に1回まで（force=True なら必ず確認する）
+        """
+        if self.snapshots is None:
+            return False
+
+        now = time.time()
+        if not force and self._checked_at is not None and now - self._checked_at < self.poll_seconds:
+            return False
+        self._checked_at = now
+
+        latest = self.snapshots.latest_version()
+        if latest is None or latest == self.snapshot_version:
+            return False
+
+        with self._lock:
+            if self.snapshot_version == latest:
+                return False
+            snapshot = self.snapshots.load_latest()
+            if not snapshot:
+                return False
+
+            self._jobs = snapshot
+            self._loaded_at = snapshot.published_at
+            self.snapshot_version = snapshot.version
+            self.version += 1
+            print(f"📦 スナップショットからカタログを読み込み: {len(snapshot)}件 (version {self.version})")
+            return True
+
+    def _load_from_snapshot(self) -> bool:
+        """公開済みの最新スナップショットがあればメモリマップして使う"""
+        return self.check_for_update(force=True) or self.is_loaded()
+
+    def _publish_snapshot(self, jobs: List[Dict[str, str]]) -> Sequence[Dict[str, str]]:
+        """
+        スナップショットとして公開し、以降はメモリマップした版を参照する
+        スナップショットを使わない（公開に失敗した）場合は、辞書より小さい Job のリストとして持つ
+        """
+        if self.snapshots is None:
+            return jobs_from_dicts(jobs)
+        try:
+            snapshot = self.snapshots.publish(jobs)
+            self.snapshot_version = snapshot.version
+            return snapshot
+        except Exception as e:
+            print(f"⚠️ スナップショットの公開エラー: {e}")
+            return jobs_from_dicts(jobs)
+
+    def _load_from_store(self) -> bool:
+        """
+        ストアに保存済みのカタログがあれば読み込む（TTLは前回の保存時刻から数える）
+        """
+        if self.store is None:
+            return False
+
+        with self._lock:
+            if self.is_loaded():
+                return True
+            try:
+                jobs = self.store.load_jobs()
+            except Exception as e:
+                print(f"⚠️ 求人ストアの読み込みエラー: {e}")
+                return False
+            if not jobs:
+                return False
+
+            self._jobs = jobs
+            self._loaded_at = self.store.last_crawled_at()
+            self.version += 1
+            print(f"💾 求人ストアからカタログを読み込み: {len(jobs)}件 (version {self.version})")
+            return True
+
+    def _save_to_store(self, jobs: List[Dict[str, str]]):
+        if self.store is None:
+            return
+        try:
+            self.store.sync_jobs(jobs, crawled_at=self._loaded_at)
+        except Exception as e:
+            print(f"⚠️ 求人ストアへの保存エラー: {e}")
+
+    def _start_background_refresh(self):
+        """TTL切れ時の更新をリクエスト処理とは別スレッドで実行"""
+        with self._thread_lock:
+            if self._background_refresh and self._background_refresh.is_alive():
+                return
+            self._background_refresh = threading.Thread(target=self.refresh, daemon=True)
+            self._background_refresh.start()
@@ -0,0 +1,189 @@
+"""
+テナント別クロールスケジューラー - 同じJPOSTING基盤に載っている複数企業の求人を並行して更新する
+- 企業（テナント）ごとに抽出器・レート制限・カタログ（求人ストアとスナップショット）を分ける
+- 全テナントで1つの接続プールを共有し、同時に送信中のリクエスト数に全体の上限をかける
+- 全テナントを同時に更新するため、全体の更新時間は各テナントの合計ではなく最も遅いテナントで決まる
+- run_forever() はTTLを過ぎたテナントを定期的に更新する（python -m src.catalog.refresh_worker --companies a,b）
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from src.catalog.arrow_snapshot import ArrowSnapshotStore
+from src.catalog.job_store import JobStore
+from src.catalog.shared_catalog import SharedJobCatalog
+from src.extractors.complete_job_extractor import CompleteJobExtractor
+from src.extractors.http_cache import HttpCache, get_shared_cache
+from src.extractors.http_transport import HttpTransport, create_session
+from src.extractors.jposting_site import listing_url
+
+# テナントごとのカタログの保存先（<DEFAULT_TENANT_DIR>/<company>/ に求人ストアとスナップショット）
+DEFAULT_TENANT_DIR = os.environ.get('JOB_TENANT_DIR', os.path.join('.cache', 'tenants'))
+DEFAULT_POLL_SECONDS = 5.0
+
+class Tenant(NamedTuple):
+    company: str                        # 採用サイトのURLの1階層目（例: pgmitsubishielectric）
+    base_url: Optional[str] = None      # 省略時は JPOSTING_BASE_URL または本番サイト
+    requests_per_second: float = 2.0    # このテナントへの最大リクエスト数/秒
+    max_workers: int = 4                # このテナントの詳細ページを並行取得するスレッド数
+
+class TenantScheduler:
+    def __init__(self, tenants: Iterable[Tenant] = (), max_connections: int = 16,
+                 ttl_seconds: float = 3600, data_dir: str = DEFAULT_TENANT_DIR,
+                 transport: Optional[HttpTransport] = None, http_cache: Optional[HttpCache] = None,
+                 retry_seconds: float = 300):
+        """
+        max_connections: 全テナント合計で同時に送信中にできるリクエスト数（接続数の上限）
+        ttl_seconds: 各テナントのカタログの再取得間隔
+        data_dir: テナントごとの求人ストア・スナップショットの保存先（Noneなら保存しない）
+        retry_seconds: 更新に失敗したテナントを再試行するまでの秒数
+        """
+        self.max_connections = max(1, max_connections)
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.data_dir = data_dir
+        self.transport = transport or HttpTransport(
+            session=create_session(pool_maxsize=self.max_connections),
+            max_concurrency=self.max_connections
+        )
+        self.http_cache = http_cache or get_shared_cache()
+        self.tenants: Dict[str, Tenant] = {}
+        self.last_refresh: Dict[str, Dict[str, Any]] = {}
+        self._extractors: Dict[str, CompleteJobExtractor] = {}
+        self._catalogs: Dict[str, SharedJobCatalog] = {}
+        # 更新に失敗したテナント -> 次に再試行してよい時刻
+        self._retry_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        for tenant in tenants:
+            self.add_tenant(tenant)
+
+    def add_tenant(self, tenant: Tenant) -> SharedJobCatalog:
+        """テナントを登録し、そのテナント専用のカタログを返す"""
+        with self._lock:
+            if tenant.company in self._catalogs:
+                return self._catalogs[tenant.company]
+
+            store, snapshots = None, None
+            if self.data_dir:
+                tenant_dir = os.path.join(self.data_dir, tenant.company)
+                store = JobStore(os.path.join(tenant_dir, 'jobs.sqlite3'))
+                snapshots = ArrowSnapshotStore(os.path.join(tenant_dir, 'snapshots'))
+
+            self.tenants[tenant.company] = tenant
+            self._extractors[tenant.company] = CompleteJobExtractor(
+                max_workers=tenant.max_workers,
+                requests_per_second=tenant.requests_per_second,
+                http_cache=self.http_cache,
+                transport=self.transport,
+                base_url=tenant.base_url,
+                company=tenant.company,
+                job_store=store
+            )
+
+            catalog = SharedJobCatalog(
+                lambda company=tenant.company: self._load_tenant(company),
+                ttl_seconds=self.ttl_seconds,
+                store=store,
+                snapshots=snapshots
+            )
+            self._catalogs[tenant.company] = catalog
+            return catalog
+
+    def get_catalog(self, company: str) -> SharedJobCatalog:
+        """テナントのカタログ（未登録ならKeyError）"""
+        return self._catalogs[company]
+
+    def companies(self) -> List[str]:
+        return list(self._catalogs)
+
+    def refresh_all(self, companies: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        指定したテナント（省略時は全テナント）のカタログを同時に更新する
+        1つのテナントの失敗は他のテナントに影響しない（前回のカタログを使い続ける）
+        """
+        companies = list(companies) if companies is not None else self.companies()
+        if not companies:
+            return {}
+
+        print(f"🏢 {len(companies)}社のカタログを並行更新 (同時接続上限 {self.max_connections})")
+        started = time.perf_counter()
+
+        # 各テナントの取得は接続数の枠とレート制限の待ちが大半なので、テナントごとに1スレッドを割り当てる
+        with ThreadPoolExecutor(max_workers=len(companies), thread_name_prefix='tenant') as executor:
+            results = dict(zip(companies, executor.map(self._refresh_tenant, companies)))
+
+        elapsed = time.perf_counter() - started
+        slowest = max(result['seconds'] for result in results.values())
+        total = sum(result['seconds'] for result in results.values())
+        print(f"✅ 全テナントの更新完了: {elapsed:.1f}秒 "
+              f"(最も遅いテナント {slowest:.1f}秒 / 順番に更新した場合 {total:.1f}秒)")
+
+        self.last_refresh.update(results)
+        return results
+
+    def refresh_stale(self) -> Dict[str, Dict[str, Any]]:
+        """TTLを過ぎたテナントだけを同時に更新する（失敗したテナントは retry_seconds が経つまで待つ）"""
+        now = time.time()
+        return self.refresh_all([company for company, catalog in list(self._catalogs.items())
+                                 if catalog.is_stale() and self._retry_at.get(company, 0.0) <= now])
+
+    def run_forever(self, poll_seconds: float = DEFAULT_POLL_SECONDS):
+        """stop() が呼ばれるまで、poll_seconds ごとにTTLを過ぎたテナントを更新する"""
+        print(f"🛠️ テナント別の更新ループ開始: {len(self._catalogs)}社 / {self.ttl_seconds:.0f}秒ごと")
+        while not self._stop.is_set():
+            try:
+                self.refresh_stale()
+            except Exception as e:
+                # ここで例外を外に出すとループが止まり、以後どのテナントも更新されなくなる
+                print(f"⚠️ テナント別の更新ループのエラー: {e}")
+            self._stop.wait(poll_seconds)
+
+    def start_in_background(self, poll_seconds: float = DEFAULT_POLL_SECONDS) -> threading.Thread:
+        """更新ループを別スレッドで動かす"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, args=(poll_seconds,),
+                                            name='tenant-refresh', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _refresh_tenant(self, company: str) -> Dict[str, Any]:
+        catalog = self._catalogs[company]
+        version = catalog.version
+        started = time.perf_counter()
+        try:
+            jobs = catalog.refresh()
+            error = None
+        except Exception as e:
+            # 初回取得の失敗（前回のカタログがない場合）のみここに来る
+            jobs, error = [], f"{type(e).__name__}: {e}"
+            print(f"❌ {company} のカタログ更新エラー: {e}")
+
+        # 取得に失敗すると（前回のカタログを使い続ける場合も）版が変わらずTTLを過ぎたままなので、間隔を空けて再試行する
+        if catalog.version == version:
+            self._retry_at[company] = time.time() + self.retry_seconds
+            error = error or "取得に失敗したため前回のカタログを継続使用"
+        else:
+            self._retry_at.pop(company, None)
+
+        seconds = time.perf_counter() - started
+        print(f"  🏢 {company}: {len(jobs)}件 (version {catalog.version}, {seconds:.1f}秒)")
+        return {'jobs': len(jobs), 'version': catalog.version, 'seconds': seconds, 'error': error}
+
+    def _load_tenant(self, company: str) -> List[Dict[str, str]]:
+        """テナントのカタログのローダー（2回目以降は差分更新）"""
+        tenant = self.tenants[company]
+        extractor = self._extractors[company]
+        url = listing_url(tenant.base_url, tenant.company)
+        return list(extractor.extract_all_jobs(url, incremental=bool(extractor.all_jobs)))
@@ -3,40 +3,162 @@
 377件すべての求人を取得・解析する
 """
 
-import requests
 from bs4 import BeautifulSoup
+import hashlib
+import multiprocessing
 import re
-from typing import List, Dict, Set
+import threading
 import time
+from typing import Any, Iterator, List, Dict, Set, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse, parse_qs
 import logging
 
+from src.extractors.crawl_metrics import FetchRecord, get_metrics_registry
+from src.extractors.html_decoding import decode_html
+from src.extractors.http_cache import HttpCache, get_shared_cache
+from src.extractors.http_transport import HttpTransport, get_shared_transport
+from src.extractors.job_events import job_event, progress_event
+from src.extractors.job_detail_parser import JobDetailParser, parse_detail_batch, parse_detail_pages
+from src.extractors.jposting_site import DEFAULT_BASE_URL, DEFAULT_COMPANY, detail_url
+from src.extractors.link_parser import extract_links
+from src.extractors.rate_limiter import HostRateLimiter
+
 class CompleteJobExtractor:
-    def __init__(self):
-        self.base_url = "https://progres02.jposting.net"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, max_workers: int = 4, requests_per_second: float = 2.0,
+                 http_cache: Optional[HttpCache] = None, transport: Optional[HttpTransport] = None,
+                 base_url: Optional[str] = None, company: Optional[str] = None,
+                 parse_workers: int = 0, parse_batch_size: int = 16, job_store=None):
+        """
+        max_workers: 詳細ページを並行取得するスレッド数
+        parse_workers: 詳細ページのデコード・解析を行うプロセス数（0なら取得スレッド内で解析）
+        parse_batch_size: 解析プロセスへ1回で渡すページ数（プロセス間通信の回数を減らす）
+        job_store: 前回保存した求人（content_hash 付き）を読み出す JobStore（再起動後の初回も本文が同じページの解析を省略する）
+        requests_per_second: 同一ホストへの最大リクエスト数/秒（トークンバケット）
+        http_cache: 条件付きGETのキャッシュ（省略時は共有キャッシュ）
+        transport: 接続プールと再試行ポリシー（省略時は共有トランスポート）
+        base_url: 採用サイトのURL（省略時は JPOSTING_BASE_URL または本番サイト）
+        company: 採用サイト上の企業（テナント）のパス（省略時は JPOSTING_COMPANY または三菱電機）
+        """
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.company = company or DEFAULT_COMPANY
+        self.http_cache = http_cache or get_shared_cache()
+        self.max_workers = max(1, max_workers)
+        self.parse_workers = max(0, parse_workers)
+        self.parse_batch_size = max(1, parse_batch_size)
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        # 詳細ページの解析（取得の状態を持たないため、解析プロセスでも同じものを使う）
+        self.detail_parser = JobDetailParser()
+        self.transport = transport or get_shared_transport()
+        self.metrics = get_metrics_registry()
         self.all_jobs: List[Dict[str, str]] = []
         self.job_codes: Set[str] = set()
+        # 一覧ページ上の各求人のエントリ（リンクテキスト）。差分更新の比較に使う
+        self.listing_entries: Dict[str, str] = {}
+        self.last_refresh_stats: Dict[str, int] = {}
+        self.job_store = job_store
+        # 求人コードごとの前回の抽出結果（本文のハッシュが同じなら解析せずに使う）
+        self.known_pages: Dict[str, Dict[str, str]] = {}
+        self._pages_skipped = 0
+        self._skip_lock = threading.Lock()
         
-    def extract_all_jobs(self, start_url: str) -> List[Dict[str, str]]:
+    def extract_all_jobs(self, start_url: str, incremental: bool = False) -> List[Dict[str, str]]:
         """
         377件すべての求人を取得
+        incremental=True の場合、前回取得分との差分（新規・一覧の記載が変わった求人）のみ詳細を取得する
+        """
+        for _ in self.iter_jobs(start_url, incremental):
+            pass
+        return self.all_jobs
+    
+    def iter_jobs(self, start_url: str, incremental: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        extract_all_jobs のイテレータ版: 求人は抽出でき次第（完了順に）、進捗は段階ごとにイベントとして返す
+        最後まで受け取ると self.all_jobs に job_code 順のカタログが入る
         """
         print("🚀 全求人取得を開始...")
+        started_at = time.time()
+        
+        previous_jobs = {job['job_code']: job for job in self.all_jobs}
+        previous_entries = self.listing_entries
+        self.known_pages = self._load_known_pages(previous_jobs)
+        self._pages_skipped = 0
+        self.job_codes = set()
+        self.listing_entries = {}
         
         # Step 1: メインページからすべての求人コードを収集
         self._collect_all_job_codes(start_url)
         
         print(f"📊 発見した求人コード数: {len(self.job_codes)}件")
+        yield progress_event('listing', len(self.job_codes), len(self.job_codes))
+        
+        if not self.job_codes and previous_jobs:
+            # 一覧の取得に失敗した場合は前回のデータを維持
+            print("⚠️ 求人コードを取得できなかったため前回のデータを維持")
+            self.job_codes = set(previous_jobs)
+            self.listing_entries = previous_entries
+            for job_info in self.all_jobs:
+                yield job_event(job_info)
+            yield progress_event('done', len(self.all_jobs), len(self.all_jobs))
+            return
+        
+        if incremental and previous_jobs:
+            previous_codes = set(previous_entries)
+            added = self.job_codes - previous_codes
+            removed = previous_codes - self.job_codes
+            updated = {
+                code for code in self.job_codes & previous_codes
+                if code not in previous_jobs or self.listing_entries.get(code) != previous_entries.get(code)
+            }
+            codes_to_fetch = added | updated
+        else:
+            added, removed, updated = set(self.job_codes), set(), set()
+            codes_to_fetch = self.job_codes
+            previous_jobs = {}
+        
+        # 詳細を取得しない求人（差分更新で変更なし）は先に返す
+        for job_code in sorted(self.job_codes - codes_to_fetch):
+            if job_code in previous_jobs:
+                yield job_event(previous_jobs[job_code])
+        
+        # Step 2: 各求人の詳細情報を取得（完了したものから返す）
+        fetched_jobs: Dict[str, Dict[str, str]] = {}
+        for done, (job_code, job_info) in enumerate(self._iter_job_details(codes_to_fetch), 1):
+            if job_info:
+                fetched_jobs[job_code] = job_info
+                yield job_event(job_info)
+            yield progress_event('details', done, len(codes_to_fetch))
+        
+        # 取得に失敗した更新分は前回のデータを使う
+        for job_code in sorted(codes_to_fetch - set(fetched_jobs)):
+            if job_code in previous_jobs:
+                yield job_event(previous_jobs[job_code])
         
-        # Step 2: 各求人の詳細情報を取得
-        self._fetch_job_details()
+        # job_code順に組み立て
+        self.all_jobs = []
+        for job_code in sorted(self.job_codes):
+            job_info = fetched_jobs.get(job_code) or previous_jobs.get(job_code)
+            if job_info:
+                self.all_jobs.append(job_info)
+        
+        self.last_refresh_stats = {
+            'added': len(added),
+            'removed': len(removed),
+            'updated': len(updated),
+            'unchanged': len(self.job_codes) - len(added) - len(updated),
+            'fetched': len(codes_to_fetch),
+            'pages_skipped': self._pages_skipped,
+        }
+        if incremental:
+            stats = self.last_refresh_stats
+            print(f"🔁 差分更新: 新規{stats['added']}件 / 削除{stats['removed']}件 / "
+                  f"更新{stats['updated']}件 / 変更なし{stats['unchanged']}件")
+        if self._pages_skipped:
+            print(f"♻️ 本文が前回と同じため解析を省略: {self._pages_skipped}/{len(codes_to_fetch)}ページ")
         
         print(f"✅ 取得完了: {len(self.all_jobs)}件の求人データを取得")
-        return self.all_jobs
+        self.metrics.print_summary('complete', since=started_at)
+        yield progress_event('done', len(self.all_jobs), len(self.all_jobs))
     
     def _collect_all_job_codes(self, url: str):
         """
@@ -44,27 +166,7 @@ class CompleteJobExtractor:
         """
         try:
             print(f"🔍 求人コード収集中: {url}")
-            response = self.session.get(url, timeout=15)
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 求人へのリンクを全て取得
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                # job_codeパラメータがあるリンクを探す
-                if 'job_code=' in href:
-                    # job_codeを抽出
-                    match = re.search(r'job_code=(\d+)', href)
-                    if match:
-                        job_code = match.group(1)
-                        self.job_codes.add(job_code)
-                        
-                        # デバッグ: 最初の10件のリンクテキストを表示
-                        if len(self.job_codes) <= 10:
-                            link_text = link.get_text().strip()[:50]
-                            print(f"  求人コード{job_code}: {link_text}...")
+            self._collect_listing_page(url, timeout=15, show_examples=True)
             
             print(f"📝 メインページから {len(self.job_codes)}件の求人コードを発見")
             
@@ -93,242 +195,266 @@ class CompleteJobExtractor:
                 test_url = base_url + param
                 print(f"  🔍 追加検索: {test_url}")
                 
-                response = self.session.get(test_url, timeout=10)
-                response.encoding = 'utf-8'
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
                 original_count = len(self.job_codes)
                 
-                # 新しい求人コードを探す
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if 'job_code=' in href:
-                        match = re.search(r'job_code=(\d+)', href)
-                        if match:
-                            self.job_codes.add(match.group(1))
+                self._collect_listing_page(test_url, timeout=10)
                 
                 new_count = len(self.job_codes)
                 if new_count > original_count:
                     print(f"    ✅ {new_count - original_count}件の追加求人を発見")
                 
-                time.sleep(0.5)  # レート制限
-                
             except Exception as e:
                 print(f"    ❌ 追加検索エラー: {e}")
     
-    def _fetch_job_details(self):
+    def _collect_listing_page(self, url: str, timeout: int, show_examples: bool = False):
         """
-        各求人の詳細情報を取得
+        一覧ページ1枚から求人コードとそのリンクテキストを収集
         """
-        print("🔄 求人詳細情報を取得中...")
-        
-        for i, job_code in enumerate(sorted(self.job_codes), 1):
-            try:
-                # プログレス表示
-                if i % 50 == 0 or i <= 10:
-                    print(f"  📋 進捗: {i}/{len(self.job_codes)} ({i/len(self.job_codes)*100:.1f}%)")
-                
-                job_url = f"{self.base_url}/pgmitsubishielectric/u/job.phtml?job_code={job_code}"
-                
-                response = self.session.get(job_url, timeout=10)
-                
-                # エンコーディングを複数試行
-                encodings = ['utf-8', 'shift_jis', 'euc-jp', 'iso-2022-jp']
-                soup = None
-                
-                for encoding in encodings:
-                    try:
-                        response.encoding = encoding
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        # 文字化けチェック: 日本語が正しく表示されているか
-                        test_text = soup.get_text()[:500]
-                        if '�' not in test_text and any(char in test_text for char in 'あいうえお'):
-                            break
-                    except:
-                        continue
-                
-                if not soup:
-                    # フォールバック: 生のHTMLから抽出を試行
-                    soup = BeautifulSoup(response.content, 'html.parser', from_encoding='shift_jis')
+        with self.metrics.page(url, 'complete') as record:
+            response = self.http_cache.get(self.transport, url, timeout=timeout, rate_limiter=self.rate_limiter)
+            
+            # 304（未更新）なら前回の収集結果を再利用
+            page_entries = self.http_cache.load_parsed(response, 'complete_listing')
+            if page_entries is None:
+                with record.phase('decode'):
+                    decoded = decode_html(response.content, url, response.headers.get('Content-Type'))
+                record.encoding, record.encoding_attempts = decoded.encoding, decoded.attempts
                 
-                # 求人情報を抽出
-                job_info = self._parse_job_page(soup, job_url, job_code)
+                # 求人へのリンクを全て取得（<a href> 以外は解析しない）
+                with record.phase('parse'):
+                    links = extract_links(decoded.text)
                 
-                if job_info:
-                    self.all_jobs.append(job_info)
+                with record.phase('extract'):
+                    link_texts: Dict[str, List[str]] = {}
+                    for href, link_text in links:
+                        # job_codeパラメータがあるリンクを探す
+                        if 'job_code=' in href:
+                            # job_codeを抽出
+                            match = re.search(r'job_code=(\d+)', href)
+                            if match:
+                                text = re.sub(r'\s+', ' ', link_text).strip()
+                                texts = link_texts.setdefault(match.group(1), [])
+                                if text and text not in texts:
+                                    texts.append(text)
+                    
+                    page_entries = {job_code: '\n'.join(sorted(texts)) for job_code, texts in link_texts.items()}
+                self.http_cache.store_parsed(response, 'complete_listing', page_entries)
+        
+        for job_code, entry in page_entries.items():
+            self.job_codes.add(job_code)
+            if entry or job_code not in self.listing_entries:
+                self.listing_entries[job_code] = entry
+            
+            # デバッグ: 最初の10件のリンクテキストを表示
+            if show_examples and len(self.job_codes) <= 10:
+                print(f"  求人コード{job_code}: {entry[:50]}...")
+    
+    def _iter_job_details(self, job_codes: Set[str]) -> Iterator[Tuple[str, Optional[Dict[str, str]]]]:
+        """
+        指定した求人の詳細情報を取得（スレッドプールで並行取得）
+        (job_code, 求人情報) を取得が完了した順に返す（失敗した求人の情報はNone）
+        """
+        if self.parse_workers:
+            yield from self._iter_job_details_pipelined(job_codes)
+            return
+        
+        print(f"🔄 求人詳細情報を取得中... ({len(job_codes)}件, 並列数: {self.max_workers})")
+        
+        job_codes = sorted(job_codes)
+        if not job_codes:
+            return
+        
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_job_detail, job_code): job_code for job_code in job_codes}
+            try:
+                for i, future in enumerate(as_completed(futures), 1):
+                    job_code, job_info = futures[future], future.result()
+                    
+                    # プログレス表示
+                    if i % 50 == 0 or i <= 10:
+                        print(f"  📋 進捗: {i}/{len(job_codes)} ({i/len(job_codes)*100:.1f}%)")
                     
                     # 最初の数件の詳細をログ出力
-                    if len(self.all_jobs) <= 5:
+                    if job_info:
+                        fetched += 1
+                        if fetched <= 5:
+                            print(f"    ✅ {job_info['title'][:60]}...")
+                    
+                    yield job_code, job_info
+            finally:
+                # 呼び出し側が途中で読むのをやめた場合は、まだ始まっていない取得を取り消す
+                executor.shutdown(cancel_futures=True)
+    
+    def _iter_job_details_pipelined(self, job_codes: Set[str]) -> Iterator[Tuple[str, Optional[Dict[str, str]]]]:
+        """
+        取得と解析を分けたパイプライン: スレッドは本文のダウンロードだけを行い、
+        受信したバイト列を parse_batch_size 件ずつ解析プロセスへ渡す（GILに縛られずにコア数だけ解析できる）
+        解析の済んだまとまりは、残りのダウンロードを待たずに返す
+        """
+        print(f"🔄 求人詳細情報を取得中... ({len(job_codes)}件, 取得スレッド: {self.max_workers}, "
+              f"解析プロセス: {self.parse_workers})")
+        
+        job_codes = sorted(job_codes)
+        if not job_codes:
+            return
+        
+        # 解析結果のキャッシュ保存と計測のため、解析が終わるまでレスポンスと記録を保持する
+        pending: Dict[str, Tuple[Any, FetchRecord, str]] = {}
+        batches = {}
+        batch: List[Tuple[str, str, bytes, Optional[str]]] = []
+        fetched = 0
+        
+        def finish_batch(future) -> Iterator[Tuple[str, Optional[Dict[str, str]]]]:
+            nonlocal fetched
+            try:
+                results = future.result()
+            except Exception as e:
+                # 解析プロセスが落ちた場合はこのプロセスで解析し直す
+                print(f"  ⚠️ 解析プロセスのエラー（このプロセスで解析します）: {e}")
+                results = parse_detail_pages(batches[future], self.detail_parser)
+            del batches[future]
+            
+            for job_code, job_info, encoding, encoding_attempts, timings in results:
+                response, record, content_hash = pending.pop(job_code)
+                # ページの記録は取得の時点で確定済みのため、解析の時間は後から加算する
+                record.encoding, record.encoding_attempts = encoding, encoding_attempts
+                for phase, seconds in timings.items():
+                    record.add(phase, seconds)
+                
+                if job_info:
+                    job_info['content_hash'] = content_hash
+                    self.http_cache.store_parsed(response, 'complete_detail', job_info)
+                    fetched += 1
+                    if fetched <= 5:
                         print(f"    ✅ {job_info['title'][:60]}...")
+                yield job_code, job_info
+        
+        # 取得スレッドが動いている状態で fork しないよう、解析プロセスは spawn で起動する
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=context) as parsers, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as downloaders:
+            downloads = {downloaders.submit(self._download_job_detail, job_code): job_code for job_code in job_codes}
+            try:
+                for i, future in enumerate(as_completed(downloads), 1):
+                    job_code = downloads[future]
+                    if i % 50 == 0 or i <= 10:
+                        print(f"  📋 取得: {i}/{len(job_codes)} ({i/len(job_codes)*100:.1f}%)")
+                    
+                    job_url, ready_job, response, record, content_hash = future.result()
+                    if response is not None:
+                        pending[job_code] = (response, record, content_hash)
+                        batch.append((job_code, job_url, response.content, response.headers.get('Content-Type')))
+                    else:
+                        # 304・本文が同じ・取得失敗は解析せずにそのまま返す
+                        yield job_code, ready_job
+                    
+                    if len(batch) >= self.parse_batch_size:
+                        batches[parsers.submit(parse_detail_batch, batch)] = batch
+                        batch = []
+                    
+                    for done in [batch_future for batch_future in batches if batch_future.done()]:
+                        yield from finish_batch(done)
                 
-                # レート制限（1秒間に2リクエスト程度）
-                time.sleep(0.5)
+                if batch:
+                    batches[parsers.submit(parse_detail_batch, batch)] = batch
                 
-            except Exception as e:
-                print(f"  ❌ 求人コード{job_code}の取得エラー: {e}")
-                continue
+                for future in as_completed(list(batches)):
+                    yield from finish_batch(future)
+            finally:
+                downloaders.shutdown(cancel_futures=True)
+                parsers.shutdown(cancel_futures=True)
     
-    def _parse_job_page(self, soup: BeautifulSoup, url: str, job_code: str) -> Dict[str, str]:
+    def _download_job_detail(self, job_code: str) -> Tuple[str, Optional[Dict[str, str]], Any, Optional[FetchRecord], Optional[str]]:
         """
-        個別求人ページから情報を抽出
+        パイプラインの取得スレッド: 詳細ページを取得するだけで解析はしない
+        戻り値: (URL, 304・本文が同じなら前回の抽出結果, 解析が必要なレスポンス, ページの記録, 本文のハッシュ)
         """
+        job_url = detail_url(job_code, self.base_url, self.company)
         try:
-            # タイトル抽出
-            title = self._extract_job_title(soup)
-            if not title:
-                return None
+            with self.metrics.page(job_url, 'complete') as record:
+                response = self.http_cache.get(self.transport, job_url, timeout=10, rate_limiter=self.rate_limiter)
             
-            # 説明文抽出
-            description = self._extract_job_description(soup)
+            cached_job = self.http_cache.load_parsed(response, 'complete_detail')
+            if cached_job is not None:
+                return job_url, cached_job, None, record, None
             
-            # 勤務地抽出
-            location = self._extract_job_location(soup)
+            content_hash = hash_page_content(response.content)
+            known_job = self._reuse_known_page(job_code, content_hash)
+            if known_job is not None:
+                return job_url, known_job, None, record, content_hash
+            return job_url, None, response, record, content_hash
             
-            # 職種・カテゴリ抽出
-            category = self._extract_job_category(soup)
+        except Exception as e:
+            print(f"  ❌ 求人コード{job_code}の取得エラー: {e}")
+            return job_url, None, None, None, None
+    
+    def _fetch_job_detail(self, job_code: str) -> Dict[str, str]:
+        """
+        1件の求人詳細ページを取得・解析（ワーカースレッドで実行）
+        """
+        try:
+            job_url = detail_url(job_code, self.base_url, self.company)
             
-            return {
-                'title': title,
-                'url': url,
-                'job_code': job_code,
-                'description': description or "詳細情報なし",
-                'location': location or "勤務地不明",
-                'category': category or "カテゴリ不明",
-                'source': 'jposting_complete'
-            }
+            # レート制限（ホストごとのトークンバケット）は再試行を含む各試行の前にトランスポートが待つ
+            with self.metrics.page(job_url, 'complete') as record:
+                response = self.http_cache.get(self.transport, job_url, timeout=10, rate_limiter=self.rate_limiter)
+                
+                # 304（未更新）ならデコード・解析を省略
+                cached_job = self.http_cache.load_parsed(response, 'complete_detail')
+                if cached_job is not None:
+                    return cached_job
+                
+                # 200でも本文が前回と同じなら前回の抽出結果を使う
+                content_hash = hash_page_content(response.content)
+                known_job = self._reuse_known_page(job_code, content_hash)
+                if known_job is not None:
+                    return known_job
+                
+                # 文字コードを生のバイト列から1回だけ判定（同一ホストは2件目以降判定を省略）
+                with record.phase('decode'):
+                    decoded = decode_html(response.content, job_url, response.headers.get('Content-Type'))
+                record.encoding, record.encoding_attempts = decoded.encoding, decoded.attempts
+                
+                with record.phase('parse'):
+                    soup = BeautifulSoup(decoded.text, 'html.parser')
+                
+                # 求人情報を抽出
+                with record.phase('extract'):
+                    job_info = self.detail_parser.parse(soup, job_url, job_code)
+                if job_info:
+                    job_info['content_hash'] = content_hash
+                    self.http_cache.store_parsed(response, 'complete_detail', job_info)
+                return job_info
             
         except Exception as e:
-            print(f"      ❌ 求人詳細解析エラー: {e}")
+            print(f"  ❌ 求人コード{job_code}の取得エラー: {e}")
             return None
     
-    def _extract_job_title(self, soup: BeautifulSoup) -> str:
-        """求人タイトルを抽出"""
-        # h2タグから抽出（最も可能性が高い）
-        h2_tags = soup.find_all('h2')
-        for h2 in h2_tags:
-            text = h2.get_text().strip()
-            if text and len(text) > 5 and self._looks_like_job_title(text):
-                return self._clean_title(text)
-        
-        # h1タグから抽出
-        h1_tags = soup.find_all('h1')
-        for h1 in h1_tags:
-            text = h1.get_text().strip()
-            if text and len(text) > 5 and text != '求人詳細':
-                return self._clean_title(text)
-        
-        # テーブルの最初の行から抽出を試行
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows[:3]:  # 最初の3行をチェック
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    # 2列目（職種名列）をチェック
-                    title_text = cells[1].get_text().strip()
-                    if self._looks_like_job_title(title_text):
-                        return self._clean_title(title_text)
-        
-        # フォールバック: ページ内の長めのテキストから推測
-        all_text = soup.get_text()
-        lines = [line.strip() for line in all_text.split('\n') if line.strip()]
-        
-        for line in lines[:30]:  # 最初の30行から探す
-            if self._looks_like_job_title(line) and len(line) > 10:
-                return self._clean_title(line)
-        
-        # 最終フォールバック: job_codeから生成
-        return f"求人番号_{soup.find('input', {'name': 'job_code'}) or 'unknown'}"
-    
-    def _extract_job_description(self, soup: BeautifulSoup) -> str:
-        """求人説明を抽出"""
-        # 説明が含まれていそうな要素を探す
-        desc_selectors = [
-            '.job-description',
-            '.description', 
-            '.content',
-            '.detail',
-            '[class*="desc"]',
-            'p'
-        ]
-        
-        descriptions = []
-        for selector in desc_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.get_text().strip()
-                if len(text) > 50 and len(text) < 1000:  # 適切な長さ
-                    descriptions.append(text)
-        
-        if descriptions:
-            # 最も詳細な説明を選択
-            return max(descriptions, key=len)[:500]  # 500文字まで
-        
-        return None
-    
-    def _extract_job_location(self, soup: BeautifulSoup) -> str:
-        """勤務地を抽出"""
-        location_keywords = ['勤務地', '所在地', '勤務先', '場所', '東京', '大阪', '神戸', '製作所']
-        
-        all_text = soup.get_text()
-        lines = all_text.split('\\n')
-        
-        for line in lines:
-            line = line.strip()
-            if any(keyword in line for keyword in location_keywords):
-                if len(line) < 100:  # 長すぎない
-                    return line
-        
-        return None
-    
-    def _extract_job_category(self, soup: BeautifulSoup) -> str:
-        """職種カテゴリを抽出"""
-        category_keywords = {
-            'エンジニア': 'エンジニア系',
-            '開発': 'エンジニア系', 
-            '設計': 'エンジニア系',
-            '営業': 'ビジネス系',
-            '企画': 'ビジネス系',
-            '人事': 'ビジネス系',
-            'マーケティング': 'ビジネス系',
-            '製造': '製造系',
-            '品質': '製造系',
-            '生産': '製造系'
-        }
-        
-        all_text = soup.get_text().lower()
-        
-        for keyword, category in category_keywords.items():
-            if keyword.lower() in all_text:
-                return category
-        
-        return None
-    
-    def _looks_like_job_title(self, text: str) -> bool:
-        """テキストが求人タイトルらしいかチェック"""
-        if not text or len(text) < 10 or len(text) > 200:
-            return False
-        
-        job_indicators = [
-            '【', '】', 'エンジニア', '技術者', '開発', '設計', '営業', 
-            '企画', '管理', 'システム', 'ソフト', '製造', 'プロジェクト',
-            'WEB面接', '東京', '大阪', '神戸', '製作所', '担当', '主任'
-        ]
-        
-        return any(indicator in text for indicator in job_indicators)
+    def _load_known_pages(self, previous_jobs: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+        """
+        本文のハッシュ付きの前回の抽出結果（前回の取得がなければ JobStore に保存済みのもの）
+        """
+        jobs = list(previous_jobs.values())
+        if not jobs and self.job_store is not None:
+            try:
+                jobs = self.job_store.load_jobs()
+            except Exception as e:
+                print(f"⚠️ 求人ストアの読み込みエラー: {e}")
+        return {job['job_code']: job for job in jobs if job.get('job_code') and job.get('content_hash')}
     
-    def _clean_title(self, title: str) -> str:
-        """求人タイトルをクリーンアップ"""
-        if not title:
-            return ""
-        
-        # 不要な文字を除去
-        title = re.sub(r'\\s+', ' ', title)
-        title = re.sub(r'\\n+', ' ', title) 
-        title = title.strip()
-        
-        # 長すぎる場合は切り詰め
-        if len(title) > 150:
-            title = title[:147] + "..."
-        
-        return title
+    def _reuse_known_page(self, job_code: str, content_hash: str) -> Optional[Dict[str, str]]:
+        """本文のハッシュが前回と同じなら前回の抽出結果のコピーを返す"""
+        known_job = self.known_pages.get(job_code)
+        if known_job is None or known_job.get('content_hash') != content_hash:
+            return None
+        with self._skip_lock:
+            self._pages_skipped += 1
+        return dict(known_job)
+
+def hash_page_content(content: bytes) -> str:
+    """
+    空白の違いを無視した本文のハッシュ（同じ求人ページが再取得されたかの判定に使う）
+    """
+    normalized = re.sub(rb'\s+', b' ', content).strip()
+    return hashlib.blake2b(normalized, digest_size=16).hexdigest()
@@ -0,0 +1,92 @@
+"""
+幅優先クローラー - フロンティア（待ち行列）とワーカープールでページを探索する
+URLは正規化して重複を除き、階層ごと・全体のページ数上限で探索範囲を制御する
+"""
+
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def canonicalize_url(url: str) -> str:
+    """
+    重複判定用にURLを正規化
+    - スキーム・ホストを小文字化し、既定ポートを省略
+    - クエリパラメータをキー順に並べ替え
+    - フラグメント（#以降）を除去
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+class FrontierCrawler:
+    def __init__(self, fetch_page: Callable[[str, int], Tuple[Any, List[str]]], max_workers: int = 4,
+                 max_depth: int = 3, max_pages: int = 100, max_pages_per_depth: Optional[int] = None):
+        """
+        fetch_page: (url, depth) -> (ページの抽出結果, 次に辿るリンク一覧)。ワーカースレッドで実行される
+        max_workers: 同時に取得するページ数
+        max_depth: 開始ページを0とした最大階層
+        max_pages: 全体で取得するページ数の上限
+        max_pages_per_depth: 1階層あたりのページ数の上限（Noneで無制限）
+        """
+        self.fetch_page = fetch_page
+        self.max_workers = max(1, max_workers)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_pages_per_depth = max_pages_per_depth
+        self.stats: Dict[str, int] = {}
+
+    def crawl(self, start_url: str) -> Iterator[Tuple[str, int, Any]]:
+        """
+        (url, 階層, 抽出結果) を幅優先の順序で返す
+        呼び出し側がループを抜けると、未着手のページの取得は取り消される
+        """
+        self.stats = {'fetched': 0, 'failed': 0, 'duplicates': 0, 'over_budget': 0}
+        seen = set()
+        depth_counts = Counter()
+        # 投入順に結果を取り出すため、階層dのページはすべて階層d+1より先に返る
+        frontier = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+            def enqueue(url: str, depth: int):
+                key = canonicalize_url(url)
+                if key in seen:
+                    self.stats['duplicates'] += 1
+                    return
+                if sum(depth_counts.values()) >= self.max_pages or (
+                        self.max_pages_per_depth is not None and depth_counts[depth] >= self.max_pages_per_depth):
+                    self.stats['over_budget'] += 1
+                    return
+                seen.add(key)
+                depth_counts[depth] += 1
+                frontier.append((url, depth, executor.submit(self.fetch_page, url, depth)))
+
+            try:
+                enqueue(start_url, 0)
+
+                while frontier:
+                    url, depth, future = frontier.popleft()
+                    try:
+                        result, links = future.result()
+                    except Exception as e:
+                        self.stats['failed'] += 1
+                        print(f"{'  ' * depth}❌ 取得エラー: {url}: {e}")
+                        continue
+
+                    self.stats['fetched'] += 1
+                    yield url, depth, result
+
+                    if depth < self.max_depth:
+                        for link in links:
+                            enqueue(link, depth + 1)
+            finally:
+                for _, _, future in frontier:
+                    future.cancel()
@@ -0,0 +1,305 @@
+"""
+クロール計測 - HTTP取得ごとの所要時間を段階別に記録する
+DNS解決・TCP接続・TLS・最初のバイトまで（TTFB）・本文の受信・デコード・解析・抽出の時間と、
+バイト数・ステータス・文字コード判定の試行回数を1件の FetchRecord にまとめる
+
+- 記録はレジストリに集め、段階ごとの p50/p95/p99 を集計できる
+- 記録が確定するたびに JSON のログイベントを出力する（ロガー: crawl.metrics、出力先は configure_metrics_log() で設定）
+- 遅い更新がネットワーク待ちなのか、BeautifulSoup の解析なのかを切り分けるために使う
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+logger = logging.getLogger('crawl.metrics')
+
+# JSONログの既定の出力先（1行1件のJSON。'-' なら標準エラー、空文字なら出力しない）
+DEFAULT_METRICS_LOG = os.environ.get('CRAWL_METRICS_LOG', os.path.join('.cache', 'crawl_metrics.jsonl'))
+
+# 集計する段階（秒）
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'download', 'decode', 'parse', 'extract', 'total')
+
+# レジストリに保持する最大件数（長時間動くアプリで際限なく増えないように）
+MAX_RECORDS = 50000
+
+class FetchRecord:
+    """1回のHTTP取得とそのページの処理の計測結果"""
+
+    def __init__(self, url: str, extractor: str = ''):
+        self.url = url
+        self.extractor = extractor
+        self.started_at = time.time()
+        self.status: Optional[int] = None
+        self.bytes = 0
+        self.attempts = 0
+        self.reused_connection: Optional[bool] = None
+        self.from_cache = False
+        self.encoding: Optional[str] = None
+        self.encoding_attempts: Optional[int] = None
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator['FetchRecord']:
+        """with record.phase('parse'): ... の区間の時間を加算する"""
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def finish(self):
+        self.phases['total'] = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'event': 'fetch',
+            'url': self.url,
+            'extractor': self.extractor,
+            'started_at': round(self.started_at, 3),
+            'status': self.status,
+            'bytes': self.bytes,
+            'attempts': self.attempts,
+            'reused_connection': self.reused_connection,
+            'from_cache': self.from_cache,
+            'encoding': self.encoding,
+            'encoding_attempts': self.encoding_attempts,
+            'error': self.error,
+            **{f"{phase}_ms": round(seconds * 1000, 3) for phase, seconds in self.phases.items()},
+        }
+
+class MetricsRegistry:
+    def __init__(self, max_records: int = MAX_RECORDS):
+        self._records: deque = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def page(self, url: str, extractor: str = '') -> Iterator[FetchRecord]:
+        """
+        1ページの取得から抽出までを1件として記録する
+        この中で行われたHTTP取得の計測は、同じスレッドの記録にまとめられる
+        """
+        record = FetchRecord(url, extractor)
+        previous = getattr(self._local, 'record', None)
+        self._local.record = record
+        try:
+            yield record
+        except Exception as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._local.record = previous
+            self.add(record)
+
+    def current(self) -> Optional[FetchRecord]:
+        """このスレッドで計測中の記録（page() の外ならNone）"""
+        return getattr(self._local, 'record', None)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """このスレッドで計測中の記録に区間の時間を加算する（計測中でなければ何もしない）"""
+        record = self.current()
+        if record is None:
+            yield
+            return
+        with record.phase(name):
+            yield
+
+    def add(self, record: FetchRecord):
+        """記録を確定してJSONのログイベントを出力する"""
+        record.finish()
+        with self._lock:
+            self._records.append(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record.to_dict(), ensure_ascii=False))
+
+    def records(self, extractor: Optional[str] = None, since: Optional[float] = None) -> List[FetchRecord]:
+        with self._lock:
+            records = list(self._records)
+        return [record for record in records
+                if (extractor is None or record.extractor == extractor) and (since is None or record.started_at >= since)]
+
+    def summary(self, extractor: Optional[str] = None, since: Optional[float] = None) -> Dict[str, Any]:
+        """段階ごとの p50/p95/p99（ミリ秒）と件数・バイト数・ステータスの集計"""
+        records = self.records(extractor, since)
+        phases = {}
+        for phase in PHASES:
+            values = sorted(record.phases[phase] for record in records if phase in record.phases)
+            if values:
+                phases[phase] = {
+                    'count': len(values),
+                    'p50_ms': round(percentile(values, 50) * 1000, 3),
+                    'p95_ms': round(percentile(values, 95) * 1000, 3),
+                    'p99_ms': round(percentile(values, 99) * 1000, 3),
+                    'total_ms': round(sum(values) * 1000, 3),
+                }
+
+        statuses: Dict[str, int] = {}
+        for record in records:
+            key = str(record.status) if record.status is not None else 'error'
+            statuses[key] = statuses.get(key, 0) + 1
+
+        return {
+            'requests': len(records),
+            'bytes': sum(record.bytes for record in records),
+            'retries': sum(max(0, record.attempts - 1) for record in records),
+            'new_connections': sum(1 for record in records if record.reused_connection is False),
+            'from_cache': sum(1 for record in records if record.from_cache),
+            'statuses': statuses,
+            'phases': phases,
+        }
+
+    def print_summary(self, extractor: Optional[str] = None, since: Optional[float] = None):
+        summary = self.summary(extractor, since)
+        if not summary['requests']:
+            return
+
+        print(f"⏱️ クロール計測: {summary['requests']}件 / {summary['bytes'] / 1024:.1f}KB / "
+              f"再試行{summary['retries']}回 / 新規接続{summary['new_connections']}件 / ステータス {summary['statuses']}")
+        for phase, stats in summary['phases'].items():
+            print(f"  {phase:<9} p50 {stats['p50_ms']:9.2f}ms  p95 {stats['p95_ms']:9.2f}ms  "
+                  f"p99 {stats['p99_ms']:9.2f}ms  (合計 {stats['total_ms'] / 1000:.2f}秒)")
+
+    def dump_json(self, path: str, extractor: Optional[str] = None, since: Optional[float] = None):
+        """記録と集計をJSONファイルに保存"""
+        payload = {
+            'summary': self.summary(extractor, since),
+            'records': [record.to_dict() for record in self.records(extractor, since)],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近傍順位法のパーセンタイル（sorted_values は昇順）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """全抽出器で共有する計測レジストリ"""
+    return _registry
+
+_metrics_handler: Optional[logging.Handler] = None
+_metrics_handler_lock = threading.Lock()
+
+def configure_metrics_log(path: Optional[str] = DEFAULT_METRICS_LOG, level: int = logging.INFO) -> Optional[logging.Handler]:
+    """
+    crawl.metrics のJSONログの出力先を設定する（更新ワーカー・アプリの起動時に呼ぶ）
+    path: 出力するファイル（'-' なら標準エラー、空文字・Noneなら出力せず、JSONの組み立ても省く）
+    何度呼んでもハンドラーは1つだけにする（前回のハンドラーは外して閉じる）
+    """
+    global _metrics_handler
+    with _metrics_handler_lock:
+        if _metrics_handler is not None:
+            logger.removeHandler(_metrics_handler)
+            _metrics_handler.close()
+            _metrics_handler = None
+
+        if not path:
+            logger.setLevel(logging.WARNING)
+            return None
+
+        if path == '-':
+            handler: logging.Handler = logging.StreamHandler()
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            # 外部のログローテーションで移動・削除されたら開き直す
+            handler = logging.handlers.WatchedFileHandler(path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        # ルートロガーの設定によって同じイベントが二重に出力されないようにする
+        logger.propagate = False
+        _metrics_handler = handler
+        return handler
+
+# --- 接続の計測（HTTPAdapter に組み込むコネクションクラス） ---
+
+class _TimedConnectionMixin:
+    """新しい接続のDNS解決・TCP接続・TLSの時間を計測中の記録に加算する"""
+
+    def _new_conn(self):
+        record = _registry.current()
+        if record is None:
+            return super()._new_conn()
+
+        # 先に名前解決して時間を計り、解決済みのアドレスで接続する
+        # urllib3 と同じアドレスファミリーで解決し、接続できなければ urllib3 と同様に次のアドレスを試す
+        # （名前解決に失敗した場合はホスト名のまま urllib3 に任せ、通常のエラーにする）
+        original_host = self._dns_host
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(original_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            addresses = []
+        record.add('dns', time.perf_counter() - started)
+        hosts = list(dict.fromkeys(address[4][0] for address in addresses)) or [original_host]
+
+        started = time.perf_counter()
+        try:
+            for i, host in enumerate(hosts):
+                self._dns_host = host
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError, OSError):
+                    if i == len(hosts) - 1:
+                        raise
+        finally:
+            self._dns_host = original_host
+            record.add('connect', time.perf_counter() - started)
+
+    def connect(self):
+        record = _registry.current()
+        if record is None:
+            return super().connect()
+
+        record.reused_connection = False
+        before = record.phases.get('dns', 0.0) + record.phases.get('connect', 0.0)
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            after = record.phases.get('dns', 0.0) + record.phases.get('connect', 0.0)
+            # connect() 全体からDNS・TCPを除いた残りがTLSハンドシェイク（HTTPのみなら0）
+            if isinstance(self, HTTPSConnection):
+                record.add('tls', max(0.0, elapsed - (after - before)))
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+TIMED_POOL_CLASSES = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
@@ -6,85 +6,124 @@
 import requests
 from bs4 import BeautifulSoup
 import re
-from typing import List, Dict, Set
 import time
+from typing import List, Dict, Set, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import logging
 
+from src.extractors.crawl_frontier import FrontierCrawler
+from src.extractors.crawl_metrics import get_metrics_registry
+from src.extractors.http_cache import HttpCache, get_shared_cache
+from src.extractors.http_transport import HttpTransport, get_shared_transport
+from src.extractors.jposting_site import DEFAULT_BASE_URL, DEFAULT_COMPANY
+from src.extractors.keyword_classifier import get_shared_classifier
+from src.extractors.rate_limiter import HostRateLimiter
+from src.extractors.text_blocks import scan_text_blocks
+
+# 求人ブロックらしいdivのclass名
+JOB_DIV_CLASS_PATTERN = re.compile(r'(job|position|career|recruit)', re.I)
+
+# 求人タイトルとして扱うテキストの最大長
+MAX_TITLE_LENGTH = 200
+
 class EnhancedJPOSTINGExtractor:
-    def __init__(self, max_jobs: int = 50, max_depth: int = 3):
-        self.base_url = "https://progres02.jposting.net"
+    def __init__(self, max_jobs: int = 50, max_depth: int = 3, http_cache: Optional[HttpCache] = None,
+                 max_workers: int = 4, requests_per_second: float = 2.0,
+                 max_pages: int = 100, max_pages_per_depth: Optional[int] = None,
+                 transport: Optional[HttpTransport] = None, base_url: Optional[str] = None,
+                 company: Optional[str] = None):
+        """
+        max_workers: 同時に取得するページ数
+        requests_per_second: 同一ホストへの最大リクエスト数/秒（トークンバケット）
+        max_pages / max_pages_per_depth: 全体・階層ごとの取得ページ数の上限
+        company: 採用サイト上の企業（テナント）のパス（省略時は JPOSTING_COMPANY または三菱電機）
+        """
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.company = company or DEFAULT_COMPANY
+        self.http_cache = http_cache or get_shared_cache()
         self.max_jobs = max_jobs
         self.max_depth = max_depth
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.max_pages_per_depth = max_pages_per_depth
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.transport = transport or get_shared_transport()
+        self.metrics = get_metrics_registry()
         self.visited_urls: Set[str] = set()
         self.found_jobs: List[Dict[str, str]] = []
         
     def extract_all_jobs(self, start_url: str) -> List[Dict[str, str]]:
         """
-        開始URLから階層的にすべての求人を探索・抽出
+        開始URLから幅優先ですべての求人を探索・抽出
         """
         print(f"🚀 階層探索開始: {start_url}")
-        print(f"📋 最大求人数: {self.max_jobs}件, 最大階層: {self.max_depth}")
+        print(f"📋 最大求人数: {self.max_jobs}件, 最大階層: {self.max_depth}, 並列数: {self.max_workers}")
         
         self.found_jobs = []
         self.visited_urls = set()
+        started_at = time.time()
+        
+        crawler = FrontierCrawler(
+            self._crawl_page,
+            max_workers=self.max_workers,
+            max_depth=self.max_depth,
+            max_pages=self.max_pages,
+            max_pages_per_depth=self.max_pages_per_depth
+        )
+        
+        # 幅優先の順序でページごとの求人を受け取る
+        for url, depth, current_jobs in crawler.crawl(start_url):
+            self.visited_urls.add(url)
+            self.found_jobs.extend(current_jobs)
+            
+            # 制限に達した場合は残りの探索を取り消して停止
+            if len(self.found_jobs) >= self.max_jobs:
+                print(f"{'  ' * depth}✋ 最大求人数に達したため停止")
+                break
         
-        # 階層探索実行
-        self._explore_recursive(start_url, depth=0)
-        
-        print(f"✅ 探索完了: {len(self.found_jobs)}件の求人を発見")
+        stats = crawler.stats
+        print(f"✅ 探索完了: {len(self.found_jobs)}件の求人を発見 "
+              f"(取得{stats['fetched']}ページ / 重複{stats['duplicates']} / 上限超過{stats['over_budget']})")
+        self.metrics.print_summary('enhanced', since=started_at)
         return self.found_jobs
     
-    def _explore_recursive(self, url: str, depth: int = 0):
+    def _crawl_page(self, url: str, depth: int) -> Tuple[List[Dict[str, str]], List[str]]:
         """
-        再帰的に階層探索
+        1ページを取得して求人と次階層のリンクを抽出（ワーカースレッドで実行）
         """
-        # 制限チェック
-        if depth > self.max_depth or len(self.found_jobs) >= self.max_jobs:
-            return
-        
-        # 重複チェック
-        if url in self.visited_urls:
-            return
-            
-        self.visited_urls.add(url)
-        
         try:
             print(f"{'  ' * depth}🔍 探索中 (階層{depth}): {url}")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 現在のページから求人を抽出
-            current_jobs = self._extract_jobs_from_page(soup, url, depth)
-            self.found_jobs.extend(current_jobs)
-            
-            # 制限に達した場合は停止
-            if len(self.found_jobs) >= self.max_jobs:
-                print(f"{'  ' * depth}✋ 最大求人数に達したため停止")
-                return
+            with self.metrics.page(url, 'enhanced') as record:
+                response = self.http_cache.get(self.transport, url, timeout=15, rate_limiter=self.rate_limiter)
+                response.raise_for_status()
+                
+                # 304（未更新）なら前回の解析結果（求人と次階層リンク）を再利用
+                cached_page = self.http_cache.load_parsed(response, 'enhanced_page')
+                if cached_page is not None:
+                    return cached_page['jobs'], cached_page['links']
+                
+                response.encoding = 'utf-8'
+                record.encoding = response.encoding
+                with record.phase('parse'):
+                    soup = BeautifulSoup(response.text, 'html.parser')
+                
+                # 現在のページから求人を抽出
+                with record.phase('extract'):
+                    current_jobs = self._extract_jobs_from_page(soup, url, depth)
+                    next_urls = self._find_job_related_links(soup, url)
+                self.http_cache.store_parsed(response, 'enhanced_page', {'jobs': current_jobs, 'links': next_urls})
             
-            # 次の階層のURLを探索
             if depth < self.max_depth:
-                next_urls = self._find_job_related_links(soup, url)
                 print(f"{'  ' * depth}🔗 次階層のリンク: {len(next_urls)}件")
-                
-                for next_url in next_urls[:10]:  # 各階層で最大10リンクまで
-                    if len(self.found_jobs) >= self.max_jobs:
-                        break
-                    time.sleep(0.5)  # レート制限
-                    self._explore_recursive(next_url, depth + 1)
+            
+            return current_jobs, next_urls
                     
         except requests.exceptions.RequestException as e:
             print(f"{'  ' * depth}❌ アクセスエラー: {e}")
         except Exception as e:
             print(f"{'  ' * depth}❌ 解析エラー: {e}")
+        
+        return [], []
     
     def _extract_jobs_from_page(self, soup: BeautifulSoup, page_url: str, depth: int) -> List[Dict[str, str]]:
         """
@@ -103,21 +142,23 @@ class EnhancedJPOSTINGExtractor:
             for ul in lists:
                 jobs.extend(self._parse_list_jobs(ul, page_url))
         
-        # パターン3: div要素の求人
-        divs = soup.find_all('div', class_=re.compile(r'(job|position|career|recruit)', re.I))
-        for div in divs:
-            job_info = self._parse_div_job(div, page_url)
-            if job_info:
-                jobs.append(job_info)
+        # パターン3・4: div要素の求人
+        # 下から上への1回の走査で各divのテキストを求め、子divの連結にすぎない祖先は評価しない
+        div_jobs = []
+        general_jobs = []
+        for block in scan_text_blocks(soup, MAX_TITLE_LENGTH):
+            if not self._looks_like_job_title(block.text):
+                continue
+            
+            # パターン3: 求人らしいclassを持つdiv
+            if JOB_DIV_CLASS_PATTERN.search(' '.join(block.element.get('class', []))):
+                div_jobs.append(self._parse_div_job(block.element, page_url, block.text))
+            
+            # パターン4: 一般的なdiv要素から求人らしいテキストを探索
+            general_jobs.append(self._create_job_info(block.text, page_url, block.element))
         
-        # パターン4: 一般的なdiv要素から求人らしいテキストを探索
-        all_divs = soup.find_all('div')
-        for div in all_divs:
-            text = div.get_text().strip()
-            if self._looks_like_job_title(text):
-                job_info = self._create_job_info(text, page_url, div)
-                if job_info:
-                    jobs.append(job_info)
+        jobs.extend(div_jobs)
+        jobs.extend(general_jobs)
         
         # 重複除去
         unique_jobs = []
@@ -175,9 +216,10 @@ class EnhancedJPOSTINGExtractor:
         
         return jobs
     
-    def _parse_div_job(self, div, page_url: str) -> Dict[str, str]:
+    def _parse_div_job(self, div, page_url: str, text: Optional[str] = None) -> Dict[str, str]:
         """div要素から求人情報を抽出"""
-        text = div.get_text().strip()
+        if text is None:
+            text = div.get_text().strip()
         if not self._looks_like_job_title(text):
             return None
         
@@ -205,55 +247,36 @@ class EnhancedJPOSTINGExtractor:
         }
     
     def _find_job_related_links(self, soup: BeautifulSoup, current_url: str) -> List[str]:
-        """求人関連のリンクを探索"""
-        links = set()
+        """求人関連のリンクを探索（文書順、同一ドメインの同じ企業のページのみ）"""
+        links: Dict[str, None] = {}
+        current_domain = urlparse(current_url).netloc
+        # 同じ基盤の他の企業（テナント）のページには進まない
+        company_prefix = f"/{self.company}/"
         
         # すべてのリンクを取得
         for link in soup.find_all('a', href=True):
             href = link['href']
             full_url = urljoin(current_url, href)
+            parsed = urlparse(full_url)
             
-            # 求人関連のURLかチェック
-            if self._is_job_related_url(full_url, link.get_text().strip()):
-                links.add(full_url)
-        
-        # 現在のドメイン内のリンクのみ
-        domain_links = []
-        current_domain = urlparse(current_url).netloc
+            # 現在のドメイン内の求人関連URLのみ
+            if (parsed.netloc == current_domain and parsed.path.startswith(company_prefix) and
+                    self._is_job_related_url(full_url, link.get_text().strip())):
+                links[full_url] = None
         
-        for link in links:
-            if urlparse(link).netloc == current_domain:
-                domain_links.append(link)
-        
-        return list(domain_links)[:20]  # 最大20リンク
+        return list(links)
     
     def _is_job_related_url(self, url: str, link_text: str) -> bool:
         """URLが求人関連かどうか判定"""
-        job_keywords = [
-            'job', 'career', 'recruit', 'position', 'employment',
-            '求人', '募集', '採用', '職種', 'キャリア'
-        ]
-        
-        url_lower = url.lower()
-        text_lower = link_text.lower()
-        
-        return any(keyword in url_lower or keyword in text_lower 
-                  for keyword in job_keywords)
+        link_keywords = get_shared_classifier('enhanced_link')
+        return link_keywords.matches(url) or link_keywords.matches(link_text)
     
     def _looks_like_job_title(self, text: str) -> bool:
         """テキストが求人タイトルらしいかチェック"""
-        if not text or len(text) < 5 or len(text) > 200:
+        if not text or len(text) < 5 or len(text) > MAX_TITLE_LENGTH:
             return False
         
-        # 求人タイトルによく含まれるキーワード
-        job_indicators = [
-            'エンジニア', '技術者', '開発', '設計', '営業', '企画', '管理',
-            '【', '】', 'システム', 'ソフト', 'ハード', '製造', '品質',
-            'プロジェクト', 'マネージャー', '主任', '課長', '部長', '担当',
-            '正社員', '契約', '派遣', 'WEB面接', '東京', '大阪', '神戸'
-        ]
-        
-        return any(indicator in text for indicator in job_indicators)
+        return get_shared_classifier('enhanced_title').matches(text)
     
     def _clean_title(self, title: str) -> str:
         """求人タイトルをクリーンアップ"""
@@ -0,0 +1,110 @@
+"""
+HTMLデコード - 文字コードを生のバイト列から1回だけ判定する
+meta charset → HTTPヘッダー → charset-normalizer の順に候補を試し、
+判定結果はホストごとにキャッシュして以降のページでは判定を省略する
+"""
+
+import codecs
+import re
+import threading
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from charset_normalizer import from_bytes
+
+# <meta charset="..."> と <meta http-equiv="Content-Type" content="...; charset=..."> の両方に一致
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_\-]+)', re.IGNORECASE)
+HEADER_CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+
+# 日本語サイトでよく使われるラベルを、実際のページに合う上位互換のコーデックに寄せる
+ENCODING_ALIASES = {
+    'shift_jis': 'cp932',
+    'shift-jis': 'cp932',
+    'sjis': 'cp932',
+    'x-sjis': 'cp932',
+    'windows-31j': 'cp932',
+    'euc-jp': 'euc_jp',
+    'x-euc-jp': 'euc_jp',
+}
+
+# metaタグは先頭付近にしかないため、探索範囲を限定する
+META_SCAN_BYTES = 4096
+
+class DecodedHtml(NamedTuple):
+    text: str
+    encoding: str
+    detected_by: str  # 'host_cache' / 'meta' / 'header' / 'charset_normalizer' / 'fallback'
+    attempts: int     # 試したデコード候補の数
+
+_host_encodings: Dict[str, str] = {}
+_host_encodings_lock = threading.Lock()
+
+def decode_html(content: bytes, url: str = '', content_type: Optional[str] = None) -> DecodedHtml:
+    """
+    生のバイト列を文字列にデコード（BeautifulSoupに渡す前に1回だけ実行）
+    """
+    host = urlparse(url).netloc
+    attempts = 0
+
+    with _host_encodings_lock:
+        cached_encoding = _host_encodings.get(host)
+
+    if cached_encoding:
+        attempts += 1
+        text = _try_decode(content, cached_encoding)
+        if text is not None:
+            return DecodedHtml(text, cached_encoding, 'host_cache', attempts)
+
+    for detected_by, encoding in _candidate_encodings(content, content_type):
+        if encoding == cached_encoding:
+            continue
+        attempts += 1
+        text = _try_decode(content, encoding)
+        if text is not None:
+            if host:
+                with _host_encodings_lock:
+                    _host_encodings[host] = encoding
+            return DecodedHtml(text, encoding, detected_by, attempts)
+
+    print("⚠️ 適切なエンコーディングが見つからないため、UTF-8で処理を続行")
+    return DecodedHtml(content.decode('utf-8', errors='replace'), 'utf-8', 'fallback', attempts + 1)
+
+def clear_host_encodings():
+    """ホストごとの判定結果を破棄"""
+    with _host_encodings_lock:
+        _host_encodings.clear()
+
+def _candidate_encodings(content: bytes, content_type: Optional[str]):
+    """判定候補を優先度順に返す（charset-normalizerは必要になった時だけ実行）"""
+    match = META_CHARSET_PATTERN.search(content[:META_SCAN_BYTES])
+    if match:
+        encoding = _normalize_encoding(match.group(1).decode('ascii', errors='ignore'))
+        if encoding:
+            yield 'meta', encoding
+
+    if content_type:
+        match = HEADER_CHARSET_PATTERN.search(content_type)
+        if match:
+            encoding = _normalize_encoding(match.group(1))
+            if encoding:
+                yield 'header', encoding
+
+    best = from_bytes(content).best()
+    if best is not None:
+        encoding = _normalize_encoding(best.encoding)
+        if encoding:
+            yield 'charset_normalizer', encoding
+
+def _normalize_encoding(label: str) -> Optional[str]:
+    label = label.strip().lower()
+    label = ENCODING_ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+def _try_decode(content: bytes, encoding: str) -> Optional[str]:
+    try:
+        return content.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return None
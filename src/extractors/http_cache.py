@@ -0,0 +1,225 @@
+"""
+HTTPキャッシュ - 求人ページのディスクキャッシュ（条件付きGET）
+ETag / Last-Modified を保存し、次回は If-None-Match / If-Modified-Since で再検証する
+304の場合は保存済みの本文と解析結果を再利用する
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+import requests
+
+from src.extractors.crawl_metrics import get_metrics_registry
+from src.extractors.http_transport import HttpTransport
+
+DEFAULT_CACHE_DIR = os.getenv('JOB_HTTP_CACHE_DIR', os.path.join('.cache', 'http'))
+
+class HttpCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,        # キャッシュ経由のリクエスト数
+            'misses': 0,          # キャッシュなし（通常のGET）
+            'revalidations': 0,   # 条件付きGETを送信した数
+            'hits': 0,            # 304で本文を再利用した数
+            'parse_skips': 0,     # 304で解析結果まで再利用した数
+            'bytes_saved': 0,     # 304で再ダウンロードを省いたバイト数
+        }
+
+    def get(self, transport: Union[HttpTransport, requests.Session], url: str, **kwargs) -> requests.Response:
+        """
+        条件付きGETでページを取得（transport の再試行・接続プールを使う）
+        304の場合は保存済み本文を持つ200レスポンスを返す（response.from_cache = True）
+        """
+        meta = self._load_meta(url)
+        if meta and not os.path.exists(self._path(url, 'body')):
+            meta = None
+        headers = dict(kwargs.pop('headers', None) or {})
+
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = transport.get(url, headers=headers, **kwargs)
+        response.from_cache = False
+        response.cache_key = url
+        # 解析結果はこのレスポンス自身のバリデータで保存する（バリデータがなければNone）
+        response.cache_validator = self._response_validator(response)
+
+        if meta and response.status_code == 304:
+            body = self._read_file(self._path(url, 'body'))
+            if body is not None:
+                self._count(requests=1, revalidations=1, hits=1, bytes_saved=len(body))
+                record = get_metrics_registry().current()
+                if record is not None:
+                    record.from_cache = True
+                return self._build_cached_response(url, response, meta, body)
+
+        self._count(requests=1, revalidations=1 if meta else 0, misses=0 if meta else 1)
+
+        if response.status_code == 200:
+            self._store(url, response)
+
+        return response
+
+    def load_parsed(self, response: requests.Response, namespace: str) -> Optional[Any]:
+        """
+        304で再利用した本文に対応する解析結果を取得（なければNone）
+        namespace: 解析結果の種類（抽出器ごとに形式が異なるため区別する）
+        """
+        if not getattr(response, 'from_cache', False):
+            return None
+
+        data = self._read_file(self._path(response.cache_key, f'parsed-{namespace}'))
+        if data is None:
+            return None
+
+        try:
+            parsed = json.loads(data.decode('utf-8'))
+        except ValueError:
+            return None
+
+        # 解析時と同じバージョンの本文かを確認
+        if parsed.get('validator') != response.cache_validator:
+            return None
+
+        self._count(parse_skips=1)
+        return parsed['value']
+
+    def store_parsed(self, response: requests.Response, namespace: str, value: Any):
+        """
+        解析結果を、解析したレスポンスと同じバリデータで保存（JSON化できる値のみ）
+        バリデータのないレスポンスなら保存せず、前の本文の解析結果も削除する
+        （ディスク上のメタ情報は前の本文のものなので、そのバリデータを付けると304で古い結果を返してしまう）
+        """
+        cache_key = getattr(response, 'cache_key', None)
+        if not cache_key:
+            return
+
+        path = self._path(cache_key, f'parsed-{namespace}')
+        validator = getattr(response, 'cache_validator', None)
+        if not validator:
+            self._remove_file(path)
+            return
+
+        payload = {'validator': validator, 'value': value}
+        try:
+            self._write_file(path, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ 解析結果をキャッシュできません: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット/ミス/再検証のカウンタ"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _store(self, url: str, response: requests.Response):
+        """
+        バリデータ付きのレスポンスのみ保存
+        バリデータのない本文に変わった場合は、前の本文を304で再利用しないよう保存済みのものを削除する
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            self._remove_file(self._path(url, 'meta'))
+            self._remove_file(self._path(url, 'body'))
+            return
+
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': {key: value for key, value in response.headers.items()
+                        if key.lower() in ('content-type', 'etag', 'last-modified')},
+            'stored_at': time.time(),
+        }
+
+        # 古い解析結果はバリデータが一致しなくなるため読み込み時に無視される
+        self._write_file(self._path(url, 'body'), response.content)
+        self._write_file(self._path(url, 'meta'), json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def _build_cached_response(self, url: str, response: requests.Response, meta: Dict[str, Any], body: bytes) -> requests.Response:
+        cached = requests.Response()
+        cached.status_code = 200
+        cached.url = response.url
+        cached.cache_key = url
+        cached.request = response.request
+        cached.headers.update(meta.get('headers', {}))
+        cached._content = body
+        cached.encoding = requests.utils.get_encoding_from_headers(cached.headers)
+        cached.from_cache = True
+        cached.cache_validator = self._validator(meta)
+        return cached
+
+    def _load_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        data = self._read_file(self._path(url, 'meta'))
+        if data is None:
+            return None
+        try:
+            return json.loads(data.decode('utf-8'))
+        except ValueError:
+            return None
+
+    def _validator(self, meta: Dict[str, Any]) -> str:
+        return f"{meta.get('etag') or ''}|{meta.get('last_modified') or ''}"
+
+    def _response_validator(self, response: requests.Response) -> Optional[str]:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return None
+        return self._validator({'etag': etag, 'last_modified': last_modified})
+
+    def _path(self, url: str, kind: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.{kind}")
+
+    def _read_file(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _write_file(self, path: str, data: bytes):
+        """一時ファイルに書いてからリネーム（書き込み途中のファイルを読ませない）"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _count(self, **deltas: int):
+        with self._lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+_shared_cache: Optional[HttpCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache() -> HttpCache:
+    """全抽出器で共有するデフォルトのキャッシュ"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HttpCache()
+        return _shared_cache
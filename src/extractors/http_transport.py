@@ -0,0 +1,212 @@
+"""
+HTTPトランスポート - 全抽出器で共有する接続プールと再試行ポリシー
+- 接続プールの大きさを調整した1つのセッションでTCP/TLS接続を再利用する（keep-alive、gzip）
+- 一時的な失敗（接続エラー・タイムアウト・429/5xx）は指数バックオフ＋ジッターで再試行する
+- 429/503 の Retry-After を尊重する（待ち時間は retry_after_max まで、1リクエストあたりの期限（deadline）も超えない）
+- rate_limiter を渡すと、再試行を含む各試行の前にホストごとのレート制限を待つ
+- max_concurrency を指定すると、このトランスポート全体で同時に送信中のリクエスト数を制限する（接続数の上限）
+- 各リクエストの接続・TTFB・受信時間は crawl_metrics のレジストリに記録する
+"""
+
+import email.utils
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import (RetryCallState, Retrying, retry_if_exception_type, retry_if_result,
+                      stop_after_attempt, stop_before_delay, wait_random_exponential)
+
+from src.extractors.crawl_metrics import TIMED_POOL_CLASSES, FetchRecord, get_metrics_registry
+from src.extractors.rate_limiter import HostRateLimiter
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# 再試行するステータスコード（Retry-After を見るのは 429 と 503）
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_AFTER_STATUSES = (429, 503)
+
+# 再試行する例外（接続エラー・タイムアウト・読み込み途中の切断）
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """新しい接続のDNS解決・TCP接続・TLSの時間を計測するアダプタ"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(TIMED_POOL_CLASSES)
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 32,
+                   user_agent: str = DEFAULT_USER_AGENT) -> requests.Session:
+    """
+    接続プールを調整したセッションを作成
+    pool_connections: プールを保持するホスト数
+    pool_maxsize: 1ホストあたりに保持する接続数（並列取得のワーカー数以上にする）
+    """
+    session = requests.Session()
+    # 再試行はトランスポート側で行うため、アダプタ自体は再試行しない
+    adapter = TimedHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': user_agent,
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+class HttpTransport:
+    def __init__(self, session: Optional[requests.Session] = None, max_attempts: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0, deadline: float = 60.0,
+                 max_concurrency: Optional[int] = None, retry_after_max: Optional[float] = None):
+        """
+        max_attempts: 最大試行回数（初回を含む）
+        backoff_base / backoff_max: 指数バックオフの基準秒数と上限秒数（待ち時間はジッター付き）
+        retry_after_max: Retry-After に従って待つ最大秒数（Noneなら backoff_max。これより長い指定はこの秒数に切り詰める）
+        deadline: 1リクエスト（再試行と待ち時間を含む）にかける最大秒数
+        max_concurrency: 同時に送信中にできるリクエスト数（Noneで無制限）。再試行の待ち時間中は枠を返す
+        """
+        self.session = session or create_session()
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.retry_after_max = backoff_max if retry_after_max is None else retry_after_max
+        self._backoff = wait_random_exponential(multiplier=backoff_base, max=backoff_max)
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def request(self, method: str, url: str, deadline: Optional[float] = None,
+                rate_limiter: Optional[HostRateLimiter] = None, **kwargs) -> requests.Response:
+        """
+        再試行つきでリクエストを送信
+        rate_limiter: 初回・再試行の各試行の前に待つホストごとのレート制限（呼び出し側で wait() しない）
+        再試行しても失敗ステータスのままなら最後のレスポンスを返す（raise_for_status は呼び出し側で行う）
+        再試行しても例外になる場合は最後の例外をそのまま送出する
+        """
+        metrics = get_metrics_registry()
+        record = metrics.current()
+        if record is None:
+            # 抽出器のページ計測の外で呼ばれた場合も1件として記録する
+            with metrics.page(url) as record:
+                return self._request(method, url, record, deadline, rate_limiter, **kwargs)
+        return self._request(method, url, record, deadline, rate_limiter, **kwargs)
+
+    def _request(self, method: str, url: str, record: FetchRecord, deadline: Optional[float],
+                 rate_limiter: Optional[HostRateLimiter], **kwargs) -> requests.Response:
+        deadline = self.deadline if deadline is None else deadline
+        started = time.monotonic()
+        timeout = kwargs.pop('timeout', None)
+        stream = kwargs.pop('stream', False)
+
+        def send() -> requests.Response:
+            # 再試行もホストへのリクエストとして数える（接続数の枠を取る前に待つ）
+            if rate_limiter is not None:
+                rate_limiter.wait(url)
+            # 各試行のタイムアウトは期限までの残り時間を超えないようにする
+            remaining = max(0.1, deadline - (time.monotonic() - started))
+            attempt_timeout = min(timeout, remaining) if timeout else remaining
+            if self._slots is None:
+                return self._send_timed(method, url, record, stream, timeout=attempt_timeout, **kwargs)
+            # 接続数の枠は1回の試行（本文の受信まで）の間だけ使う
+            with self._slots:
+                return self._send_timed(method, url, record, stream, timeout=attempt_timeout, **kwargs)
+
+        retrying = Retrying(
+            retry=(retry_if_exception_type(RETRY_EXCEPTIONS) |
+                   retry_if_result(lambda response: response.status_code in RETRY_STATUSES)),
+            # 次の待ち時間で期限を超える場合は待たずに打ち切る
+            stop=stop_after_attempt(self.max_attempts) | stop_before_delay(deadline),
+            wait=self._wait_seconds,
+            before_sleep=lambda state: self._log_retry(url, state),
+            retry_error_callback=self._give_up,
+            reraise=True,
+        )
+        return retrying(send)
+
+    def _send_timed(self, method: str, url: str, record: FetchRecord, stream: bool, **kwargs) -> requests.Response:
+        """
+        1回の試行を送信し、ヘッダー受信まで（TTFB）と本文の受信時間を分けて記録する
+        TTFB には新しい接続のDNS・TCP・TLSの時間を含めない（それぞれ別の段階として記録される）
+        """
+        record.attempts += 1
+        record.reused_connection = True  # 新しく接続した場合は接続の計測で False になる
+        connecting = sum(record.phases.get(phase, 0.0) for phase in ('dns', 'connect', 'tls'))
+
+        started = time.perf_counter()
+        response = self.session.request(method, url, stream=True, **kwargs)
+        elapsed = time.perf_counter() - started
+        connected = sum(record.phases.get(phase, 0.0) for phase in ('dns', 'connect', 'tls'))
+        record.add('ttfb', max(0.0, elapsed - (connected - connecting)))
+        record.status = response.status_code
+
+        if not stream:
+            with record.phase('download'):
+                content = response.content
+            # 圧縮されている場合は転送されたバイト数を記録する
+            wire_bytes = response.raw.tell() if hasattr(response.raw, 'tell') else 0
+            record.bytes = wire_bytes or len(content)
+
+        return response
+
+    def _wait_seconds(self, state: RetryCallState) -> float:
+        """Retry-After があればそれに従い（retry_after_max まで）、なければジッター付きの指数バックオフ"""
+        outcome = state.outcome
+        if outcome is not None and not outcome.failed:
+            retry_after = parse_retry_after(outcome.result())
+            if retry_after is not None:
+                return min(retry_after, self.retry_after_max)
+        return self._backoff(state)
+
+    def _log_retry(self, url: str, state: RetryCallState):
+        outcome = state.outcome
+        if outcome.failed:
+            reason = type(outcome.exception()).__name__
+        else:
+            reason = f"HTTP {outcome.result().status_code}"
+        print(f"⏳ 再試行 {state.attempt_number}/{self.max_attempts} ({reason}, {state.next_action.sleep:.1f}秒後): {url}")
+
+    @staticmethod
+    def _give_up(state: RetryCallState) -> requests.Response:
+        """再試行を使い切った場合、例外は送出し、失敗ステータスはそのまま返す"""
+        return state.outcome.result()
+
+def parse_retry_after(response: requests.Response) -> Optional[float]:
+    """429/503 の Retry-After（秒数またはHTTP日付）を待ち秒数にする"""
+    if response.status_code not in RETRY_AFTER_STATUSES:
+        return None
+
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_transport_lock = threading.Lock()
+
+def get_shared_transport() -> HttpTransport:
+    """全抽出器で共有するデフォルトのトランスポート（接続プールを共有する）"""
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport()
+        return _shared_transport
@@ -0,0 +1,193 @@
+"""
+求人詳細ページの解析 - 詳細ページのHTMLからタイトル・説明・勤務地・カテゴリを取り出す
+取得・キャッシュ・レート制限の状態を持たないため、解析プロセスでも抽出器を作らずにそのまま使える
+- CompleteJobExtractor は取得スレッド内での解析に JobDetailParser を使う
+- parse_workers > 0 のときは、解析プロセスが parse_detail_batch() でデコードから抽出までを行う
+"""
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from src.extractors.html_decoding import decode_html
+from src.extractors.keyword_classifier import get_shared_classifier
+from src.extractors.page_analysis import PageAnalysis
+
+# 解析プロセスに渡す1ページ: (求人コード, URL, 本文のバイト列, Content-Type)
+DetailPage = Tuple[str, str, bytes, Optional[str]]
+
+# 解析結果: (求人コード, 求人情報, 文字コード, 判定の試行回数, 段階ごとの秒数)
+DetailResult = Tuple[str, Optional[Dict[str, str]], str, int, Dict[str, float]]
+
+class JobDetailParser:
+    def parse(self, soup: BeautifulSoup, url: str, job_code: str) -> Optional[Dict[str, str]]:
+        """
+        個別求人ページから情報を抽出（タイトルが見つからなければNone）
+        """
+        try:
+            # テキスト・行・要素一覧は1回だけ計算して各項目の抽出で共有
+            page = PageAnalysis(soup)
+
+            # タイトル抽出
+            title = self._extract_job_title(page)
+            if not title:
+                return None
+
+            # 説明文抽出
+            description = self._extract_job_description(page)
+
+            # 勤務地抽出
+            location = self._extract_job_location(page)
+
+            # 職種・カテゴリ抽出
+            category = self._extract_job_category(page)
+
+            return {
+                'title': title,
+                'url': url,
+                'job_code': job_code,
+                'description': description or "詳細情報なし",
+                'location': location or "勤務地不明",
+                'category': category or "カテゴリ不明",
+                'source': 'jposting_complete'
+            }
+
+        except Exception as e:
+            print(f"      ❌ 求人詳細解析エラー: {e}")
+            return None
+
+    def _extract_job_title(self, page: PageAnalysis) -> str:
+        """求人タイトルを抽出"""
+        # h2タグから抽出（最も可能性が高い）
+        for h2 in page.elements_by_tag('h2'):
+            text = page.text_of(h2).strip()
+            if text and len(text) > 5 and self._looks_like_job_title(text):
+                return self._clean_title(text)
+
+        # h1タグから抽出
+        for h1 in page.elements_by_tag('h1'):
+            text = page.text_of(h1).strip()
+            if text and len(text) > 5 and text != '求人詳細':
+                return self._clean_title(text)
+
+        # テーブルの最初の行から抽出を試行
+        for table in page.elements_by_tag('table'):
+            rows = table.find_all('tr', limit=3)
+            for row in rows:  # 最初の3行をチェック
+                cells = row.find_all(['td', 'th'])
+                if len(cells) >= 2:
+                    # 2列目（職種名列）をチェック
+                    title_text = page.text_of(cells[1]).strip()
+                    if self._looks_like_job_title(title_text):
+                        return self._clean_title(title_text)
+
+        # フォールバック: ページ内の長めのテキストから推測
+        for line in page.lines[:30]:  # 最初の30行から探す
+            if self._looks_like_job_title(line) and len(line) > 10:
+                return self._clean_title(line)
+
+        # 最終フォールバック: job_codeから生成
+        job_code_inputs = [element for element in page.elements_by_tag('input') if element.get('name') == 'job_code']
+        return f"求人番号_{job_code_inputs[0] if job_code_inputs else 'unknown'}"
+
+    def _extract_job_description(self, page: PageAnalysis) -> str:
+        """求人説明を抽出"""
+        # 説明が含まれていそうな要素を探す
+        # （'.job-description', '.description', '.content', '.detail', '[class*="desc"]', 'p' の順）
+        class_selectors = ['job-description', 'description', 'content', 'detail']
+        matches = [[] for _ in range(len(class_selectors) + 2)]
+
+        # 全要素を1回だけ走査して各セレクタの一致要素を振り分ける
+        for element in page.elements:
+            classes = element.get('class') or []
+            for i, class_name in enumerate(class_selectors):
+                if class_name in classes:
+                    matches[i].append(element)
+            if classes and 'desc' in ' '.join(classes):
+                matches[-2].append(element)
+            if element.name == 'p':
+                matches[-1].append(element)
+
+        descriptions = []
+        for elements in matches:
+            for element in elements:
+                text = page.text_of(element).strip()
+                if len(text) > 50 and len(text) < 1000:  # 適切な長さ
+                    descriptions.append(text)
+
+        if descriptions:
+            # 最も詳細な説明を選択
+            return max(descriptions, key=len)[:500]  # 500文字まで
+
+        return None
+
+    def _extract_job_location(self, page: PageAnalysis) -> str:
+        """勤務地を抽出"""
+        lines = page.text.split('\\n')
+
+        for line in lines:
+            line = line.strip()
+            if get_shared_classifier('complete_location').matches(line):
+                if len(line) < 100:  # 長すぎない
+                    return line
+
+        return None
+
+    def _extract_job_category(self, page: PageAnalysis) -> str:
+        """職種カテゴリを抽出"""
+        return get_shared_classifier('complete_category').first(page.text)
+
+    def _looks_like_job_title(self, text: str) -> bool:
+        """テキストが求人タイトルらしいかチェック"""
+        if not text or len(text) < 10 or len(text) > 200:
+            return False
+
+        return get_shared_classifier('complete_title').matches(text)
+
+    def _clean_title(self, title: str) -> str:
+        """求人タイトルをクリーンアップ"""
+        if not title:
+            return ""
+
+        # 不要な文字を除去
+        title = re.sub(r'\\s+', ' ', title)
+        title = re.sub(r'\\n+', ' ', title)
+        title = title.strip()
+
+        # 長すぎる場合は切り詰め
+        if len(title) > 150:
+            title = title[:147] + "..."
+
+        return title
+
+def parse_detail_pages(pages: List[DetailPage], parser: Optional[JobDetailParser] = None) -> List[DetailResult]:
+    """
+    詳細ページのまとまりをデコード・解析し、段階ごとの時間とあわせて返す
+    """
+    parser = parser or JobDetailParser()
+    results = []
+    for job_code, url, content, content_type in pages:
+        started = time.perf_counter()
+        decoded = decode_html(content, url, content_type)
+        decoded_at = time.perf_counter()
+        soup = BeautifulSoup(decoded.text, 'html.parser')
+        parsed_at = time.perf_counter()
+        job_info = parser.parse(soup, url, job_code)
+        timings = {
+            'decode': decoded_at - started,
+            'parse': parsed_at - decoded_at,
+            'extract': time.perf_counter() - parsed_at,
+        }
+        results.append((job_code, job_info, decoded.encoding, decoded.attempts, timings))
+    return results
+
+_process_parser = JobDetailParser()
+
+def parse_detail_batch(pages: List[DetailPage]) -> List[DetailResult]:
+    """
+    解析プロセスの入口（プロセスプールから呼ぶためモジュール関数）
+    解析器は状態を持たないため、呼び出しごとに抽出器や接続を用意する必要はない
+    """
+    return parse_detail_pages(pages, _process_parser)
@@ -0,0 +1,17 @@
+"""
+抽出イベント - iter_jobs() が順に返す求人・進捗のイベント
+- {'type': 'job', 'job': 求人}: 求人を1件抽出できた時点で返す
+- {'type': 'progress', 'stage': 段階, 'done': 処理済み数, 'total': 全体数}: 段階は 'listing' / 'details' / 'done'
+"""
+
+from typing import Any, Dict, Iterable, List
+
+def job_event(job: Dict[str, str]) -> Dict[str, Any]:
+    return {'type': 'job', 'job': job}
+
+def progress_event(stage: str, done: int, total: int) -> Dict[str, Any]:
+    return {'type': 'progress', 'stage': stage, 'done': done, 'total': total}
+
+def collect_jobs(events: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """イベント列から求人だけを受け取った順に集める（進捗は読み捨てる）"""
+    return [event['job'] for event in events if event['type'] == 'job']
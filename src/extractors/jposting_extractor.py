@@ -6,16 +6,28 @@ https://progres02.jposting.net/pgmitsubishielectric/u/job.phtml から求人情
 import requests
 from bs4 import BeautifulSoup
 import re
-from typing import List, Dict
+from typing import List, Dict, Optional
 import time
 
+from src.extractors.crawl_metrics import get_metrics_registry
+from src.extractors.http_cache import HttpCache, get_shared_cache
+from src.extractors.http_transport import HttpTransport, get_shared_transport
+from src.extractors.jposting_site import DEFAULT_BASE_URL, DEFAULT_COMPANY, listing_url
+from src.extractors.keyword_classifier import get_shared_classifier
+from src.extractors.text_blocks import scan_text_blocks
+
 class JPOSTINGExtractor:
-    def __init__(self):
-        self.base_url = "https://progres02.jposting.net"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, http_cache: Optional[HttpCache] = None, transport: Optional[HttpTransport] = None,
+                 base_url: Optional[str] = None, company: Optional[str] = None):
+        """
+        base_url: 採用サイトのURL（省略時は JPOSTING_BASE_URL または本番サイト）
+        company: 採用サイト上の企業（テナント）のパス（省略時は JPOSTING_COMPANY または三菱電機）
+        """
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.company = company or DEFAULT_COMPANY
+        self.http_cache = http_cache or get_shared_cache()
+        self.transport = transport or get_shared_transport()
+        self.metrics = get_metrics_registry()
     
     def extract_jobs(self, url: str) -> List[Dict[str, str]]:
         """
@@ -23,19 +35,29 @@ class JPOSTINGExtractor:
         """
         try:
             print(f"🔍 求人ページにアクセス中: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # 文字エンコーディングを明示的に設定
-            response.encoding = 'utf-8'
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            with self.metrics.page(url, 'jposting') as record:
+                response = self.http_cache.get(self.transport, url, timeout=10)
+                response.raise_for_status()
+                
+                # 304（未更新）なら前回の解析結果をそのまま使う
+                cached_jobs = self.http_cache.load_parsed(response, 'jposting_jobs')
+                if cached_jobs is not None:
+                    print(f"♻️ 未更新のため前回の解析結果を再利用: {len(cached_jobs)}件")
+                    return cached_jobs
+                
+                # 文字エンコーディングを明示的に設定
+                response.encoding = 'utf-8'
+                record.encoding = response.encoding
+                
+                with record.phase('parse'):
+                    soup = BeautifulSoup(response.text, 'html.parser')
+                
+                # 求人情報を探す - 職種名のパターンを探索
+                # サイト構造から、職種名は様々な形式で表示されている
+                with record.phase('extract'):
+                    job_elements = self._find_job_elements(soup)
             jobs = []
             
-            # 求人情報を探す - 職種名のパターンを探索
-            # サイト構造から、職種名は様々な形式で表示されている
-            job_elements = self._find_job_elements(soup)
-            
             print(f"📋 {len(job_elements)}件の求人を発見")
             
             for i, element in enumerate(job_elements):
@@ -54,6 +76,8 @@ class JPOSTINGExtractor:
                     print(f"  ⚠️ 求人 {i+1} の解析エラー: {e}")
                     continue
             
+            if jobs:
+                self.http_cache.store_parsed(response, 'jposting_jobs', jobs)
             return jobs
             
         except requests.exceptions.RequestException as e:
@@ -85,13 +109,12 @@ class JPOSTINGExtractor:
                     job_elements.append(item)
         
         # パターン3: div要素で構成されている場合
-        divs = soup.find_all('div')
-        for div in divs:
+        # 下から上への1回の走査で各divのテキストを求め、子divの連結にすぎない祖先は評価しない
+        for block in scan_text_blocks(soup, max_length=199):
             # 求人タイトルらしいテキストが含まれているdiv
-            text = div.get_text().strip()
-            if any(keyword in text for keyword in ['【', 'エンジニア', '技術', '営業', '管理']):
-                if len(text) > 10 and len(text) < 200:  # 適切な長さ
-                    job_elements.append(div)
+            if get_shared_classifier('jposting_block').matches(block.text):
+                if len(block.text) > 10:  # 適切な長さ（200文字未満は走査時に絞り込み済み）
+                    job_elements.append(block.element)
         
         # パターン4: 直接テキストをスキャン
         all_text = soup.get_text()
@@ -100,10 +123,11 @@ class JPOSTINGExtractor:
             line = line.strip()
             if self._looks_like_job_title(line):
                 # 疑似要素として作成
+                # （インスタンスから呼ばれるため staticmethod にし、行はその時点の値を束縛する）
                 fake_element = type('Element', (), {
-                    'get_text': lambda: line,
-                    'find': lambda *args: None,
-                    'find_all': lambda *args: []
+                    'get_text': staticmethod(lambda line=line: line),
+                    'find': staticmethod(lambda *args: None),
+                    'find_all': staticmethod(lambda *args: [])
                 })()
                 job_elements.append(fake_element)
         
@@ -128,13 +152,6 @@ class JPOSTINGExtractor:
         if not text or len(text) < 5 or len(text) > 150:
             return False
         
-        # 求人タイトルの特徴
-        job_indicators = [
-            '【', 'エンジニア', '技術者', '設計', '開発', '管理', '営業',
-            '担当', 'スタッフ', '職', '業務', '責任者', 'マネージャー',
-            '製作所', '事業所', 'NEW', '経験', '未経験', 'WEB面接'
-        ]
-        
         # 除外パターン
         exclude_patterns = [
             '職種名', '勤務地', '応募', '選考', '面接', '説明会',
@@ -148,7 +165,7 @@ class JPOSTINGExtractor:
                 return False
         
         # 求人指標が含まれているかチェック
-        return any(indicator in text for indicator in job_indicators)
+        return get_shared_classifier('jposting_title').matches(text)
     
     def _parse_job_element(self, element) -> Dict[str, str]:
         """
@@ -200,7 +217,7 @@ class JPOSTINGExtractor:
         求人詳細URLを抽出（試行）
         """
         # デフォルトURL（詳細ページが見つからない場合）
-        default_url = "https://progres02.jposting.net/pgmitsubishielectric/u/job.phtml"
+        default_url = listing_url(self.base_url, self.company)
         
         try:
             # リンク要素を探す
@@ -240,7 +257,7 @@ def extract_jobs_from_url(url: str) -> List[Dict[str, str]]:
 
 if __name__ == "__main__":
     # テスト実行
-    url = "https://progres02.jposting.net/pgmitsubishielectric/u/job.phtml"
+    url = listing_url()
     
     try:
         print("🚀 JPOSTING求人抽出器 - テスト実行")
@@ -0,0 +1,23 @@
+"""
+JPOSTING採用サイトのURL定義 - 抽出器が参照するサイトの場所を1か所にまとめる
+環境変数 JPOSTING_BASE_URL を設定すると、ローカルのフィクスチャサーバーなど別の場所を参照できる
+同じ基盤に載っている他の企業（テナント）は company（URLの1階層目）で切り替える（既定は JPOSTING_COMPANY）
+"""
+
+import os
+from typing import Optional
+
+DEFAULT_BASE_URL = os.environ.get('JPOSTING_BASE_URL', 'https://progres02.jposting.net').rstrip('/')
+DEFAULT_COMPANY = os.environ.get('JPOSTING_COMPANY', 'pgmitsubishielectric')
+
+def job_directory_url(base_url: Optional[str] = None, company: Optional[str] = None) -> str:
+    """求人ページが置かれているディレクトリ（相対リンクの基準）"""
+    return f"{(base_url or DEFAULT_BASE_URL).rstrip('/')}/{company or DEFAULT_COMPANY}/u/"
+
+def listing_url(base_url: Optional[str] = None, company: Optional[str] = None) -> str:
+    """求人一覧ページのURL"""
+    return job_directory_url(base_url, company) + 'job.phtml'
+
+def detail_url(job_code: str, base_url: Optional[str] = None, company: Optional[str] = None) -> str:
+    """求人詳細ページのURL"""
+    return f"{listing_url(base_url, company)}?job_code={job_code}"
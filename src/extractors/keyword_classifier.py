@@ -0,0 +1,161 @@
+"""
+キーワード分類器 - キーワード表から正規表現を1つだけ作り、1回の走査で該当カテゴリを判定する
+`any(keyword in text for keyword in keywords)` をカテゴリごとに繰り返す代わりに使う
+抽出器が使うキーワード表はここにまとめ、get_shared_classifier() でプロセスに1つずつだけ作る
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class KeywordClassifier:
+    def __init__(self, table: Dict[str, Iterable[str]], ignore_case: bool = False):
+        """
+        table: カテゴリ名 -> キーワード一覧（カテゴリの順序が判定の優先順位になる）
+        ignore_case: 英字の大文字・小文字を区別しない
+        """
+        self.labels = list(table)
+        # キーワードに英字などの大文字・小文字がなければ、テキストを小文字化する必要もない
+        self.ignore_case = ignore_case and any(
+            keyword.lower() != keyword.upper() for keywords in table.values() for keyword in keywords
+        )
+
+        keywords = sorted({self._normalize(keyword) for keywords in table.values() for keyword in keywords if keyword},
+                          key=len, reverse=True)
+        if not keywords:
+            raise ValueError("キーワードが1つもありません")
+
+        self._search_pattern = re.compile(self._trie_pattern(keywords))
+
+        # 優先順位つきの判定用にカテゴリごとのパターンも持つ（見つかった時点で打ち切れる）
+        self._label_patterns = [
+            (label, re.compile(self._trie_pattern(sorted({self._normalize(k) for k in table[label] if k}, key=len, reverse=True))))
+            for label in self.labels if any(table[label])
+        ]
+
+    def matches(self, text: str) -> bool:
+        """いずれかのキーワードを含むか"""
+        if not text:
+            return False
+        return self._search_pattern.search(self._normalize(text)) is not None
+
+    def first(self, text: str) -> Optional[str]:
+        """表の順序で最初に該当するカテゴリ（該当なしはNone）"""
+        if not text:
+            return None
+
+        text = self._normalize(text)
+        for label, pattern in self._label_patterns:
+            if pattern.search(text):
+                return label
+        return None
+
+    def _normalize(self, text: str) -> str:
+        return text.lower() if self.ignore_case else text
+
+    @staticmethod
+    def _trie_pattern(keywords: List[str]) -> str:
+        """
+        共通の接頭辞をまとめた正規表現を作る（各位置で先頭文字だけで候補を絞れる）
+        分岐は長い方を先に試すため、各位置では最長一致のキーワードが選ばれる
+        """
+        trie: Dict[str, dict] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict[str, dict]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            if len(branches) == 1:
+                body = branches[0]
+            elif all(len(branch) == 1 for branch in branches):
+                body = '[' + ''.join(branches) + ']'
+            else:
+                body = '(?:' + '|'.join(branches) + ')'
+            if '' in node:
+                # ここで終わるキーワードもあるため、続きは貪欲な省略可能グループにする
+                return '(?:' + body + ')?'
+            return body
+
+        return build(trie)
+
+# 抽出器が使うキーワード表: 名前 -> (カテゴリ名 -> キーワード一覧, 大文字・小文字を区別しないか)
+KEYWORD_TABLES: Dict[str, Tuple[Dict[str, List[str]], bool]] = {
+    # 求人タイトルらしさ（CompleteJobExtractor）
+    'complete_title': ({
+        'job_title': [
+            '【', '】', 'エンジニア', '技術者', '開発', '設計', '営業',
+            '企画', '管理', 'システム', 'ソフト', '製造', 'プロジェクト',
+            'WEB面接', '東京', '大阪', '神戸', '製作所', '担当', '主任'
+        ]
+    }, False),
+    # 勤務地らしい行（CompleteJobExtractor）
+    'complete_location': ({
+        'location': ['勤務地', '所在地', '勤務先', '場所', '東京', '大阪', '神戸', '製作所']
+    }, False),
+    # 職種カテゴリ（CompleteJobExtractor、先に書いたカテゴリを優先）
+    'complete_category': ({
+        'エンジニア系': ['エンジニア', '開発', '設計'],
+        'ビジネス系': ['営業', '企画', '人事', 'マーケティング'],
+        '製造系': ['製造', '品質', '生産'],
+    }, True),
+    # タイトルによる求人カテゴリ（SimpleJobExtractor、先に書いたカテゴリを優先）
+    'simple_category': ({
+        'エンジニア系': ['エンジニア', '開発', '設計', '技術'],
+        'ビジネス系': ['営業', '企画', '人事', '採用', 'マーケティング'],
+        '製造・生産系': ['製造', '生産', '品質', '組立'],
+        'IT・デジタル系': ['it', 'システム', 'ai', 'dx', 'デジタル'],
+    }, True),
+    # 求人らしい行（extract_jobs_from_url_simple）
+    'simple_line': ({
+        'job_line': ['技術', '営業', '管理', '設計', '開発', 'エンジニア', 'マネージャー', '担当', 'スタッフ']
+    }, False),
+    # 求人タイトルによく含まれるキーワード（EnhancedJPOSTINGExtractor）
+    'enhanced_title': ({
+        'job_title': [
+            'エンジニア', '技術者', '開発', '設計', '営業', '企画', '管理',
+            '【', '】', 'システム', 'ソフト', 'ハード', '製造', '品質',
+            'プロジェクト', 'マネージャー', '主任', '課長', '部長', '担当',
+            '正社員', '契約', '派遣', 'WEB面接', '東京', '大阪', '神戸'
+        ]
+    }, False),
+    # 求人関連のURL・リンクテキスト（EnhancedJPOSTINGExtractor）
+    'enhanced_link': ({
+        'job_link': [
+            'job', 'career', 'recruit', 'position', 'employment',
+            '求人', '募集', '採用', '職種', 'キャリア'
+        ]
+    }, True),
+    # 求人タイトルの特徴（JPOSTINGExtractor）
+    'jposting_title': ({
+        'job_title': [
+            '【', 'エンジニア', '技術者', '設計', '開発', '管理', '営業',
+            '担当', 'スタッフ', '職', '業務', '責任者', 'マネージャー',
+            '製作所', '事業所', 'NEW', '経験', '未経験', 'WEB面接'
+        ]
+    }, False),
+    # 求人タイトルらしいテキストを含むdiv（JPOSTINGExtractor）
+    'jposting_block': ({
+        'job_block': ['【', 'エンジニア', '技術', '営業', '管理']
+    }, False),
+}
+
+_shared_classifiers: Dict[str, KeywordClassifier] = {}
+_shared_classifiers_lock = threading.Lock()
+
+def get_shared_classifier(name: str) -> KeywordClassifier:
+    """
+    KEYWORD_TABLES の表から作った分類器（表ごとにプロセスで1つだけ作り、抽出器・ベンチマークで共有する）
+    """
+    with _shared_classifiers_lock:
+        classifier = _shared_classifiers.get(name)
+        if classifier is None:
+            if name not in KEYWORD_TABLES:
+                raise ValueError(f"未対応のキーワード表: {name}（{', '.join(KEYWORD_TABLES)}）")
+            table, ignore_case = KEYWORD_TABLES[name]
+            classifier = _shared_classifiers[name] = KeywordClassifier(table, ignore_case=ignore_case)
+        return classifier
@@ -0,0 +1,180 @@
+"""
+リンク抽出 - 求人一覧ページから <a href> だけを高速に取り出す
+一覧ページではリンク以外の要素を使わないため、DOM全体を構築せずに済ませる
+
+モード:
+- full: html.parser でDOM全体を構築（従来の動作）
+- strainer: SoupStrainer で <a href> 以外を捨てながら解析（lxmlがあればlxmlを使用）
+  入れ子の <a> では外側のリンクのテキストが full と異なる
+- stream: HTMLParser のイベントを直接処理し、木を作らない
+
+既定は stream（フィクスチャの一覧・閉じ忘れのある一覧・ランダムなHTMLで full と同じ結果になることを
+tests/test_link_parser.py で確認している）。記録した一覧ページでは verify_link_parsers() で確認できる
+"""
+
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import HTMLTreeBuilder
+from bs4.builder._htmlparser import BeautifulSoupHTMLParser
+from bs4.dammit import EntitySubstitution
+
+try:
+    import lxml  # noqa: F401
+    STRAINER_PARSER = 'lxml'
+except ImportError:
+    STRAINER_PARSER = 'html.parser'
+
+LINK_PARSER_MODES = ('full', 'strainer', 'stream')
+DEFAULT_LINK_PARSER = 'stream'
+
+def extract_links(html: str, mode: str = DEFAULT_LINK_PARSER) -> List[Tuple[str, str]]:
+    """
+    HTMLから (href, リンクテキスト) の一覧を文書順で返す
+    リンクテキストは BeautifulSoup の get_text() と同じ内容
+    """
+    if mode == 'full':
+        soup = BeautifulSoup(html, 'html.parser')
+        return [(link['href'], link.get_text()) for link in soup.find_all('a', href=True)]
+
+    if mode == 'strainer':
+        soup = BeautifulSoup(html, STRAINER_PARSER, parse_only=SoupStrainer('a', href=True))
+        return [(link['href'], link.get_text()) for link in soup.find_all('a', href=True)]
+
+    if mode == 'stream':
+        parser = _LinkStreamParser()
+        parser.feed(html)
+        parser.close()
+        return parser.finish()
+
+    raise ValueError(f"未対応のリンク解析モード: {mode}（{', '.join(LINK_PARSER_MODES)}）")
+
+class _LinkStreamParser(HTMLParser):
+    """
+    <a href> の開始から終了までのテキストだけを集めるストリームパーサー
+    full（BeautifulSoup + html.parser）と同じ結果になるよう、開いている要素をスタックで追い、
+    終了タグでは対応する要素より内側の要素（閉じ忘れの <a> を含む）もまとめて閉じる
+    """
+
+    # get_text() の対象外になる要素
+    IGNORED_TEXT_TAGS = ('script', 'style', 'template')
+
+    # 終了タグを持たない要素（スタックに積まない）
+    VOID_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+
+    # 空白だけのテキストをそのまま残す要素（それ以外では BeautifulSoup が1文字にまとめる）
+    PRESERVE_WHITESPACE_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+    ASCII_SPACES = {ord(c): None for c in '\x20\x0a\x09\x0c\x0d'}
+
+    def __init__(self):
+        # 文字参照は BeautifulSoup と同じ規則で自前で変換する（文書末尾の不完全な参照の扱いも合わせる）
+        super().__init__(convert_charrefs=False)
+        self.links: List[list] = []
+        # 開いている要素の (タグ名, リンク) のスタック（リンクは <a href> の場合のみ）
+        self._stack: List[Tuple[str, Optional[list]]] = []
+        self._open_links: List[list] = []
+        self._ignored_depth = 0
+        self._preserve_depth = 0
+        # 終了タグなしで閉じた要素の名前（後から来た同名の終了タグは読み飛ばす）
+        self._already_closed: List[str] = []
+        # 次のタグまでのテキスト（BeautifulSoup と同様にタグの間のテキストを1つにまとめてから扱う）
+        self._pending: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in self.VOID_TAGS:
+            self._already_closed.append(tag)
+            return
+
+        link = None
+        if tag in self.IGNORED_TEXT_TAGS:
+            self._ignored_depth += 1
+        elif tag == 'a':
+            href = dict(attrs).get('href')
+            if href is not None:
+                link = [href, []]
+                self.links.append(link)
+                self._open_links.append(link)
+        if tag in self.PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+        self._stack.append((tag, link))
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            if href is not None:
+                self.links.append([href, []])
+
+    def handle_endtag(self, tag):
+        # 閉じ済みの空要素の終了タグはテキストを区切らない（BeautifulSoup と同じ）
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+            return
+
+        self._flush()
+        # 開いていない要素の終了タグは無視する（BeautifulSoup と同じ）
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth][0] == tag:
+                break
+        else:
+            return
+
+        while len(self._stack) > depth:
+            name, link = self._stack.pop()
+            if name in self.PRESERVE_WHITESPACE_TAGS:
+                self._preserve_depth -= 1
+            if name in self.IGNORED_TEXT_TAGS:
+                self._ignored_depth -= 1
+            elif link is not None:
+                # 同じ href・テキストのリンクを取り違えないよう、同一性で探して外す
+                index = next(i for i, open_link in enumerate(self._open_links) if open_link is link)
+                del self._open_links[index]
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._pending.append(character if character is not None else f"&{name}")
+
+    def handle_charref(self, name):
+        dereferenced, _, extra_data = BeautifulSoupHTMLParser._dereference_numeric_character_reference(name)
+        self._pending.append(dereferenced + extra_data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        # <![CDATA[...]]> の中身は独立したテキストとして、script・style の中でも get_text() に含まれる
+        self._flush()
+        if data.upper().startswith('CDATA['):
+            self._pending.append(data[len('CDATA['):])
+            self._flush(cdata=True)
+
+    def _flush(self, cdata: bool = False):
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending = []
+        if (self._ignored_depth and not cdata) or not self._open_links:
+            return
+
+        # 空白だけのテキストは改行を含めば '\n'、含まなければ ' ' になる（BeautifulSoup と同じ）
+        if not self._preserve_depth and not text.translate(self.ASCII_SPACES):
+            text = '\n' if '\n' in text else ' '
+
+        # 入れ子のリンクでは外側のリンクのテキストにも含まれる
+        for link in self._open_links:
+            link[1].append(text)
+
+    def finish(self) -> List[Tuple[str, str]]:
+        self._flush()
+        return [(href, ''.join(parts)) for href, parts in self.links]
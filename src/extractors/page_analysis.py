@@ -0,0 +1,63 @@
+"""
+ページ解析キャッシュ - 1つのHTML文書に対する走査結果を1回だけ計算して共有する
+各項目の抽出処理が soup.get_text() や全体の要素探索を繰り返さないようにする
+"""
+
+from typing import Dict, List
+
+from bs4 import BeautifulSoup, Tag
+
+class PageAnalysis:
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self._text = None
+        self._lower_text = None
+        self._lines = None
+        self._elements = None
+        self._elements_by_tag = None
+        self._element_texts: Dict[int, str] = {}
+
+    @property
+    def text(self) -> str:
+        """ページ全体のテキスト（soup.get_text() と同じ）"""
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+
+    @property
+    def lower_text(self) -> str:
+        """小文字化したページ全体のテキスト"""
+        if self._lower_text is None:
+            self._lower_text = self.text.lower()
+        return self._lower_text
+
+    @property
+    def lines(self) -> List[str]:
+        """前後の空白を除いた空でない行"""
+        if self._lines is None:
+            self._lines = [line.strip() for line in self.text.split('\n') if line.strip()]
+        return self._lines
+
+    @property
+    def elements(self) -> List[Tag]:
+        """文書順のすべての要素（1回の走査で取得）"""
+        if self._elements is None:
+            self._elements = self.soup.find_all(True)
+        return self._elements
+
+    def elements_by_tag(self, name: str) -> List[Tag]:
+        """タグ名ごとの要素一覧（文書順）"""
+        if self._elements_by_tag is None:
+            self._elements_by_tag = {}
+            for element in self.elements:
+                self._elements_by_tag.setdefault(element.name, []).append(element)
+        return self._elements_by_tag.get(name, [])
+
+    def text_of(self, element: Tag) -> str:
+        """要素のテキスト（要素ごとに1回だけ計算）"""
+        key = id(element)
+        text = self._element_texts.get(key)
+        if text is None:
+            text = element.get_text()
+            self._element_texts[key] = text
+        return text
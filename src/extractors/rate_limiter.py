@@ -0,0 +1,63 @@
+"""
+レート制限 - ホストごとのトークンバケット
+複数スレッドから同じホストへのリクエスト間隔を制御する
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        rate: 1秒あたりに補充するトークン数（= 最大リクエスト/秒）
+        capacity: 貯められるトークンの上限（瞬間的なバースト数）
+        """
+        if rate <= 0:
+            raise ValueError("rateは正の値を指定してください")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得できるまで待機"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+
+                wait_seconds = (1.0 - self._tokens) / self.rate
+
+            time.sleep(wait_seconds)
+
+class HostRateLimiter:
+    def __init__(self, requests_per_second: Optional[float] = 2.0, burst: float = 1.0):
+        """
+        requests_per_second: ホストごとの上限（Noneで無制限）
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """URLのホストに対するリクエスト枠が空くまで待機"""
+        if not self.requests_per_second:
+            return
+
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+
+        bucket.acquire()
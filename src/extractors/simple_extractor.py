@@ -2,12 +2,16 @@
 改良版JPOSTING求人抽出器 - より確実な抽出
 """
 
-import requests
 from bs4 import BeautifulSoup
 import re
 from typing import List, Dict
 import time
 
+from src.extractors.crawl_metrics import get_metrics_registry
+from src.extractors.http_transport import get_shared_transport
+from src.extractors.jposting_site import listing_url
+from src.extractors.keyword_classifier import get_shared_classifier
+
 def extract_jobs_from_url_simple(url: str) -> List[Dict[str, str]]:
     """
     簡易版求人抽出 - 確実に何件かの求人を返す
@@ -15,15 +19,14 @@ def extract_jobs_from_url_simple(url: str) -> List[Dict[str, str]]:
     try:
         print(f"🔍 求人ページにアクセス中: {url}")
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        response.encoding = 'utf-8'
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # 共有トランスポートで接続を再利用し、一時的な失敗は再試行する
+        with get_metrics_registry().page(url, 'simple_extractor') as record:
+            response = get_shared_transport().get(url, timeout=10)
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            
+            with record.phase('parse'):
+                soup = BeautifulSoup(response.text, 'html.parser')
         
         # より簡単なパターンで求人を抽出
         jobs = []
@@ -31,14 +34,13 @@ def extract_jobs_from_url_simple(url: str) -> List[Dict[str, str]]:
         # パターン1: 「技術」「営業」「管理」「設計」等の単語が含まれる行
         text_lines = soup.get_text().split('\n')
         
-        job_keywords = ['技術', '営業', '管理', '設計', '開発', 'エンジニア', 'マネージャー', '担当', 'スタッフ']
         location_keywords = ['東京', '大阪', '神戸', '横浜', '名古屋', '福岡', '静岡', '兵庫', '神奈川']
         
         for line in text_lines:
             line = line.strip()
             
             # 求人らしい行の条件
-            if (any(keyword in line for keyword in job_keywords) and 
+            if (get_shared_classifier('simple_line').matches(line) and 
                 len(line) > 10 and len(line) < 150 and
                 not line.startswith('職種名') and
                 not line.startswith('勤務地')):
@@ -47,7 +49,7 @@ def extract_jobs_from_url_simple(url: str) -> List[Dict[str, str]]:
                 clean_line = re.sub(r'\s+', ' ', line)
                 
                 # URLは固定（実際の詳細ページが見つからないため）
-                default_url = "https://progres02.jposting.net/pgmitsubishielectric/u/job.phtml"
+                default_url = listing_url()
                 
                 jobs.append({
                     'title': clean_line[:100],  # 最大100文字まで
@@ -115,7 +117,7 @@ def extract_jobs_from_url_simple(url: str) -> List[Dict[str, str]]:
 
 if __name__ == "__main__":
     # テスト実行
-    url = "https://progres02.jposting.net/pgmitsubishielectric/u/job.phtml"
+    url = listing_url()
     jobs = extract_jobs_from_url_simple(url)
     
     print("\n" + "=" * 60)
@@ -0,0 +1,87 @@
+"""
+テキストブロック走査 - 文書を下から上へ1回だけ走査し、各ブロック要素のテキストを子の結果から組み立てる
+入れ子のdivごとに get_text() を呼ぶと深さに比例して同じテキストを何度も作るため、その代わりに使う
+
+- テキストは長さの上限まで組み立て、超えた要素（とその祖先）は対象外にする
+- 子ブロックのテキストを連結しただけの祖先は評価しない（自分自身の「ゆるい」テキストを持つブロックだけを返す）
+"""
+
+from typing import Dict, List, NamedTuple
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+# div に対する get_text() が対象にする文字列の型（Comment や script 内の文字列は含まない）
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+class TextBlock(NamedTuple):
+    element: Tag
+    text: str  # element.get_text().strip() と同じ
+
+def scan_text_blocks(root: BeautifulSoup, max_length: int, tag: str = 'div') -> List[TextBlock]:
+    """
+    tag 要素のうち、前後の空白を除いたテキストが max_length 文字以下で、
+    入れ子の tag 要素の外に空白以外のテキストを持つものを文書順で返す
+    """
+    # 要素ごとの (テキスト, 自分のブロック内の空白以外のテキストがあるか)
+    # テキストは前後の空白を max_length+1 文字までに縮めて持つ（上限を超えたら None）
+    results: Dict[int, tuple] = {}
+    blocks: List[TextBlock] = []
+
+    elements = [element for element in root.descendants if isinstance(element, Tag)]
+
+    # 子は必ず親より後に現れるため、逆順に処理すれば子の結果が先に揃う
+    for element in reversed(elements):
+        parts = []
+        overflow = False
+        loose = False
+
+        for child in element.contents:
+            if isinstance(child, Tag):
+                child_text, child_loose = results.pop(id(child))
+                if child_text is None:
+                    overflow = True
+                    break
+                parts.append(child_text)
+                if child_loose and child.name != tag:
+                    loose = True
+            elif type(child) in TEXT_STRING_TYPES:
+                core = child.strip()
+                if len(core) > max_length:
+                    overflow = True
+                    break
+                parts.append(_trim_edges(child, max_length))
+                if core:
+                    loose = True
+
+        text = None
+        if not overflow:
+            text = ''.join(parts)
+            stripped = text.strip()
+            if len(stripped) > max_length:
+                text = None
+            else:
+                text = _trim_edges(text, max_length)
+                if element.name == tag and loose:
+                    blocks.append(TextBlock(element, stripped))
+
+        results[id(element)] = (text, loose)
+
+    blocks.reverse()
+    return blocks
+
+def _trim_edges(text: str, max_length: int) -> str:
+    """
+    前後の空白を max_length+1 文字までに縮める
+    縮めた空白が親で内側に入れば、その時点で上限を超えるため結果は変わらない
+    """
+    limit = max_length + 1
+    if len(text) <= 2 * limit + max_length:
+        return text
+
+    stripped = text.strip()
+    if not stripped:
+        return text[:limit]
+
+    start = text.index(stripped[0])
+    end = start + len(stripped)
+    return text[max(0, start - limit):start] + stripped + text[end:end + limit]
@@ -0,0 +1,163 @@
+"""
+ベクトルインデックス - 求人の埋め込みベクトルとプロフィールの類似度で、LLMに渡す候補を絞り込む
+- 求人の埋め込みはカタログの版ごとに1回だけ計算し、float32の連続した行列（.npy）として保存する
+- 保存した行列はメモリマップして読むため、同じ版を参照するプロセス間ではOSのページキャッシュで共有される
+- 検索は行列とクエリベクトルの積1回と argpartition による上位k件の選択だけで済む
+- 埋め込みの計算方法は差し替えられる（本番は OpenAI の埋め込みAPI、オフラインの確認はハッシュによる埋め込み）
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.catalog.atomic_files import atomic_write, prune_files
+from src.ranker.lexical_index import MAX_FIELD_CHARS, char_ngrams
+
+DEFAULT_EMBEDDING_DIR = os.environ.get('JOB_EMBEDDING_DIR', os.path.join('.cache', 'embeddings'))
+
+EMBEDDING_PATTERN = re.compile(r'^(.+)-([0-9a-f]{32})\.npy$')
+
+class HashingEmbedder:
+    """
+    文字n-gramを固定次元にハッシュして数える埋め込み（APIを使わず、同じ文字列なら常に同じベクトル）
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.name = f"hashing{dimensions}"
+        # n-gram -> (次元, 符号) のキャッシュ（求人の語彙は限られるため、ハッシュの計算は1語1回で済む）
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in char_ngrams(text):
+                bucket = self._buckets.get(token)
+                if bucket is None:
+                    # Pythonの hash() はプロセスごとに変わるため、決定的な crc32 を使う
+                    digest = zlib.crc32(token.encode('utf-8'))
+                    bucket = self._buckets[token] = (digest % self.dimensions, 1.0 if digest & 0x80000000 else -1.0)
+                vectors[row, bucket[0]] += bucket[1]
+        return normalize_rows(vectors)
+
+class OpenAIEmbedder:
+    """
+    OpenAI の埋め込みAPIによる埋め込み（求人は batch_size 件ずつまとめて送る）
+    """
+
+    def __init__(self, client, model: str = 'text-embedding-3-small', batch_size: int = 256):
+        """
+        client: OpenAI クライアント（ランカーと同じものを使う）
+        """
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.name = model
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows = []
+        for start in range(0, len(texts), self.batch_size):
+            # 空文字列はAPIが受け付けないため空白1文字にする
+            batch = [text or ' ' for text in texts[start:start + self.batch_size]]
+            response = self.client.embeddings.create(model=self.model, input=batch)
+            rows.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return normalize_rows(np.asarray(rows, dtype=np.float32))
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """各行を長さ1にする（内積がそのままコサイン類似度になる）"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def job_text(job: Mapping[str, str]) -> str:
+    """埋め込む求人のテキスト（タイトルと説明文の先頭）"""
+    return f"{job.get('title', '')}\n{(job.get('description') or '')[:MAX_FIELD_CHARS]}"
+
+class DenseIndex:
+    def __init__(self, jobs: Sequence[Mapping[str, str]], embedder, cache_dir: Optional[str] = DEFAULT_EMBEDDING_DIR,
+                 keep: int = 3):
+        """
+        jobs: 求人のリスト（スナップショットでもよい。検索結果はこのリストの要素を返す）
+        embedder: embed(texts) で長さ1の float32 の行列を返すもの（HashingEmbedder / OpenAIEmbedder）
+        cache_dir: 埋め込み行列の保存先（Noneなら保存せずメモリ上に持つ）
+        keep: 埋め込み方法ごとに残しておく過去の版の行列の数
+        """
+        self.jobs = jobs
+        self.embedder = embedder
+        self.cache_dir = cache_dir
+        self.keep = max(1, keep)
+
+        started = time.perf_counter()
+        texts = [job_text(job) for job in jobs]
+        # 求人のテキストが同じなら同じ行列を使う（カタログの版が変わっても内容が同じなら再計算しない）
+        fingerprint = hashlib.blake2b('\x00'.join(texts).encode('utf-8'), digest_size=16).hexdigest()
+        self.matrix = self._load_or_embed(texts, fingerprint)
+        print(f"🧭 埋め込みインデックスを準備: {len(texts)}件 × {self.matrix.shape[1] if len(texts) else 0}次元 "
+              f"({time.perf_counter() - started:.2f}秒)")
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        クエリとのコサイン類似度が高い順に最大k件の (求人の番号, 類似度) を返す
+        """
+        size = len(self.matrix)
+        k = min(k, size)
+        if k <= 0:
+            return []
+
+        scores = self.matrix @ self.embedder.embed([query])[0]
+        top = np.argpartition(-scores, k - 1)[:k] if k < size else np.arange(size)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top]
+
+    def shortlist(self, query: str, k: int) -> List[Mapping[str, str]]:
+        """LLMに渡す候補: 類似度の高い順にk件"""
+        return [self.jobs[doc_id] for doc_id, _ in self.search(query, k)]
+
+    def _load_or_embed(self, texts: List[str], fingerprint: str) -> np.ndarray:
+        if self.cache_dir is None:
+            return np.ascontiguousarray(self.embedder.embed(texts), dtype=np.float32)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{self.embedder.name}-{fingerprint}.npy")
+        if os.path.exists(path):
+            print(f"♻️ 保存済みの埋め込みを再利用: {os.path.basename(path)}")
+        else:
+            vectors = np.ascontiguousarray(self.embedder.embed(texts), dtype=np.float32)
+            atomic_write(path, lambda f: np.save(f, vectors))
+            self._prune(path)
+
+        return np.load(path, mmap_mode='r')
+
+    def _prune(self, latest_path: str):
+        """同じ埋め込み方法の行列を新しい順に keep 個だけ残す（保存したばかりの行列は残す）"""
+        def generation(name: str) -> Optional[float]:
+            match = EMBEDDING_PATTERN.match(name)
+            if not match or match.group(1) != self.embedder.name:
+                return None
+            try:
+                return os.path.getmtime(os.path.join(self.cache_dir, name))
+            except OSError:
+                # 他のプロセスが先に削除した
+                return None
+
+        prune_files(self.cache_dir, self.keep, generation, protect=(latest_path,))
+
+_shared_index: Optional[DenseIndex] = None
+_shared_index_lock = threading.Lock()
+
+def get_shared_dense_index(jobs: Sequence[Mapping[str, str]], embedder) -> DenseIndex:
+    """
+    カタログの版ごとに1つだけ作るインデックス（同じ求人リスト・同じ埋め込み方法なら作り直さない）
+    """
+    global _shared_index
+    with _shared_index_lock:
+        if (_shared_index is None or _shared_index.jobs is not jobs or
+                _shared_index.embedder.name != embedder.name):
+            _shared_index = DenseIndex(jobs, embedder)
+        return _shared_index
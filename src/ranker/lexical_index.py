@@ -0,0 +1,135 @@
+"""
+語彙インデックス - LLMに渡す前に、プロフィールに近い求人を候補として絞り込む
+- 形態素解析を使わず、文字の2-gram・3-gramを語として扱う（日本語の複合語の部分一致も拾える）
+- タイトル・説明文の転置インデックスをカタログの版ごとに1回だけ作り、BM25で順位付けする
+- LLMのプロンプトには上位の候補だけを載せるため、カタログの件数が増えてもプロンプトの長さはほぼ一定になる
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# 索引する項目と重み（タイトルの一致を説明文より重く数える）
+DEFAULT_FIELD_WEIGHTS = {'title': 2.0, 'description': 1.0}
+
+# 長い説明文は先頭のこの文字数だけ索引する（インデックスの大きさを抑える）
+MAX_FIELD_CHARS = 500
+
+NGRAM_SIZES = (2, 3)
+
+# 記号・空白で区切り、区切りをまたぐn-gramは作らない
+SEPARATOR_PATTERN = re.compile(r'[\W_]+')
+
+def char_ngrams(text: str, sizes: Iterable[int] = NGRAM_SIZES) -> List[str]:
+    """
+    全角・半角と英字の大文字・小文字をそろえ、記号で区切った各部分の文字n-gramを返す
+    最小のnより短い部分（1文字の漢字など）はそのまま1語にする
+    """
+    sizes = tuple(sizes)
+    shortest = min(sizes)
+    tokens = []
+    for segment in SEPARATOR_PATTERN.split(unicodedata.normalize('NFKC', text).lower()):
+        if not segment:
+            continue
+        if len(segment) < shortest:
+            tokens.append(segment)
+            continue
+        for n in sizes:
+            tokens.extend(segment[i:i + n] for i in range(len(segment) - n + 1))
+    return tokens
+
+class LexicalIndex:
+    def __init__(self, jobs: Sequence[Mapping[str, str]], field_weights: Optional[Dict[str, float]] = None,
+                 k1: float = 1.2, b: float = 0.75):
+        """
+        jobs: 求人のリスト（スナップショットでもよい。検索結果はこのリストの要素を返す）
+        field_weights: 索引する項目 -> 重み
+        k1, b: BM25のパラメータ（語の出現回数の飽和の速さ・文書の長さによる補正の強さ）
+        """
+        self.jobs = jobs
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self.k1 = k1
+        self.b = b
+
+        started = time.perf_counter()
+        # 語 -> (求人の番号, 重み付きの出現回数) の転置リスト
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        lengths = array('f')
+        for doc_id, job in enumerate(jobs):
+            counts: Counter = Counter()
+            for field, weight in self.field_weights.items():
+                text = job.get(field)
+                if text:
+                    for token in char_ngrams(text[:MAX_FIELD_CHARS]):
+                        counts[token] += weight
+
+            for token, tf in counts.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = (array('I'), array('f'))
+                posting[0].append(doc_id)
+                posting[1].append(tf)
+            lengths.append(sum(counts.values()))
+
+        self.size = len(lengths)
+        average_length = (sum(lengths) / self.size) if self.size else 0.0
+        # BM25の分母の k1 * (1 - b + b * 文書長 / 平均文書長) は求人ごとに固定なので先に計算する
+        self._norms = array('f', (
+            k1 * (1 - b + b * length / average_length) if average_length else k1
+            for length in lengths
+        ))
+        self.build_seconds = time.perf_counter() - started
+        print(f"🔎 語彙インデックスを作成: {self.size}件 / {len(self._postings)}語 ({self.build_seconds:.2f}秒)")
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        クエリとのBM25スコアが高い順に最大k件の (求人の番号, スコア) を返す（一致しない求人は含めない）
+        """
+        scores: Dict[int, float] = {}
+        k1 = self.k1
+        norms = self._norms
+        # 長いクエリ（職務経歴の文章）で同じn-gramを何度も数えないよう、クエリ側は出現の有無だけを見る
+        for token in set(char_ngrams(query)):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            doc_ids, tfs = posting
+            df = len(doc_ids)
+            idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+            for doc_id, tf in zip(doc_ids, tfs):
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norms[doc_id])
+
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+
+    def shortlist(self, query: str, k: int) -> List[Mapping[str, str]]:
+        """
+        LLMに渡す候補: スコアの高い順にk件（一致する求人がk件に満たなければ一覧の順に補う）
+        """
+        k = min(k, self.size)
+        doc_ids = [doc_id for doc_id, _ in self.search(query, k)]
+        if len(doc_ids) < k:
+            selected = set(doc_ids)
+            doc_ids.extend(doc_id for doc_id in range(self.size) if doc_id not in selected)
+            del doc_ids[k:]
+        return [self.jobs[doc_id] for doc_id in doc_ids]
+
+_shared_index: Optional[LexicalIndex] = None
+_shared_index_lock = threading.Lock()
+
+def get_shared_index(jobs: Sequence[Mapping[str, str]]) -> LexicalIndex:
+    """
+    カタログの版ごとに1つだけ作るインデックス（同じ求人リストなら作り直さない）
+    共有カタログは版が変わるまで同じリスト（スナップショット）を返すため、オブジェクトの同一性で版を見分ける
+    """
+    global _shared_index
+    with _shared_index_lock:
+        if _shared_index is None or _shared_index.jobs is not jobs:
+            _shared_index = LexicalIndex(jobs)
+        return _shared_index
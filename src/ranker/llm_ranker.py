@@ -9,8 +9,30 @@ from typing import Dict, List, Any
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from src.ranker.dense_index import OpenAIEmbedder, get_shared_dense_index
+from src.ranker.lexical_index import get_shared_index
+
+# LLMに渡す候補の件数（0なら全求人を渡す）
+DEFAULT_SHORTLIST_SIZE = int(os.environ.get('JOB_SHORTLIST_SIZE', 60))
+
+# 候補の絞り込み方法: 'lexical'（文字n-gramのBM25） / 'dense'（埋め込みベクトルの類似度）
+RETRIEVERS = ('lexical', 'dense')
+DEFAULT_RETRIEVER = os.environ.get('JOB_RETRIEVER', 'lexical')
+
 class LLMJobRanker:
-    def __init__(self):
+    def __init__(self, shortlist_size: int = DEFAULT_SHORTLIST_SIZE, retriever: str = DEFAULT_RETRIEVER,
+                 embedder=None):
+        """
+        shortlist_size: プロンプトに載せる求人の最大件数（カタログがこれより多ければプロフィールに近い順に絞り込む）
+        retriever: 候補の絞り込み方法（'lexical' / 'dense'）
+        embedder: 'dense' の埋め込み方法（省略時は OpenAI の埋め込みAPI）
+        """
+        if retriever not in RETRIEVERS:
+            raise ValueError(f"未対応の絞り込み方法: {retriever}")
+        self.shortlist_size = shortlist_size
+        self.retriever = retriever
+        self.embedder = embedder
+        
         # config.envから環境変数を読み込み
         load_dotenv('config.env')
         api_key = os.getenv('OPENAI_API_KEY')
@@ -32,6 +54,9 @@ class LLMJobRanker:
                     "message": "申し訳ございませんが、求人情報が見つかりませんでした。"
                 }
             
+            # プロンプトの長さをカタログの件数によらず一定にするため、候補を絞り込んでから渡す
+            jobs = self._shortlist(profile, jobs)
+            
             print(f"🤖 GPT-4o-miniで{len(jobs)}件の求人を分析中...")
             
             # プロンプト作成
@@ -82,6 +107,25 @@ class LLMJobRanker:
                 "message": f"申し訳ございません、分析中にエラーが発生しました: {str(e)}"
             }
     
+    def _shortlist(self, profile: Dict[str, str], jobs: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        プロフィール（業界・職種・経験）に語彙の近い上位 shortlist_size 件の求人
+        以降の求人番号（LLMの回答の番号）はこの候補の中での番号になる
+        """
+        if not self.shortlist_size or len(jobs) <= self.shortlist_size:
+            return jobs
+        
+        query = " ".join(str(profile.get(key, '')) for key in ('industry', 'job_type', 'work_experience'))
+        if self.retriever == 'dense':
+            if self.embedder is None:
+                self.embedder = OpenAIEmbedder(self.client)
+            index = get_shared_dense_index(jobs, self.embedder)
+        else:
+            index = get_shared_index(jobs)
+        candidates = index.shortlist(query, self.shortlist_size)
+        print(f"🔎 {len(jobs)}件から候補を{len(candidates)}件に絞り込み ({self.retriever})")
+        return candidates
+    
     def _create_ranking_prompt(self, profile: Dict[str, str], jobs: List[Dict[str, str]]) -> str:
         """
         プロフィールと求人リストから分析プロンプトを作成
@@ -0,0 +1,48 @@
+"""
+クロール計測 - urllib3 の内部に依存した接続の計測と、JSONログの出力先の設定
+"""
+
+import json
+import logging
+
+import urllib3
+from urllib3.connection import HTTPConnection
+
+from benchmarks.fixture_server import FixtureServer, generate_corpus
+from src.extractors import crawl_metrics
+from src.extractors.crawl_metrics import TimedHTTPConnection, configure_metrics_log, get_metrics_registry
+from src.extractors.http_transport import HttpTransport
+
+def test_urllib3_connection_internals_are_available():
+    # 接続の計測は HTTPConnection._new_conn と _dns_host を前提にしている（urllib3 を上げたら確認する）
+    assert urllib3.__version__.split('.')[0] == '2'
+    assert callable(getattr(HTTPConnection, '_new_conn', None))
+    assert TimedHTTPConnection._new_conn is not HTTPConnection._new_conn
+    assert HTTPConnection('jobs.example', 80)._dns_host == 'jobs.example'
+
+def test_new_connections_record_dns_and_connect_phases():
+    with FixtureServer(generate_corpus(3)) as server:
+        transport = HttpTransport()
+        with get_metrics_registry().page(server.listing_url) as record:
+            response = transport.get(server.listing_url, timeout=5)
+
+    assert response.status_code == 200
+    assert record.reused_connection is False
+    assert 'dns' in record.phases and 'connect' in record.phases
+
+def test_configure_metrics_log_writes_one_json_line_per_fetch(tmp_path):
+    path = tmp_path / 'metrics' / 'crawl.jsonl'
+    try:
+        configure_metrics_log(str(path))
+        configure_metrics_log(str(path))
+        assert len(crawl_metrics.logger.handlers) == 1
+
+        with get_metrics_registry().page('http://jobs.example/list', 'test') as record:
+            record.status = 200
+    finally:
+        configure_metrics_log(None)
+
+    events = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [(event['url'], event['status']) for event in events] == [('http://jobs.example/list', 200)]
+    assert not crawl_metrics.logger.isEnabledFor(logging.INFO)
+    assert crawl_metrics.logger.handlers == []
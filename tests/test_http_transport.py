@@ -0,0 +1,54 @@
+"""
+HTTPトランスポートの再試行 - Retry-After の上限と、再試行ごとのレート制限
+"""
+
+import time
+
+import requests
+
+from src.extractors.http_transport import HttpTransport
+
+class FakeSession:
+    """決まったステータスと Retry-After を返し続けるセッション"""
+
+    def __init__(self, status: int, retry_after: str):
+        self.status = status
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers['Retry-After'] = self.retry_after
+        response._content = b''
+        response.url = url
+        return response
+
+class CountingRateLimiter:
+    def __init__(self):
+        self.waits = []
+
+    def wait(self, url: str):
+        self.waits.append(url)
+
+def test_retry_after_is_clamped_to_retry_after_max():
+    session = FakeSession(429, '3600')
+    transport = HttpTransport(session=session, max_attempts=3, backoff_max=0.05)
+
+    started = time.monotonic()
+    response = transport.get('http://jobs.example/list')
+
+    assert response.status_code == 429
+    assert session.calls == 3
+    assert time.monotonic() - started < 1.0
+
+def test_every_attempt_waits_for_the_rate_limiter():
+    session = FakeSession(503, '0')
+    transport = HttpTransport(session=session, max_attempts=3, retry_after_max=0.0)
+    limiter = CountingRateLimiter()
+
+    transport.get('http://jobs.example/detail', rate_limiter=limiter)
+
+    assert session.calls == 3
+    assert limiter.waits == ['http://jobs.example/detail'] * 3
@@ -0,0 +1,47 @@
+"""
+求人詳細ページの解析 - 解析プロセスは抽出器を作らず、取得スレッド内と同じ結果を返す
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixture_server import FixtureServer, generate_corpus
+from src.extractors import job_detail_parser
+from src.extractors.complete_job_extractor import CompleteJobExtractor
+from src.extractors.http_cache import HttpCache
+from src.extractors.job_detail_parser import JobDetailParser, parse_detail_batch
+
+def detail_pages(count: int):
+    corpus = generate_corpus(count)
+    return [(code, f"http://jobs.example/detail?job_code={code}", html.encode('utf-8'), 'text/html; charset=UTF-8')
+            for code, html in corpus.details.items()]
+
+def test_batch_matches_single_page_parse():
+    pages = detail_pages(5)
+    results = parse_detail_batch(pages)
+
+    parser = JobDetailParser()
+    for (code, url, content, _), (job_code, job_info, encoding, _, timings) in zip(pages, results):
+        assert job_code == code and encoding == 'utf-8'
+        assert job_info == parser.parse(BeautifulSoup(content.decode('utf-8'), 'html.parser'), url, code)
+        assert job_info['title'] and job_info['job_code'] == code
+        assert set(timings) == {'decode', 'parse', 'extract'}
+
+def test_pool_worker_does_not_build_an_extractor():
+    # 解析プロセスの入口は解析器のモジュールにあり、抽出器（接続・キャッシュ・レート制限）を持たない
+    assert parse_detail_batch.__module__ == job_detail_parser.__name__
+    pages = detail_pages(3)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        results = pool.submit(parse_detail_batch, pages).result(timeout=60)
+    # 段階ごとの秒数以外は同じ
+    assert [result[:4] for result in results] == [result[:4] for result in parse_detail_batch(pages)]
+
+def test_pipelined_extractor_uses_parse_processes(tmp_path):
+    with FixtureServer(generate_corpus(6)) as server:
+        extractor = CompleteJobExtractor(parse_workers=1, requests_per_second=50, base_url=server.base_url,
+                                         http_cache=HttpCache(str(tmp_path)))
+        jobs = extractor.extract_all_jobs(server.listing_url)
+
+    assert sorted(job['job_code'] for job in jobs) == sorted(generate_corpus(6).details)
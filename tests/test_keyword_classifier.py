@@ -0,0 +1,24 @@
+"""
+共有キーワード分類器 - 表ごとに1つだけ作られ、表の優先順位・大文字小文字の設定を保つ
+"""
+
+import pytest
+
+from src.extractors.keyword_classifier import KEYWORD_TABLES, get_shared_classifier
+
+def test_shared_classifier_is_built_once_per_table():
+    for name in KEYWORD_TABLES:
+        assert get_shared_classifier(name) is get_shared_classifier(name)
+    assert get_shared_classifier('complete_title') is not get_shared_classifier('enhanced_title')
+
+def test_shared_classifier_keeps_table_rules():
+    # 先に書いたカテゴリが優先され、大文字・小文字は表の設定どおりに扱う
+    assert get_shared_classifier('simple_category').first('AIシステム開発エンジニア') == 'エンジニア系'
+    assert get_shared_classifier('simple_category').first('DX推進') == 'IT・デジタル系'
+    assert get_shared_classifier('enhanced_link').matches('/Recruit/list')
+    assert not get_shared_classifier('jposting_title').matches('new')
+    assert get_shared_classifier('jposting_title').matches('NEW')
+
+def test_unknown_table_is_rejected():
+    with pytest.raises(ValueError):
+        get_shared_classifier('unknown')
@@ -0,0 +1,73 @@
+"""
+リンク解析モードの一致確認 - 各モードの抽出結果が従来の全体解析（full）と同じになるか
+"""
+
+import random
+
+import pytest
+
+from benchmarks.fixture_server import FixtureSite, generate_corpus, load_corpus
+from src.extractors.http_cache import HttpCache
+from src.extractors.link_parser import extract_links
+from src.extractors.simple_html_extractor import SimpleJobExtractor
+
+# 閉じ忘れの <a> を親要素の終了タグで閉じる必要があるページ
+MALFORMED_LISTINGS = [
+    '<table><tr><td><a href="?job_code=1">生産技術エンジニア（東京）</td><td>説明テキスト</td></tr></table>',
+    '<div><a href="?job_code=2">設計開発エンジニア<p>（名古屋）</div>勤務地の説明',
+    '<ul><li><a href="?job_code=3">品質保証スタッフ<br>（神戸）<li><a href="?job_code=4">営業企画スタッフ</ul>',
+    '<p><a href="?job_code=5">システムエンジニア<span>（鎌倉）</p>後続のテキスト</a>末尾',
+    '<div><a href="?job_code=6">回路設計エンジニア<script>var x = "</div>";</script></span></div>外側',
+]
+
+@pytest.fixture
+def extractor(tmp_path):
+    return SimpleJobExtractor(http_cache=HttpCache(str(tmp_path)))
+
+def test_fixture_listing_matches_full(extractor):
+    site = FixtureSite(generate_corpus(120))
+    assert extractor.verify_link_parsers(site.listing_html, 'http://fixture/') == {
+        'full': True, 'strainer': True, 'stream': True
+    }
+
+def test_recorded_listing_matches_full(extractor):
+    corpus = load_corpus()
+    if corpus is None or not corpus.listing_html:
+        pytest.skip("記録した一覧ページのコーパスがありません（python -m benchmarks.record_corpus）")
+    results = extractor.verify_link_parsers(corpus.listing_html, 'http://fixture/')
+    assert results['stream']
+
+@pytest.mark.parametrize('html', MALFORMED_LISTINGS)
+def test_stream_closes_anchor_with_parent(extractor, html):
+    assert extractor.verify_link_parsers(html, 'http://fixture/')['stream']
+
+def test_stream_title_stops_at_cell_end():
+    html = MALFORMED_LISTINGS[0]
+    assert extract_links(html, 'stream') == [('?job_code=1', '生産技術エンジニア（東京）')]
+    assert extract_links('<div><a href="x">AAA<p>BBB</div>CCC', 'stream') == [('x', 'AAABBB')]
+
+def random_markup(rng: random.Random) -> str:
+    """閉じ忘れ・余分な終了タグ・入れ子のリンク・空白だけのテキスト・文字参照を含むランダムなHTML"""
+    tags = ['a', 'td', 'tr', 'div', 'p', 'span', 'li', 'ul', 'b', 'script', 'style', 'br', 'img', 'pre']
+    parts = []
+    for _ in range(rng.randint(5, 40)):
+        choice = rng.random()
+        tag = rng.choice(tags)
+        if choice < 0.35:
+            attrs = f' href="job.phtml?job_code={rng.randint(1, 5)}"' if tag == 'a' else ''
+            parts.append(f'<{tag}{attrs}>')
+        elif choice < 0.6:
+            parts.append(f'</{tag}>')
+        elif choice < 0.65:
+            parts.append(rng.choice(['<!-- c -->', '<![CDATA[c]]>', f'<{tag}/>', '<A HREF=job.phtml>', '</A>']))
+        else:
+            parts.append(rng.choice(['求人タイトル', '（東京）', 'テキスト', ' ', '  \n ', '\t', '&amp;', '&amp', '&#150;',
+                                     '&foo;', '<', '説明']))
+    return ''.join(parts)
+
+def test_default_mode_matches_full():
+    rng = random.Random(0)
+    pages = [FixtureSite(generate_corpus(60)).listing_html, *MALFORMED_LISTINGS]
+    pages += [random_markup(rng) for _ in range(500)]
+    for html in pages:
+        assert extract_links(html) == extract_links(html, 'full'), html
@@ -0,0 +1,106 @@
+"""
+候補の絞り込み - 語彙インデックス・埋め込みインデックスの順位付け、保存した行列の再利用と世代管理
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.catalog.arrow_snapshot import ArrowSnapshotStore
+from src.catalog.atomic_files import atomic_write
+from src.ranker.dense_index import DenseIndex, HashingEmbedder, job_text
+from src.ranker.lexical_index import LexicalIndex
+
+JOBS = [
+    {'title': '営業職（法人向け）', 'description': '既存顧客への提案営業'},
+    {'title': 'Pythonエンジニア', 'description': 'Pythonでの機械学習基盤の開発'},
+    {'title': 'Javaエンジニア', 'description': '業務システムの開発'},
+    {'title': '経理スタッフ', 'description': '月次決算の補助'},
+]
+
+class CountingEmbedder(HashingEmbedder):
+    """埋め込んだテキストを記録する（保存済みの行列を使ったかを確かめる）"""
+
+    def __init__(self):
+        super().__init__(dimensions=64)
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        return super().embed(texts)
+
+def test_lexical_search_ranks_by_bm25():
+    index = LexicalIndex(JOBS)
+
+    results = index.search('Pythonエンジニア', 2)
+
+    assert [doc_id for doc_id, _ in results] == [1, 2]
+    assert results[0][1] > results[1][1] > 0
+
+def test_lexical_shortlist_pads_in_catalog_order():
+    index = LexicalIndex(JOBS)
+
+    # 一致するのは経理の求人だけなので、残りは一覧の順に補う
+    assert index.shortlist('経理', 3) == [JOBS[3], JOBS[0], JOBS[1]]
+    assert len(index.shortlist('経理', 10)) == len(JOBS)
+
+def test_dense_search_ranks_by_similarity():
+    index = DenseIndex(JOBS, HashingEmbedder(64), cache_dir=None)
+
+    results = index.search(job_text(JOBS[2]), 3)
+
+    assert results[0][0] == 2
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    assert len(index.search('エンジニア', 10)) == len(JOBS)
+    assert index.shortlist(job_text(JOBS[2]), 1) == [JOBS[2]]
+
+def test_dense_index_reuses_saved_matrix(tmp_path):
+    first_embedder = CountingEmbedder()
+    first = DenseIndex(JOBS, first_embedder, cache_dir=str(tmp_path))
+    assert len(first_embedder.embedded) == len(JOBS)
+
+    second_embedder = CountingEmbedder()
+    second = DenseIndex(JOBS, second_embedder, cache_dir=str(tmp_path))
+
+    # 求人の埋め込みは計算し直さず、保存した行列をメモリマップして読む
+    assert second_embedder.embedded == []
+    assert isinstance(second.matrix, np.memmap)
+    np.testing.assert_array_equal(first.matrix, second.matrix)
+    assert second.search(job_text(JOBS[1]), 1)[0][0] == 1
+    assert second_embedder.embedded == [job_text(JOBS[1])]
+
+def test_dense_index_keeps_latest_matrices(tmp_path):
+    embedder = HashingEmbedder(16)
+    for version in range(4):
+        DenseIndex([{'title': f"求人{version}"}], embedder, cache_dir=str(tmp_path), keep=2)
+    latest = DenseIndex([{'title': '求人4'}], embedder, cache_dir=str(tmp_path), keep=2)
+
+    files = sorted(name for name in os.listdir(tmp_path) if name.endswith('.npy'))
+    assert len(files) == 2
+    assert latest.matrix.filename in [os.path.join(str(tmp_path), name) for name in files]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+def test_snapshot_store_keeps_latest_versions(tmp_path):
+    store = ArrowSnapshotStore(str(tmp_path), keep=2)
+    for version in range(1, 5):
+        store.publish([{'title': f"求人{version}"}])
+
+    assert sorted(os.listdir(tmp_path)) == ['LATEST', 'catalog-3.arrow', 'catalog-4.arrow']
+    assert store.load_latest()[0]['title'] == '求人4'
+
+def test_failed_atomic_write_keeps_previous_file(tmp_path):
+    path = str(tmp_path / 'matrix.npy')
+    atomic_write(path, lambda f: f.write(b'old'))
+
+    def broken_write(f):
+        f.write(b'partial')
+        raise RuntimeError('書き込み失敗')
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, broken_write)
+
+    assert os.listdir(tmp_path) == ['matrix.npy']
+    with open(path, 'rb') as f:
+        assert f.read() == b'old'
@@ -0,0 +1,51 @@
+"""
+一覧ページの重複リンクのまとめ方 - タイトルの選び方と求人番号ごとのリンク数
+"""
+
+import pytest
+
+from src.extractors.http_cache import HttpCache
+from src.extractors.simple_html_extractor import SimpleJobExtractor
+
+@pytest.fixture
+def extractor(tmp_path):
+    return SimpleJobExtractor(http_cache=HttpCache(str(tmp_path)))
+
+def listing(*anchors):
+    return '<table>' + ''.join(f'<tr><td><a href="job.phtml?job_code={code}">{text}</a></td></tr>'
+                               for code, text in anchors) + '</table>'
+
+def test_duplicate_anchors_are_merged_in_listing_order(extractor):
+    extraction = extractor._extract_jobs_from_links(listing(
+        ('2', '営業企画スタッフ（東京）'),
+        ('1', '生産技術エンジニア（名古屋）'),
+        ('2', '営業企画スタッフ（東京）'),
+        ('2', '詳細を見る'),
+    ), 'http://fixture/')
+
+    assert [job['job_code'] for job in extraction.jobs] == ['2', '1']
+    assert extraction.anchor_counts == {'2': 3, '1': 1}
+
+def test_title_with_text_of_another_duplicate_is_replaced(extractor):
+    # 隣のセルのテキストが混ざった長いタイトルより、それに含まれる短いタイトルを採用する
+    extraction = extractor._extract_jobs_from_links(listing(
+        ('1', '生産技術エンジニア（東京）説明テキスト'),
+        ('1', '生産技術エンジニア（東京）'),
+    ), 'http://fixture/')
+    assert extraction.jobs[0]['title'] == '生産技術エンジニア（東京）'
+
+def test_longer_unrelated_title_does_not_win(extractor):
+    extraction = extractor._extract_jobs_from_links(listing(
+        ('1', '生産技術エンジニア（東京）'),
+        ('1', '生産技術エンジニア（東京）説明テキスト'),
+        ('1', '別の表記の求人タイトル（長い説明付き）'),
+    ), 'http://fixture/')
+    assert extraction.jobs[0]['title'] == '生産技術エンジニア（東京）'
+
+def test_listing_event_carries_anchor_counts(extractor, monkeypatch):
+    html = listing(('1', '生産技術エンジニア（東京）'), ('1', '生産技術エンジニア（東京）'))
+    monkeypatch.setattr(extractor, '_extract_listing',
+                        lambda url: extractor._extract_jobs_from_links(html, url))
+    events = list(extractor.iter_jobs('http://fixture/job.phtml'))
+    assert events[0]['stage'] == 'listing' and events[0]['anchor_counts'] == {'1': 2}
+    assert [event['job']['job_code'] for event in events if event['type'] == 'job'] == ['1']
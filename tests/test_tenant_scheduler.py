@@ -0,0 +1,58 @@
+"""
+テナント別の更新ループ - 2社のフィクスチャサイトをTTLごとに並行して更新する
+"""
+
+import time
+
+from benchmarks.fixture_server import FixtureServer, generate_corpus
+from src.catalog.tenant_scheduler import Tenant, TenantScheduler
+from src.extractors.http_cache import HttpCache
+from src.extractors.http_transport import HttpTransport
+
+def wait_until(condition, timeout: float = 30.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+def test_run_loop_refreshes_two_fixture_tenants(tmp_path):
+    with FixtureServer(generate_corpus(4), company='tenant-a') as server_a, \
+            FixtureServer(generate_corpus(6), company='tenant-b') as server_b:
+        scheduler = TenantScheduler(
+            [Tenant('tenant-a', base_url=server_a.base_url, requests_per_second=50),
+             Tenant('tenant-b', base_url=server_b.base_url, requests_per_second=50)],
+            ttl_seconds=0.5,
+            data_dir=str(tmp_path / 'tenants'),
+            http_cache=HttpCache(str(tmp_path / 'http'))
+        )
+        scheduler.start_in_background(poll_seconds=0.05)
+        try:
+            # TTLを過ぎるたびに両方のテナントが取得し直される
+            assert wait_until(lambda: all(scheduler.get_catalog(company).version >= 2
+                                          for company in ('tenant-a', 'tenant-b')))
+        finally:
+            scheduler.stop()
+
+    assert len(scheduler.get_catalog('tenant-a').get_jobs()) == 4
+    assert len(scheduler.get_catalog('tenant-b').get_jobs()) == 6
+    assert {company: result['error'] for company, result in scheduler.last_refresh.items()} == {
+        'tenant-a': None, 'tenant-b': None}
+
+def test_failed_tenant_waits_for_retry_seconds(tmp_path):
+    with FixtureServer(generate_corpus(3), company='tenant-a') as server:
+        scheduler = TenantScheduler(
+            [Tenant('tenant-a', base_url=server.base_url, requests_per_second=50),
+             Tenant('tenant-b', base_url='http://127.0.0.1:9', requests_per_second=50)],
+            data_dir=None,
+            transport=HttpTransport(max_attempts=1),
+            http_cache=HttpCache(str(tmp_path / 'http')),
+            retry_seconds=3600
+        )
+        first = scheduler.refresh_stale()
+
+    assert first['tenant-a']['error'] is None and first['tenant-a']['jobs'] == 3
+    assert first['tenant-b']['error'] is not None
+    # 成功したテナントはTTL内、失敗したテナントは再試行の時刻前なので、どちらも更新しない
+    assert scheduler.refresh_stale() == {}